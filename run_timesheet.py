@@ -26,9 +26,17 @@ def _ensure_src_on_path() -> None:
 def main() -> None:
     _ensure_src_on_path()
 
+    # A second launch hands its request to the running window and exits
+    # before the GUI stack (Tk, openpyxl) is imported.
+    from timesheet_app.single_instance import claim
+
+    lock = claim(sys.argv[1] if len(sys.argv) > 1 else None)
+    if lock is None:
+        return
+
     from timesheet_app.app import main as app_main
 
-    app_main()
+    app_main(sys.argv[1:], lock)
 
 
 if __name__ == "__main__":
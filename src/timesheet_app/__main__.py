@@ -1,6 +1,20 @@
 """Entry point for running the Timesheet application as a module."""
 
-from .app import main
+import sys
+
+from .single_instance import claim
+
+
+def main() -> None:
+    # A second launch hands its request to the running window and exits
+    # before the GUI stack (Tk, openpyxl) is imported.
+    lock = claim(sys.argv[1] if len(sys.argv) > 1 else None)
+    if lock is None:
+        return
+
+    from .app import main as app_main
+
+    app_main(sys.argv[1:], lock)
 
 
 if __name__ == "__main__":
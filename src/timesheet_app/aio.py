@@ -0,0 +1,185 @@
+"""Асинхронный фасад над `excel_manager` для приложений на asyncio.
+
+Все операции с Excel выполняются в ограниченном пуле потоков, поэтому цикл
+событий не блокируется. Одновременные вызовы `append_time_entry` для одной
+книги склеиваются: пока идёт запись, новые записи копятся и уходят следующим
+пакетом за одну загрузку/сохранение книги.
+
+Отмена безопасна: если корутину отменили до того, как её запись попала в
+пакет, запись отбрасывается; если пакет уже пишется, он дописывается до конца
+(книга не остаётся в промежуточном состоянии), а отменённая корутина просто
+не получает результат.
+
+Пример:
+    from timesheet_app import aio
+    await aio.append_time_entry(path, project="P", work_type="W", elapsed_seconds=600)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from . import excel_manager
+from .excel_manager import TimeEntry
+
+
+T = TypeVar("T")
+
+# Потоков немного: запись в одну книгу всё равно последовательна
+MAX_WORKERS = 2
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="timesheet-excel")
+    return _executor
+
+
+def shutdown(wait: bool = True) -> None:
+    """Остановить пул потоков (например, при завершении бота)."""
+
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+
+
+async def _run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+@dataclass
+class _WorkbookQueue:
+    """Очередь записей и замок одной книги (в рамках одного цикла событий)."""
+
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    # (запись, признак помесячных листов, future ожидающего)
+    pending: List[Tuple[TimeEntry, bool, "asyncio.Future[None]"]] = field(default_factory=list)
+    flusher: Optional["asyncio.Task[None]"] = None
+
+
+_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, _WorkbookQueue]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _queue_for(path: Path | str) -> _WorkbookQueue:
+    loop = asyncio.get_running_loop()
+    per_loop = _queues.setdefault(loop, {})
+    key = str(Path(path).resolve())
+    if key not in per_loop:
+        per_loop[key] = _WorkbookQueue()
+    return per_loop[key]
+
+
+async def _flush(path: Path | str, wq: _WorkbookQueue) -> None:
+    """Писать накопленные записи пакетами, пока очередь не опустеет."""
+
+    async with wq.lock:
+        while wq.pending:
+            # Пакет — подряд идущие записи с одинаковой раскладкой листов
+            sharded = wq.pending[0][1]
+            size = next((i for i, item in enumerate(wq.pending) if item[1] != sharded), len(wq.pending))
+            batch, wq.pending = wq.pending[:size], wq.pending[size:]
+            try:
+                await _run(
+                    excel_manager.append_time_entries, path, [entry for entry, _, _ in batch], sharded=sharded
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+            else:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+
+
+async def _exclusive(path: Path | str, func: Callable[..., T]) -> T:
+    """Выполнить изменение книги под её замком в отдельной задаче.
+
+    Задача не отменяется вместе с вызывающей корутиной, поэтому замок
+    держится до фактического окончания записи в потоке.
+    """
+
+    wq = _queue_for(path)
+
+    async def job() -> T:
+        async with wq.lock:
+            return await _run(func, path)
+
+    task = asyncio.get_running_loop().create_task(job())
+    # Ошибку задачи, чей результат уже никто не ждёт, не считаем «потерянной»
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    return await asyncio.shield(task)
+
+
+async def append_time_entry(
+    path: Path | str,
+    *,
+    project: str,
+    work_type: str,
+    elapsed_seconds: float,
+    finished_at: datetime | None = None,
+    sharded: bool = False,
+    entry_id: Optional[str] = None,
+) -> None:
+    """Асинхронно добавить запись; параллельные вызовы пишутся одним пакетом.
+
+    С `entry_id` повтор вызова после ошибки не добавит вторую строку.
+    """
+
+    wq = _queue_for(path)
+    loop = asyncio.get_running_loop()
+    entry = TimeEntry(project, work_type, elapsed_seconds, finished_at or datetime.now(), entry_id)
+    item = (entry, sharded, loop.create_future())
+    wq.pending.append(item)
+    if wq.flusher is None or wq.flusher.done():
+        wq.flusher = loop.create_task(_flush(path, wq))
+    try:
+        # shield: отмена ожидающего не должна прерывать уже начатую запись пакета
+        await asyncio.shield(item[2])
+    except asyncio.CancelledError:
+        if item in wq.pending:
+            # Запись ещё не взята в пакет — просто убираем её
+            wq.pending.remove(item)
+        else:
+            # Пакет пишется; ошибку записи больше некому забрать — отменяем future,
+            # и `_flush` его пропустит, а не оставит «Future exception was never retrieved»
+            item[2].cancel()
+        raise
+
+
+async def load_reference_data(path: Path | str) -> Tuple[List[str], List[str]]:
+    """Асинхронная версия `excel_manager.load_reference_data`."""
+
+    return await _run(excel_manager.load_reference_data, path)
+
+
+async def workday_start(path: Path | str) -> Tuple[str, str]:
+    """Асинхронная версия `excel_manager.workday_start`."""
+
+    return await _exclusive(path, excel_manager.workday_start)
+
+
+async def workday_end(path: Path | str) -> str:
+    """Асинхронная версия `excel_manager.workday_end`."""
+
+    return await _exclusive(path, excel_manager.workday_end)
+
+
+async def create_template(path: Path | str) -> None:
+    """Асинхронная версия `excel_manager.create_template`."""
+
+    await _run(excel_manager.create_template, path)
@@ -2,7 +2,7 @@
 
 Кратко о возможностях:
 - выбор проекта и вида работ из Excel-справочника;
-- таймер с кнопками Старт/Пауза/Стоп;
+- таймеры с кнопками Старт/Пауза/Стоп, несколько пар проект/вид работ одновременно;
 - запись результата в книгу Excel (лист "Учет времени");
 - меню Файл/Помощь; в Помощи есть окно с требованиями и кнопкой "Создать шаблон";
 - строка состояния внизу окна с путём к выбранному файлу.
@@ -10,62 +10,126 @@
 
 from __future__ import annotations
 
+import functools
 import math
 import os
+import queue
 import subprocess
 import sys
-import time
+import threading
 import tkinter as tk
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from tkinter import filedialog, font, messagebox, ttk
-from typing import Callable, Optional
+from typing import Callable, Iterator, Optional
 
 
 # Импорты одинаково работают и при запуске из исходников, и при запуске из пакета
 if __package__ in {None, ""}:  # pragma: no cover - запуск как скрипт
     try:
-        from timesheet_app.config import AppConfig
+        from timesheet_app.codec import decode_date, decode_duration
+        from timesheet_app.config import AppConfig, file_stamp
         from timesheet_app.excel_manager import (
             ExcelStructureError,
+            TimeEntry,
             REFERENCE_SHEET,
             TIMESHEET_SHEET,
             WORKDAY_SHEET,
-            append_time_entry,
-            load_reference_data,
+            SUMMARY_SHEET,
+            append_time_entries,
+            load_reference_index,
             create_template,
+            compact_timesheet,
+            configure as configure_excel,
+            rebuild_summary,
+            load_day_entries,
+            iter_time_entries,
+            update_day_entries,
+            undo_last_entry,
             workday_start,
             workday_end,
         )
+        from timesheet_app.memory import IdleTrimmer
+        from timesheet_app.metrics import summary as metrics_summary
+        from timesheet_app.recorder import Recorder, env_enabled as record_env_enabled, new_trace_path
+        from timesheet_app.reference_cache import ReferenceCache
+        from timesheet_app.reference_index import ReferenceIndex
+        from timesheet_app.single_instance import REQUEST_POLL_MS, InstanceLock, InstanceRequest, claim
+        from timesheet_app.sync import SyncClient, make_record
+        from timesheet_app.timers import TICK_MS, TimerKey, TimerSet
+        from timesheet_app.usage_stats import UsageStats
         from timesheet_app.version import VERSION
+        from timesheet_app.watchdog import MainLoopWatchdog, watched
     except ModuleNotFoundError:  # скрипт рядом с файлами
-        from config import AppConfig  # type: ignore
+        from codec import decode_date, decode_duration  # type: ignore
+        from config import AppConfig, file_stamp  # type: ignore
         from excel_manager import (  # type: ignore
             ExcelStructureError,
+            TimeEntry,
             REFERENCE_SHEET,
             TIMESHEET_SHEET,
             WORKDAY_SHEET,
-            append_time_entry,
-            load_reference_data,
+            SUMMARY_SHEET,
+            append_time_entries,
+            load_reference_index,
             create_template,
+            compact_timesheet,
+            configure as configure_excel,
+            rebuild_summary,
+            load_day_entries,
+            iter_time_entries,
+            update_day_entries,
+            undo_last_entry,
             workday_start,
             workday_end,
         )
+        from memory import IdleTrimmer  # type: ignore
+        from metrics import summary as metrics_summary  # type: ignore
+        from recorder import Recorder, env_enabled as record_env_enabled, new_trace_path  # type: ignore
+        from reference_cache import ReferenceCache  # type: ignore
+        from reference_index import ReferenceIndex  # type: ignore
+        from single_instance import REQUEST_POLL_MS, InstanceLock, InstanceRequest, claim  # type: ignore
+        from sync import SyncClient, make_record  # type: ignore
+        from timers import TICK_MS, TimerKey, TimerSet  # type: ignore
+        from usage_stats import UsageStats  # type: ignore
         from version import VERSION  # type: ignore
+        from watchdog import MainLoopWatchdog, watched  # type: ignore
 else:  # стандартный путь импорта пакета
-    from .config import AppConfig
+    from .codec import decode_date, decode_duration
+    from .config import AppConfig, file_stamp
     from .excel_manager import (
         ExcelStructureError,
+        TimeEntry,
         REFERENCE_SHEET,
         TIMESHEET_SHEET,
         WORKDAY_SHEET,
-        append_time_entry,
-        load_reference_data,
+        SUMMARY_SHEET,
+        append_time_entries,
+        load_reference_index,
         create_template,
+        compact_timesheet,
+        configure as configure_excel,
+        rebuild_summary,
+        load_day_entries,
+        iter_time_entries,
+        update_day_entries,
+        undo_last_entry,
         workday_start,
         workday_end,
     )
+    from .memory import IdleTrimmer
+    from .metrics import summary as metrics_summary
+    from .recorder import Recorder, env_enabled as record_env_enabled, new_trace_path
+    from .reference_cache import ReferenceCache
+    from .reference_index import ReferenceIndex
+    from .single_instance import REQUEST_POLL_MS, InstanceLock, InstanceRequest, claim
+    from .sync import SyncClient, make_record
+    from .timers import TICK_MS, TimerKey, TimerSet
+    from .usage_stats import UsageStats
     from .version import VERSION
+    from .watchdog import MainLoopWatchdog, watched
 
 
 def _asset_path(filename: str) -> str:
@@ -88,12 +152,13 @@ def _asset_path(filename: str) -> str:
 class DropdownField(ttk.Frame):
     """Поле с подписью и выпадающим списком (Combobox)."""
 
-    _image_cache: dict[str, tk.PhotoImage] = {}
-
     def __init__(self, parent: tk.Widget, label_text: str, variable: tk.StringVar) -> None:
         super().__init__(parent)
         self.variable = variable
         self._choices: list[str] = []
+        # Ширины в пикселях (самый длинный вариант, символ "0") — Tk меряет текст небыстро
+        self._longest_px: Optional[int] = None
+        self._char_px: Optional[int] = None
 
         # Шрифт для вычисления ширины списков
         try:
@@ -125,6 +190,7 @@ class DropdownField(ttk.Frame):
         """Задать список значений и выбрать начальное."""
 
         self._choices = options[:]
+        self._longest_px = None
 
         if not options:
             self.combobox.configure(state="disabled", values=[])
@@ -149,9 +215,10 @@ class DropdownField(ttk.Frame):
             self.combobox.configure(width=20)
             return
 
-        max_pixels = max(self._menu_font.measure(item) for item in self._choices)
-        average_char = max(self._menu_font.measure("0"), 1)
-        width_chars = max(20, min(int(math.ceil((max_pixels + 24) / average_char)), 64))
+        max_pixels = self.measure_longest_option()
+        if self._char_px is None:
+            self._char_px = max(self._menu_font.measure("0"), 1)
+        width_chars = max(20, min(int(math.ceil((max_pixels + 24) / self._char_px)), 64))
         self.combobox.configure(width=width_chars)
 
     def measure_longest_option(self) -> int:
@@ -159,7 +226,15 @@ class DropdownField(ttk.Frame):
 
         if not self._choices:
             return 0
-        return max(self._menu_font.measure(item) for item in self._choices)
+        if self._longest_px is None:
+            self._longest_px = max(self._menu_font.measure(item) for item in self._choices)
+        return self._longest_px
+
+    def drop_caches(self) -> None:
+        """Забыть замеры шрифта (очистка памяти в простое)."""
+
+        self._longest_px = None
+        self._char_px = None
 
     def _on_combo_selected(self, _event: tk.Event) -> None:  # type: ignore[override]
         """Убрать выделение текста после выбора."""
@@ -239,45 +314,105 @@ class IconButton(ttk.Frame):
 class TimeTrackerApp(tk.Tk):
     """Главное окно приложения: меню, форма, таймер и строка состояния."""
 
-    def __init__(self) -> None:
+    def __init__(self, open_path: Optional[str] = None) -> None:
         super().__init__()
         # Окно
         self.title("Учёт рабочего времени")
-        self.geometry("440x340")
-        self.minsize(420, 320)
+        self.geometry("440x460")
+        self.minsize(420, 420)
         self.resizable(True, True)
         self.configure(background="#f5f5f5")
 
         # Конфиг и состояние
         self.config_manager = AppConfig.load()
+        if open_path and Path(open_path).exists():
+            # Книга из командной строки становится текущей
+            self.config_manager.remember_file(open_path)
+            self.config_manager.save()
+        try:
+            configure_excel(
+                read_engine=self.config_manager.read_engine,
+                compress_level=self.config_manager.save_compress_level,
+                hot_sheet_level=self.config_manager.hot_sheet_compress_level,
+                parallel_inflate=self.config_manager.parallel_inflate,
+            )
+        except ValueError:
+            # Неверные значения в config.json — остаются настройки по умолчанию
+            pass
+        self.reference_cache = ReferenceCache.load()
+        # Отправка записей на центральный сервер (если задан sync_url)
+        self.sync: Optional[SyncClient] = None
+        if self.config_manager.sync_url:
+            try:
+                self.sync = SyncClient(self.config_manager.sync_url, token=self.config_manager.sync_token)
+                self.sync.start()
+            except ValueError:
+                pass  # неверный адрес — работаем только с Excel
+        # Трасса операций для воспроизведения (replay.py), если запись включена
+        record = self.config_manager.record_trace or record_env_enabled()
+        self.recorder = Recorder(new_trace_path() if record else None)
         self.projects: list[str] = []
         self.work_types: list[str] = []
-
+        # Справочник в порядке листа; self.projects/self.work_types — он же после сортировки по истории
+        self._reference = ReferenceIndex()
+        self.usage: Optional[UsageStats] = None
+        # Завершения фоновых задач (поток -> главный цикл Tk)
+        self._background_results: queue.Queue = queue.Queue()
+        self._background_poll_job: Optional[str] = None
+        self._background_threads: list[threading.Thread] = []
+        # Просьбы повторных запусков (поток блокировки -> главный цикл Tk)
+        self._instance_requests: queue.Queue = queue.Queue()
+        self._instance_poll_job: Optional[str] = None
+        # Сторож главного потока: опоздания цикла событий и медленные обработчики
+        self.watchdog = MainLoopWatchdog(self)
+
+        # Таймеры по парам (проект, вид работ); один общий тик обновления на все
+        self.timers = TimerSet()
         self._timer_job: Optional[str] = None
-        self._timer_running = False
-        self._start_reference = 0.0
-        self._elapsed_seconds = 0.0
+        # строка списка таймеров -> ключ таймера
+        self._timer_rows: dict[str, TimerKey] = {}
         self._workday_started = False
 
         self.project_var = tk.StringVar()
         self.work_type_var = tk.StringVar()
         self.timer_var = tk.StringVar(value="00:00:00")
         self.status_var = tk.StringVar()
+        self.monthly_sheets_var = tk.BooleanVar(value=self.config_manager.monthly_sheets)
+        self.compact_on_close_var = tk.BooleanVar(value=self.config_manager.compact_on_day_close)
+        self.work_types_by_project_var = tk.BooleanVar(value=self.config_manager.work_types_by_project)
 
         self._configure_styles()
         self._build_menu()
         self._build_layout()
         self._refresh_status()
+        # Большой счётчик показывает таймер выбранной пары (проект, вид работ)
+        for var in (self.project_var, self.work_type_var):
+            var.trace_add("write", lambda *_args: self._update_timer_display())
+        self.watchdog.start()
+        # Очистка памяти, когда с книгой долго ничего не делают
+        self.memory = IdleTrimmer(
+            self,
+            [
+                self.project_field.drop_caches,
+                self.work_field.drop_caches,
+                # снимки справочников других книг остаются только в файле кэша
+                lambda: self.reference_cache.release([self.config_manager.excel_path or ""]),
+            ],
+        )
+        self.memory.start()
 
         # Если файл уже выбран — пробуем загрузить справочники
         if self.config_manager.excel_path:
+            self._load_usage(self.config_manager.excel_path)
             try:
-                self._load_reference(self.config_manager.excel_path)
+                self._load_reference(self.config_manager.excel_path, use_cache=True)
             except Exception as exc:  # pylint: disable=broad-except
                 messagebox.showerror("Ошибка", f"Не удалось загрузить Excel файл:\n{exc}")
                 self.config_manager.excel_path = None
                 self.config_manager.save()
                 self._refresh_status()
+        # Прогреваем снимки справочников недавних книг, чтобы переключение было мгновенным
+        self.after(1000, lambda: self._refresh_in_background(self.config_manager.recent_files))
         # Если данных нет — предложим выбрать файл после старта
         if not self.projects or not self.work_types:
             self.after(100, self._prompt_for_excel)
@@ -338,27 +473,102 @@ class TimeTrackerApp(tk.Tk):
         # Файл
         file_menu = tk.Menu(menu_bar, tearoff=False)
         file_menu.add_command(label="Выбрать файл Excel", command=self._prompt_for_excel)
+        self._recent_menu = tk.Menu(file_menu, tearoff=False)
+        file_menu.add_cascade(label="Недавние файлы", menu=self._recent_menu)
+        self._rebuild_recent_menu()
         file_menu.add_command(label="Открыть текущий файл", command=self._open_current_file)
         # Подменю «Обновить»: перечитать лист «Справочник» из выбранного файла
         file_menu.add_command(label="Обновить", command=self._reload_reference)
+        file_menu.add_command(label="Пересчитать итоги", command=self._rebuild_summary)
+        file_menu.add_checkbutton(
+            label="Помесячные листы учёта",
+            variable=self.monthly_sheets_var,
+            command=self._toggle_monthly_sheets,
+        )
+        file_menu.add_command(label="Сжать записи учёта", command=self._compact_timesheet)
+        file_menu.add_checkbutton(
+            label="Сжимать записи при окончании дня",
+            variable=self.compact_on_close_var,
+            command=self._toggle_compact_on_close,
+        )
+        file_menu.add_checkbutton(
+            label="Виды работ по проекту",
+            variable=self.work_types_by_project_var,
+            command=self._toggle_work_types_by_project,
+        )
         file_menu.add_separator()
         file_menu.add_command(label="Выход", command=self.destroy)
         menu_bar.add_cascade(label="Файл", menu=file_menu)
 
+        # Правка
+        edit_menu = tk.Menu(menu_bar, tearoff=False)
+        edit_menu.add_command(label="Отменить последнюю запись", command=self._undo_last_entry)
+        edit_menu.add_command(label="Записи за день...", command=self._show_day_entries)
+        menu_bar.add_cascade(label="Правка", menu=edit_menu)
+
         # Помощь
         help_menu = tk.Menu(menu_bar, tearoff=False)
         help_menu.add_command(label="Требования к Excel-файлу...", command=self._show_excel_requirements)
+        help_menu.add_command(label="Диагностика...", command=self._show_diagnostics)
         help_menu.add_separator()
         help_menu.add_command(label="О приложении", command=self._show_about)
         menu_bar.add_cascade(label="Помощь", menu=help_menu)
 
         self.config(menu=menu_bar)
 
+    def _rebuild_recent_menu(self) -> None:
+        """Перестроить подменю «Недавние файлы» по списку из конфигурации."""
+
+        self._recent_menu.delete(0, tk.END)
+        if not self.config_manager.recent_files:
+            self._recent_menu.add_command(label="(пусто)", state="disabled")
+            return
+        for path in self.config_manager.recent_files:
+            self._recent_menu.add_command(label=path, command=lambda p=path: self._open_recent(p))
+
     def _show_about(self) -> None:
         """Показать информацию о версии приложения."""
 
         messagebox.showinfo("О приложении", f"Timesheet\nВерсия: {VERSION}")
 
+    def _show_diagnostics(self) -> None:
+        """Показать сводку задержек главного потока, памяти процесса и операций с Excel."""
+
+        window = tk.Toplevel(self)
+        window.title("Диагностика")
+        window.transient(self)
+        window.resizable(True, True)
+
+        text = tk.Text(window, width=72, height=20, wrap="none", font="TkFixedFont")
+        text.pack(fill="both", expand=True, padx=10, pady=(10, 4))
+
+        def refresh() -> None:
+            text.configure(state="normal")
+            text.delete("1.0", tk.END)
+            report = f"{self.watchdog.summary()}\n\n{self.memory.summary()}"
+            if self.sync is not None:
+                report += f"\n\n{self.sync.summary()}"
+            trace = self.recorder.summary()
+            if trace:
+                report += f"\n\n{trace}"
+            excel = metrics_summary()
+            if excel:
+                report += f"\n\nОперации с Excel (TIMESHEET_METRICS):\n{excel}"
+            text.insert("1.0", report)
+            text.configure(state="disabled")
+
+        buttons = ttk.Frame(window)
+        buttons.pack(fill="x", padx=10, pady=(0, 10))
+        ttk.Button(buttons, text="Обновить", command=refresh).pack(side="left")
+
+        def trim() -> None:
+            self.memory.trim()
+            refresh()
+
+        ttk.Button(buttons, text="Освободить память", command=trim).pack(side="left", padx=(6, 0))
+        ttk.Button(buttons, text="Закрыть", command=window.destroy).pack(side="right")
+        refresh()
+
     def _open_current_file(self) -> None:
         """Открыть текущий выбранный Excel-файл средствами ОС."""
 
@@ -379,6 +589,7 @@ class TimeTrackerApp(tk.Tk):
         except Exception as exc:  # pylint: disable=broad-except
             messagebox.showerror("Ошибка", f"Не удалось открыть файл:\n{exc}")
 
+    @watched("_reload_reference")
     def _reload_reference(self) -> None:
         """Перечитать лист «Справочник» из выбранного файла.
 
@@ -390,7 +601,8 @@ class TimeTrackerApp(tk.Tk):
             messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
             return
         try:
-            self._load_reference(self.config_manager.excel_path)
+            with self.recorder.step("reload", workbook=self.config_manager.excel_path):
+                self._load_reference(self.config_manager.excel_path)
             # Всплывающее сообщение об успешном обновлении
             messagebox.showinfo("Готово", "Справочник обновлён.")
             # В строке состояния оставляем текущий файл
@@ -398,6 +610,223 @@ class TimeTrackerApp(tk.Tk):
         except Exception as exc:  # pylint: disable=broad-except
             messagebox.showerror("Ошибка", f"Не удалось обновить справочник:\n{exc}")
 
+    @watched("_toggle_monthly_sheets")
+    def _toggle_monthly_sheets(self) -> None:
+        """Переключить запись на помесячные листы «Учет времени ГГГГ-ММ»."""
+
+        self.config_manager.monthly_sheets = bool(self.monthly_sheets_var.get())
+        self.config_manager.save()
+
+    @watched("_toggle_compact_on_close")
+    def _toggle_compact_on_close(self) -> None:
+        """Включить слияние записей дня при «Окончании работы»."""
+
+        self.config_manager.compact_on_day_close = bool(self.compact_on_close_var.get())
+        self.config_manager.save()
+
+    @watched("_toggle_work_types_by_project")
+    def _toggle_work_types_by_project(self) -> None:
+        """Показывать только виды работ, указанные для проекта в справочнике."""
+
+        self.config_manager.work_types_by_project = bool(self.work_types_by_project_var.get())
+        self.config_manager.save()
+        self._on_project_selected(None)
+
+    @watched("_compact_timesheet")
+    def _compact_timesheet(self) -> None:
+        """Слить дробные записи (один день, проект и вид работ) по всей истории."""
+
+        if not self.config_manager.excel_path:
+            messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
+            return
+        if not messagebox.askokcancel(
+            "Сжать записи?",
+            "Записи одного дня с одинаковыми проектом и видом работ будут объединены в одну строку.\n"
+            "Отменить последние записи после этого будет нельзя. Продолжить?",
+        ):
+            return
+        try:
+            with self._own_write(self.config_manager.excel_path), self.recorder.step("compact"):
+                before, after = compact_timesheet(self.config_manager.excel_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            messagebox.showerror("Ошибка", f"Не удалось сжать записи:\n{exc}")
+            return
+        if before == after:
+            messagebox.showinfo("Готово", f"Объединять нечего. Записей: {before}.")
+        else:
+            messagebox.showinfo("Готово", f"Записи сжаты: было {before}, стало {after}.")
+
+    @watched("_rebuild_summary")
+    def _rebuild_summary(self) -> None:
+        """Пересчитать лист «Итоги» по всей истории (если он разошёлся с данными)."""
+
+        if not self.config_manager.excel_path:
+            messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
+            return
+        try:
+            with self._own_write(self.config_manager.excel_path), self.recorder.step("rebuild_summary"):
+                rows = rebuild_summary(self.config_manager.excel_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            messagebox.showerror("Ошибка", f"Не удалось пересчитать итоги:\n{exc}")
+            return
+        messagebox.showinfo("Готово", f"Лист '{SUMMARY_SHEET}' пересчитан. Строк итогов: {rows}.")
+
+    @watched("_undo_last_entry")
+    def _undo_last_entry(self) -> None:
+        """Удалить из книги последнюю запись, добавленную кнопкой «Стоп»."""
+
+        if not self.config_manager.excel_path:
+            messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
+            return
+        if not messagebox.askokcancel("Отменить запись?", "Удалить последнюю добавленную запись?"):
+            return
+        try:
+            with self._own_write(self.config_manager.excel_path), self.recorder.step("undo"):
+                entry = undo_last_entry(self.config_manager.excel_path)
+        except Exception as exc:  # pylint: disable=broad-except
+            messagebox.showerror("Ошибка", f"Не удалось отменить запись:\n{exc}")
+            return
+        if entry is None:
+            messagebox.showinfo("Нечего отменять", "Нет записей, добавленных приложением, которые можно отменить.")
+            return
+        messagebox.showinfo(
+            "Запись удалена",
+            f"{entry.day:%d.%m.%Y}: {entry.project} / {entry.work_type}, {self._format_time(entry.seconds)}",
+        )
+
+    @watched("_show_day_entries")
+    def _show_day_entries(self) -> None:
+        """Окно правки записей за выбранный день.
+
+        Читаются и переписываются только строки этой даты (по индексу дат);
+        изменения копятся в окне и записываются в книгу одним сохранением.
+        """
+
+        path = self.config_manager.excel_path
+        if not path:
+            messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
+            return
+
+        win = tk.Toplevel(self)
+        win.title("Записи за день")
+        win.transient(self)
+        win.configure(background="#f5f5f5")
+        win.grab_set()
+
+        body = ttk.Frame(win, padding=16)
+        body.pack(fill=tk.BOTH, expand=True)
+
+        date_var = tk.StringVar(value=datetime.now().strftime("%d.%m.%Y"))
+        project_var = tk.StringVar()
+        work_var = tk.StringVar()
+        duration_var = tk.StringVar()
+        state: dict = {"day": None, "entries": {}, "changes": {}}
+
+        top = ttk.Frame(body)
+        top.pack(fill=tk.X)
+        ttk.Label(top, text="Дата:", style="Timesheet.Label").pack(side=tk.LEFT)
+        date_entry = ttk.Entry(top, textvariable=date_var, width=12)
+        date_entry.pack(side=tk.LEFT, padx=(6, 6))
+
+        tree = ttk.Treeview(body, columns=("project", "work", "duration"), show="headings", height=8)
+        tree.heading("project", text="Проект")
+        tree.heading("work", text="Вид работ")
+        tree.heading("duration", text="Длительность")
+        tree.column("duration", width=100, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, pady=(8, 8))
+
+        form = ttk.Frame(body)
+        form.pack(fill=tk.X)
+        project_box = ttk.Combobox(form, textvariable=project_var, values=self.projects, width=24)
+        work_box = ttk.Combobox(form, textvariable=work_var, values=self.work_types, width=24)
+        duration_entry = ttk.Entry(form, textvariable=duration_var, width=10)
+        project_box.pack(side=tk.LEFT)
+        work_box.pack(side=tk.LEFT, padx=6)
+        duration_entry.pack(side=tk.LEFT)
+
+        def show_entries() -> None:
+            if state["changes"] and not messagebox.askokcancel(
+                "Несохранённые изменения", "Отбросить несохранённые изменения?", parent=win
+            ):
+                return
+            day = decode_date(date_var.get())
+            if day is None:
+                messagebox.showwarning("Дата", "Введите дату в формате ДД.ММ.ГГГГ.", parent=win)
+                return
+            try:
+                entries = load_day_entries(path, day)
+            except Exception as exc:  # pylint: disable=broad-except
+                messagebox.showerror("Ошибка", f"Не удалось прочитать записи:\n{exc}", parent=win)
+                return
+            state["day"] = day
+            state["entries"] = {f"{e.sheet}|{e.row}": e for e in entries}
+            state["changes"] = {}
+            tree.delete(*tree.get_children())
+            for key, entry in state["entries"].items():
+                tree.insert(
+                    "", tk.END, iid=key,
+                    values=(entry.project or "", entry.work_type or "", self._format_time(entry.seconds)),
+                )
+
+        def selected_key() -> Optional[str]:
+            selection = tree.selection()
+            return selection[0] if selection else None
+
+        def on_select(_event: tk.Event) -> None:
+            key = selected_key()
+            if key is None:
+                return
+            project, work, duration = tree.item(key, "values")
+            project_var.set(project)
+            work_var.set(work)
+            duration_var.set(duration)
+
+        def apply_change() -> None:
+            key = selected_key()
+            if key is None:
+                return
+            seconds = decode_duration(duration_var.get())
+            if seconds is None or seconds < 0:
+                messagebox.showwarning("Длительность", "Введите длительность в формате ЧЧ:ММ:СС.", parent=win)
+                return
+            entry = state["entries"][key]
+            state["changes"][(entry.sheet, entry.row)] = TimeEntry(project_var.get(), work_var.get(), seconds)
+            tree.item(key, values=(project_var.get(), work_var.get(), self._format_time(seconds)))
+
+        def delete_entry() -> None:
+            key = selected_key()
+            if key is None:
+                return
+            entry = state["entries"][key]
+            state["changes"][(entry.sheet, entry.row)] = None
+            tree.delete(key)
+
+        def save_changes() -> None:
+            if not state["changes"]:
+                win.destroy()
+                return
+            try:
+                with self._own_write(path):
+                    update_day_entries(path, state["day"], state["changes"])
+            except Exception as exc:  # pylint: disable=broad-except
+                messagebox.showerror("Ошибка", f"Не удалось сохранить изменения:\n{exc}", parent=win)
+                return
+            state["changes"] = {}
+            messagebox.showinfo("Готово", "Изменения записаны в книгу.", parent=win)
+            win.destroy()
+
+        tree.bind("<<TreeviewSelect>>", on_select)
+        ttk.Button(top, text="Показать", command=show_entries).pack(side=tk.LEFT)
+
+        buttons = ttk.Frame(body)
+        buttons.pack(fill=tk.X, pady=(12, 0))
+        ttk.Button(buttons, text="Изменить", command=apply_change).pack(side=tk.LEFT)
+        ttk.Button(buttons, text="Удалить", command=delete_entry).pack(side=tk.LEFT, padx=6)
+        ttk.Button(buttons, text="Закрыть", command=win.destroy).pack(side=tk.RIGHT)
+        ttk.Button(buttons, text="Сохранить", command=save_changes).pack(side=tk.RIGHT, padx=6)
+
+        show_entries()
+
     def _show_excel_requirements(self) -> None:
         """Показать модальное окно с требованиями к Excel и кнопкой "Создать шаблон".
 
@@ -476,8 +905,7 @@ class TimeTrackerApp(tk.Tk):
                     "После внесения данных в Excel и сохранения файла,\nзакройте Excel и нажмите OK для выбора файла в приложении.",
                 )
                 # 4) выбираем файл в приложении
-                self.config_manager.excel_path = save_path
-                self.config_manager.save()
+                self._set_current_workbook(save_path)
                 try:
                     self._load_reference(save_path)
                 except Exception:
@@ -533,6 +961,7 @@ class TimeTrackerApp(tk.Tk):
         # Выпадающие списки ниже
         self.project_field = DropdownField(container, "Проект", self.project_var)
         self.project_field.grid(row=1, column=0, columnspan=2, sticky=(tk.W + tk.E), pady=(0, 12))
+        self.project_field.combobox.bind("<<ComboboxSelected>>", self._on_project_selected, add="+")
 
         self.work_field = DropdownField(container, "Вид работы", self.work_type_var)
         self.work_field.grid(row=2, column=0, columnspan=2, sticky=(tk.W + tk.E), pady=(0, 16))
@@ -559,6 +988,23 @@ class TimeTrackerApp(tk.Tk):
         except Exception:
             pass
 
+        # Список запущенных таймеров: можно вести несколько отсчётов одновременно
+        self.timer_list = ttk.Treeview(
+            container,
+            columns=("project", "work_type", "time"),
+            show="headings",
+            height=4,
+            selectmode="extended",
+        )
+        self.timer_list.heading("project", text="Проект")
+        self.timer_list.heading("work_type", text="Вид работы")
+        self.timer_list.heading("time", text="Время")
+        self.timer_list.column("project", width=150)
+        self.timer_list.column("work_type", width=150)
+        self.timer_list.column("time", width=80, anchor=tk.E, stretch=False)
+        self.timer_list.grid(row=5, column=0, columnspan=2, sticky=(tk.N + tk.S + tk.W + tk.E), pady=(8, 0))
+        self.timer_list.bind("<<TreeviewSelect>>", self._on_timer_selected)
+
         container.rowconfigure(5, weight=1)
         container.rowconfigure(6, minsize=24)  # строка состояния всегда видима
 
@@ -572,6 +1018,7 @@ class TimeTrackerApp(tk.Tk):
         status_label.grid(row=6, column=0, columnspan=2, sticky=(tk.W + tk.E + tk.S), pady=(12, 0))
         self._status_label = status_label
 
+    @watched("_on_start_workday")
     def _on_start_workday(self) -> None:
         """Записать в книгу текущую дату и время начала работы."""
 
@@ -579,11 +1026,12 @@ class TimeTrackerApp(tk.Tk):
             messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
             return
         try:
-            date_str, time_str = workday_start(self.config_manager.excel_path)
+            with self._own_write(self.config_manager.excel_path), self.recorder.step("workday_start"):
+                date_str, time_str = workday_start(self.config_manager.excel_path)
             self._workday_started = True
             try:
                 self._work_start_btn.configure(state="disabled")
-                if not self._timer_running:
+                if not self.timers.any_running():
                     self._work_end_btn.configure(state="disabled")
                 # Разрешаем запуск таймера
                 self._start_button._button.configure(state="normal")
@@ -595,6 +1043,7 @@ class TimeTrackerApp(tk.Tk):
         except Exception as exc:  # pylint: disable=broad-except
             messagebox.showerror("Ошибка", f"Не удалось отметить начало рабочего дня:\n{exc}")
 
+    @watched("_on_end_workday")
     def _on_end_workday(self) -> None:
         """Записать время окончания и длительность рабочего дня."""
 
@@ -602,7 +1051,9 @@ class TimeTrackerApp(tk.Tk):
             messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
             return
         try:
-            duration_str = workday_end(self.config_manager.excel_path)
+            compact = self.config_manager.compact_on_day_close
+            with self._own_write(self.config_manager.excel_path), self.recorder.step("workday_end", compact=compact):
+                duration_str = workday_end(self.config_manager.excel_path, compact=compact)
             self._workday_started = False
             try:
                 self._work_start_btn.configure(state="normal")
@@ -618,6 +1069,7 @@ class TimeTrackerApp(tk.Tk):
             messagebox.showerror("Ошибка", f"Не удалось отметить окончание рабочего дня:\n{exc}")
 
     # ------------------------- Работа с Excel -------------------------
+    @watched("_prompt_for_excel")
     def _prompt_for_excel(self) -> None:
         """Показать диалог выбора Excel-файла и загрузить справочники."""
 
@@ -629,8 +1081,11 @@ class TimeTrackerApp(tk.Tk):
             if not self.config_manager.excel_path:
                 messagebox.showinfo("Файл не выбран", "Без Excel файла приложение не сможет работать.")
             return
+        if not self._confirm_switch(filename):
+            return
         try:
-            self._load_reference(filename)
+            with self.recorder.step("open", workbook=filename):
+                self._load_reference(filename)
         except Exception as exc:  # pylint: disable=broad-except
             messagebox.showerror("Ошибка", f"Не удалось загрузить Excel файл:\n{exc}")
             # Очищаем текущие списки и блокируем выбор, чтобы не остались старые данные
@@ -641,34 +1096,333 @@ class TimeTrackerApp(tk.Tk):
             self._set_inputs_enabled(False)
             return
 
-        self.config_manager.excel_path = filename
-        self.config_manager.save()
-        self._refresh_status()
+        self._set_current_workbook(filename)
         self.status_var.set(f"Файл: {self.config_manager.excel_path}")
         # После удачной загрузки разрешим выбор значений
         self._set_inputs_enabled(True)
 
-    def _load_reference(self, path: str) -> None:
-        """Загрузить данные листа 'Справочник' и обновить выпадающие списки."""
+    def _confirm_switch(self, path: str) -> bool:
+        """Спросить, переключаться ли на книгу `path`, пока есть таймеры.
+
+        Общая проверка для всех путей смены книги: меню недавних, выбор файла
+        и просьба повторного запуска. Без таймеров — True без вопроса.
+        """
+
+        if not len(self.timers) or path == self.config_manager.excel_path:
+            return True
+        return messagebox.askyesno(
+            "Переключить книгу?",
+            f"Таймеров в работе: {len(self.timers)}. После переключения их время запишется в новую книгу:\n{path}\n\n"
+            "Переключиться? (Чтобы записать время в текущую книгу, сначала нажмите «Стоп».)",
+        )
+
+    @watched("_open_recent")
+    def _open_recent(self, path: str) -> None:
+        """Переключиться на книгу из списка недавних.
 
-        projects, work_types = load_reference_data(path)
-        if not projects or not work_types:
+        Если для книги есть снимок справочника — показываем его сразу, а
+        актуальность проверяем в фоне. Без снимка книга разбирается целиком.
+        Пока есть таймеры (идущие или на паузе), переключение — только после
+        подтверждения: по «Стоп» их время запишется уже в новую книгу.
+        """
+
+        if path == self.config_manager.excel_path:
+            return
+        if not Path(path).exists():
+            messagebox.showwarning("Нет файла", f"Файл не найден и будет убран из списка:\n{path}")
+            self.config_manager.recent_files = [p for p in self.config_manager.recent_files if p != path]
+            self.config_manager.save()
+            self._rebuild_recent_menu()
+            return
+        if not self._confirm_switch(path):
+            return
+
+        snapshot = self.reference_cache.get(path)
+        if snapshot is None:
+            try:
+                with self.recorder.step("open", workbook=path):
+                    self._load_reference(path)
+            except Exception as exc:  # pylint: disable=broad-except
+                messagebox.showerror("Ошибка", f"Не удалось загрузить Excel файл:\n{exc}")
+                return
+        else:
+            self.recorder.mark("open", workbook=path, cached=True)
+            self._apply_reference(snapshot.index)
+            self._refresh_in_background([path])
+        self._set_current_workbook(path)
+
+    def _set_current_workbook(self, path: str) -> None:
+        """Сделать книгу текущей: конфигурация, список недавних, строка состояния."""
+
+        self.config_manager.remember_file(path)
+        self.config_manager.save()
+        self.reference_cache.retain(self.config_manager.recent_files)
+        try:
+            self.reference_cache.save()
+        except OSError:
+            pass  # кэш — лишь ускорение, без него всё работает
+        self._rebuild_recent_menu()
+        self._refresh_status()
+        self._load_usage(path)
+        self._apply_ranking()
+
+    @contextmanager
+    def _own_write(self, path: str) -> Iterator[None]:
+        """Запись книги приложением: снимок справочника остаётся свежим.
+
+        Без этого каждая «Стоп» делала снимок устаревшим, и следующее
+        переключение на книгу разбирало её заново.
+        """
+
+        before = file_stamp(path)
+        yield
+        if self.reference_cache.restamp(path, before):
+            try:
+                self.reference_cache.save()
+            except OSError:
+                pass
+
+    def _run_in_background(self, func: Callable[[], object], on_done: Callable[[object, Optional[Exception]], None]) -> None:
+        """Выполнить `func` в фоновом потоке и вызвать `on_done(result, error)` в главном потоке Tk."""
+
+        def worker() -> None:
+            try:
+                result = func()
+            except Exception as exc:  # pylint: disable=broad-except
+                self._background_results.put(functools.partial(on_done, None, exc))
+            else:
+                self._background_results.put(functools.partial(on_done, result, None))
+
+        thread = threading.Thread(target=worker, name="timesheet-background", daemon=True)
+        self._background_threads.append(thread)
+        thread.start()
+        if self._background_poll_job is None:
+            self._background_poll_job = self.after(200, self._poll_background_results)
+
+    @watched("_poll_background_results")
+    def _poll_background_results(self) -> None:
+        """Выполнить завершения фоновых задач (только в главном потоке Tk)."""
+
+        self._background_poll_job = None
+        while True:
+            try:
+                callback = self._background_results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                pass  # фоновые задачи — лишь ускорение, их сбой не должен мешать работе
+        self._background_threads = [t for t in self._background_threads if t.is_alive()]
+        if self._background_threads or not self._background_results.empty():
+            self._background_poll_job = self.after(200, self._poll_background_results)
+
+    def accept_instances(self, lock: InstanceLock) -> None:
+        """Принимать просьбы повторных запусков: поднять окно, открыть книгу."""
+
+        if not lock.held:
+            return
+        lock.serve(self._instance_requests.put)
+        self._instance_poll_job = self.after(REQUEST_POLL_MS, self._poll_instance_requests)
+
+    @watched("_poll_instance_requests")
+    def _poll_instance_requests(self) -> None:
+        """Выполнить просьбы повторных запусков (только в главном потоке Tk)."""
+
+        while True:
+            try:
+                request: InstanceRequest = self._instance_requests.get_nowait()
+            except queue.Empty:
+                break
+            self._raise_window()
+            if request.path:
+                # При идущих таймерах `_open_recent` сперва спросит подтверждение (`_confirm_switch`)
+                self._open_recent(request.path)
+                self._set_inputs_enabled(bool(self.projects and self.work_types))
+        self._instance_poll_job = self.after(REQUEST_POLL_MS, self._poll_instance_requests)
+
+    def _raise_window(self) -> None:
+        """Показать окно поверх остальных (в том числе из свёрнутого состояния)."""
+
+        self.deiconify()
+        self.lift()
+        self.attributes("-topmost", True)
+        self.after_idle(self.attributes, "-topmost", False)
+        self.focus_force()
+
+    def _refresh_in_background(self, paths: list[str]) -> None:
+        """Перечитать в фоновом потоке справочники книг с устаревшими снимками."""
+
+        stale = [
+            p for p in paths
+            if (snapshot := self.reference_cache.get(p)) is None or not self.reference_cache.is_fresh(snapshot)
+        ]
+        stale = [p for p in stale if Path(p).exists()]
+        if not stale:
+            return
+
+        def load_all() -> list[tuple]:
+            results = []
+            for path in stale:
+                stamp = file_stamp(path)
+                try:
+                    index = load_reference_index(path)
+                except Exception:  # pylint: disable=broad-except
+                    continue  # недоступную книгу проверим при следующем переключении
+                results.append((path, index, stamp))
+            return results
+
+        self._run_in_background(load_all, self._on_references_refreshed)
+
+    @watched("_on_references_refreshed")
+    def _on_references_refreshed(self, results: Optional[list[tuple]], error: Optional[Exception]) -> None:
+        """Обновить снимки справочников после фоновой проверки."""
+
+        if error is not None or not results:
+            return
+        for path, index, stamp in results:
+            if not index.projects or not index.work_types:
+                continue
+            self.reference_cache.put(path, index, stamp=stamp)
+            if (
+                path == self.config_manager.excel_path
+                and not self.timers.any_running()
+                and index != self._reference
+            ):
+                self._apply_reference(index)
+        try:
+            self.reference_cache.save()
+        except OSError:
+            pass
+
+    def _load_usage(self, path: str) -> None:
+        """Загрузить статистику выбора для книги; при первом открытии — разобрать историю в фоне."""
+
+        stats = UsageStats.load(path)
+        if stats is not None:
+            self.usage = stats
+            return
+        self.usage = UsageStats(path)
+
+        def scan() -> UsageStats:
+            entries = iter_time_entries(path)
+            return UsageStats.from_history(path, ((e.day, e.project, e.work_type) for e in entries))
+
+        self._run_in_background(scan, self._on_usage_seeded)
+
+    @watched("_on_usage_seeded")
+    def _on_usage_seeded(self, stats: Optional[UsageStats], error: Optional[Exception]) -> None:
+        """Принять статистику, построенную по истории книги."""
+
+        if error is not None or stats is None or self.usage is None:
+            return
+        # Пока шёл разбор, пользователь мог переключить книгу или уже сделать запись
+        if stats.workbook_path != self.usage.workbook_path or not self.usage.is_empty:
+            return
+        self.usage = stats
+        try:
+            self.usage.save()
+        except OSError:
+            pass
+        self._apply_ranking()
+
+    def _record_usage(self, project: str, work_type: str) -> None:
+        """Учесть добавленную запись в статистике выбора (O(1), без перечитывания истории)."""
+
+        if self.usage is None:
+            return
+        self.usage.record(project, work_type)
+        try:
+            self.usage.save()
+        except OSError:
+            pass
+        self._apply_ranking()
+
+    def _sheet_work_types(self, project: Optional[str]) -> list[str]:
+        """Виды работ проекта в порядке справочника (все, если фильтр по проекту выключен)."""
+
+        if self.config_manager.work_types_by_project:
+            return self._reference.work_types_for(project)
+        return self._reference.work_types
+
+    def _apply_ranking(self) -> None:
+        """Упорядочить выпадающие списки по частоте и давности использования."""
+
+        if self.usage is None or not self._reference.projects or self.timers.any_running():
+            return
+        self.projects = self.usage.rank_projects(self._reference.projects)
+        self.work_types = self.usage.rank_work_types(
+            self._sheet_work_types(self.project_var.get()), self.project_var.get()
+        )
+        self.project_field.set_options(self.projects, selected=self.project_var.get())
+        self.work_field.set_options(self.work_types, selected=self.work_type_var.get())
+
+    @watched("_on_project_selected")
+    def _on_project_selected(self, _event: Optional[tk.Event]) -> None:  # type: ignore[override]
+        """При выборе проекта показать его виды работ, подняв наверх обычные, и выбрать самый частый."""
+
+        project = self.project_var.get()
+        work_types = self._sheet_work_types(project)
+        if not work_types:
+            return
+        suggestion = None
+        if self.usage is not None:
+            work_types = self.usage.rank_work_types(work_types, project)
+            suggestion = self.usage.suggest_work_type(project, work_types)
+        self.work_types = work_types
+        self.work_field.set_options(self.work_types, selected=suggestion or self.work_type_var.get())
+
+    @watched("_load_reference")
+    def _load_reference(self, path: str, *, use_cache: bool = False) -> None:
+        """Загрузить данные листа 'Справочник' и обновить выпадающие списки.
+
+        С `use_cache=True` используется снимок справочника, если файл не менялся.
+        """
+
+        snapshot = self.reference_cache.get(path) if use_cache else None
+        if snapshot is not None and self.reference_cache.is_fresh(snapshot):
+            index = snapshot.index
+        else:
+            stamp = file_stamp(path)
+            index = load_reference_index(path)
+            if index.projects and index.work_types:
+                self.reference_cache.put(path, index, stamp=stamp)
+                try:
+                    self.reference_cache.save()
+                except OSError:
+                    pass
+        self._apply_reference(index)
+
+    def _apply_reference(self, index: ReferenceIndex) -> None:
+        """Показать справочники в выпадающих списках, сохранив текущий выбор."""
+
+        if not index.projects or not index.work_types:
             raise ExcelStructureError(
                 "В листе 'Справочник' должны быть заполнены столбцы с проектами и видами работ."
             )
         current_project = self.project_var.get()
         current_work_type = self.work_type_var.get()
 
+        self._reference = index
+        projects = index.projects
+        if self.usage is not None:
+            # Часто используемые значения — наверху списка
+            projects = self.usage.rank_projects(projects)
         self.projects = projects
-        self.work_types = work_types
         self.project_field.set_options(self.projects, selected=current_project)
-        self.work_field.set_options(self.work_types, selected=current_work_type)
 
         if current_project in self.projects:
             self.project_var.set(current_project)
         elif self.projects:
             self.project_var.set(self.projects[0])
 
+        project = self.project_var.get()
+        work_types = self._sheet_work_types(project)
+        if self.usage is not None:
+            work_types = self.usage.rank_work_types(work_types, project)
+        self.work_types = work_types
+        self.work_field.set_options(self.work_types, selected=current_work_type)
+
         if current_work_type in self.work_types:
             self.work_type_var.set(current_work_type)
         elif self.work_types:
@@ -697,6 +1451,7 @@ class TimeTrackerApp(tk.Tk):
         else:
             self.status_var.set("Файл Excel не выбран")
 
+    @watched("_adjust_layout_for_content")
     def _adjust_layout_for_content(self) -> None:
         """Подогнать ширину окна под самые длинные пункты выпадающих списков."""
 
@@ -713,8 +1468,9 @@ class TimeTrackerApp(tk.Tk):
         self._status_label.configure(wraplength=max(desired_width - 40, 200))
 
     # --------------------------- Логика таймера ---------------------------
+    @watched("start_timer")
     def start_timer(self) -> None:
-        """Запустить таймер и начать считать время работы."""
+        """Запустить таймер выбранной пары (проект, вид работ); другие таймеры продолжают идти."""
 
         if not self.config_manager.excel_path:
             messagebox.showwarning("Нет файла", "Сначала выберите Excel файл через меню 'Файл'.")
@@ -726,86 +1482,159 @@ class TimeTrackerApp(tk.Tk):
             messagebox.showwarning("Нет данных", "Не удалось загрузить данные из Excel файла.")
             return
 
-        if not self._timer_running:
-            self._start_reference = time.perf_counter() - self._elapsed_seconds
-            self._timer_running = True
+        self.timers.start(self.project_var.get(), self.work_type_var.get())
+        self.recorder.mark("start", pairs=[self._current_key()])
+        self._refresh_timer_list()
+        if self._timer_job is None:
             self._schedule_timer_update()
-            # На время отсчёта блокируем изменение полей
-            self._set_inputs_enabled(False)
 
+    def _current_key(self) -> TimerKey:
+        return self.project_var.get(), self.work_type_var.get()
+
+    def _selected_timer_keys(self) -> list[TimerKey]:
+        """Ключи таймеров, выделенных в списке, или таймера выбранной пары."""
+
+        keys = [self._timer_rows[iid] for iid in self.timer_list.selection() if iid in self._timer_rows]
+        if keys:
+            return keys
+        current = self._current_key()
+        return [current] if self.timers.get(current) is not None else []
+
+    @watched("pause_timer")
     def pause_timer(self) -> None:
-        """Поставить таймер на паузу (не записывает в Excel)."""
+        """Поставить на паузу выбранные таймеры (не записывает в Excel)."""
 
-        if not self._timer_running:
+        paused = [key for key in self._selected_timer_keys() if self.timers.pause(key)]
+        if not paused:
             return
-        self._elapsed_seconds = time.perf_counter() - self._start_reference
-        self._timer_running = False
-        if self._timer_job is not None:
-            self.after_cancel(self._timer_job)
-            self._timer_job = None
-        # На паузе можно завершить рабочий день
-        try:
-            if getattr(self, "_workday_started", False):
-                self._work_end_btn.configure(state="disabled")
-        except Exception:
-            pass
+        self.recorder.mark("pause", pairs=paused)
+        self._update_timer_display()
 
+    @watched("stop_timer")
     def stop_timer(self) -> None:
-        """Остановить таймер и записать результат в Excel."""
-
-        if self._timer_running:
-            self._elapsed_seconds = time.perf_counter() - self._start_reference
-            self._timer_running = False
-        if self._timer_job is not None:
-            self.after_cancel(self._timer_job)
-            self._timer_job = None
+        """Остановить выбранные таймеры и записать их одним пакетом в Excel."""
 
-        if self._elapsed_seconds <= 0:
+        stopped = [(timer, seconds) for timer, seconds in self.timers.stop(self._selected_timer_keys()) if seconds > 0]
+        self._refresh_timer_list()
+        self._update_timer_display()
+        if not stopped:
             return
 
-        elapsed = self._elapsed_seconds
-        self._elapsed_seconds = 0
-        self.timer_var.set("00:00:00")
+        finished_at = datetime.now()
+        # С ID повтор после ошибки (например, книга открыта в Excel) не задвоит строки
+        entries = [
+            TimeEntry(
+                timer.project,
+                timer.work_type,
+                seconds,
+                finished_at,
+                uuid.uuid4().hex if self.config_manager.entry_ids else None,
+            )
+            for timer, seconds in stopped
+        ]
+        while True:
+            try:
+                with self._own_write(self.config_manager.excel_path), self.recorder.step(
+                    "stop",
+                    pairs=[(entry.project, entry.work_type) for entry in entries],
+                    seconds=[round(entry.elapsed_seconds) for entry in entries],
+                    sharded=self.config_manager.monthly_sheets,
+                    workbook=self.config_manager.excel_path,
+                ):
+                    written = append_time_entries(
+                        self.config_manager.excel_path,
+                        entries,
+                        sharded=self.config_manager.monthly_sheets,
+                    )
+                break
+            except Exception as exc:  # pylint: disable=broad-except
+                if messagebox.askretrycancel(
+                    "Ошибка",
+                    f"Не удалось записать данные в Excel:\n{exc}\n\nЕсли книга открыта в Excel, закройте её и повторите.",
+                ):
+                    continue
+                # Время не теряем: таймеры возвращаются в список на паузе
+                self.timers.restore(timer for timer, _ in stopped)
+                self._refresh_timer_list()
+                self._update_timer_display()
+                return
 
-        try:
-            append_time_entry(
-                self.config_manager.excel_path,
-                project=self.project_var.get(),
-                work_type=self.work_type_var.get(),
-                elapsed_seconds=elapsed,
-                finished_at=datetime.now(),
+        if self.sync is not None:
+            try:
+                self.sync.enqueue(
+                    make_record(
+                        entry.project, entry.work_type, entry.elapsed_seconds, finished_at, entry_id=entry.entry_id
+                    )
+                    for entry in entries
+                )
+            except OSError as exc:
+                messagebox.showwarning(
+                    "Синхронизация", f"Запись сохранена в Excel, но не поставлена в очередь отправки:\n{exc}"
+                )
+
+        # Записи, чьи ID уже есть в книге (повтор после ошибки), не дописываются
+        skipped = len(entries) - written
+        if written == 0:
+            messagebox.showinfo("Уже записано", "Эти записи уже есть в книге, повторно они не добавлены.")
+        elif written == 1 and not skipped:
+            messagebox.showinfo("Запись добавлена", "Строка успешно записана на лист 'Учет времени'.")
+        else:
+            message = f"На лист 'Учет времени' записано строк: {written}."
+            if skipped:
+                message += f"\nУже были в книге и пропущены: {skipped}."
+            messagebox.showinfo("Записи добавлены", message)
+        for entry in entries:
+            self._record_usage(entry.project, entry.work_type)
+
+    def _refresh_timer_list(self) -> None:
+        """Перестроить строки списка таймеров (при появлении и удалении таймеров)."""
+
+        self.timer_list.delete(*self.timer_list.get_children())
+        self._timer_rows = {}
+        now = self.timers.now()
+        for timer in self.timers:
+            iid = self.timer_list.insert(
+                "", tk.END, values=(timer.project, timer.work_type, self._format_time(timer.seconds(now)))
             )
-        except Exception as exc:  # pylint: disable=broad-except
-            messagebox.showerror("Ошибка", f"Не удалось записать данные в Excel:\n{exc}")
-            # Разблокируем поля, чтобы пользователь мог скорректировать выбор
-            self._set_inputs_enabled(True)
-            return
+            self._timer_rows[iid] = timer.key
 
-        messagebox.showinfo("Запись добавлена", "Строка успешно записана на лист 'Учет времени'.")
-        # После успешной записи — снова разрешаем менять значения
-        self._set_inputs_enabled(True)
-        try:
-            if getattr(self, "_workday_started", False):
-                self._work_end_btn.configure(state="normal")
-        except Exception:
-            pass
+    @watched("_on_timer_selected")
+    def _on_timer_selected(self, _event: tk.Event) -> None:  # type: ignore[override]
+        """Выбор одного таймера в списке подставляет его проект и вид работ в поля."""
+
+        selection = self.timer_list.selection()
+        if len(selection) != 1 or selection[0] not in self._timer_rows:
+            return
+        project, work_type = self._timer_rows[selection[0]]
+        self.project_var.set(project)
+        self.work_type_var.set(work_type)
+        self._update_timer_display()
 
     def _schedule_timer_update(self) -> None:
-        """Планировать регулярное обновление отображения счётчика."""
+        """Общий тик для всех таймеров: крутится, пока идёт хотя бы один."""
 
+        self._timer_job = None
         self._update_timer_display()
-        self._timer_job = self.after(200, self._schedule_timer_update)
+        if self.timers.any_running():
+            self._timer_job = self.after(TICK_MS, self._schedule_timer_update)
 
+    @watched("_update_timer_display")
     def _update_timer_display(self) -> None:
-        """Обновить текст таймера на экране."""
-
-        if self._timer_running:
-            self._elapsed_seconds = time.perf_counter() - self._start_reference
-        self.timer_var.set(self._format_time(self._elapsed_seconds))
-        # Синхронизируем доступность кнопки «Окончание работы» с состоянием таймера
+        """Обновить большой счётчик (таймер выбранной пары) и время в списке таймеров."""
+
+        now = self.timers.now()
+        current = self.timers.get(self._current_key())
+        self.timer_var.set(self._format_time(current.seconds(now) if current is not None else 0.0))
+        for iid, key in self._timer_rows.items():
+            timer = self.timers.get(key)
+            if timer is not None:
+                mark = "" if timer.running else " ⏸"
+                self.timer_list.set(iid, "time", self._format_time(timer.seconds(now)) + mark)
+        running = self.timers.any_running()
+        # Синхронизируем доступность кнопки «Окончание работы» с состоянием таймеров
         try:
             if getattr(self, "_workday_started", False):
-                self._work_end_btn.configure(state=("disabled" if self._timer_running else "normal"))
+                self._work_end_btn.configure(state=("disabled" if running else "normal"))
         except Exception:
             pass
 
@@ -819,11 +1648,27 @@ class TimeTrackerApp(tk.Tk):
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
-def main() -> None:
-    """Точка входа: создать и запустить приложение."""
+def main(argv: Optional[list[str]] = None, lock: Optional[InstanceLock] = None) -> None:
+    """Точка входа: создать и запустить приложение.
 
-    app = TimeTrackerApp()
-    app.mainloop()
+    Необязательный аргумент командной строки — путь к книге. Если приложение
+    уже запущено, ему передаётся этот путь, а новый процесс завершается
+    (`run_timesheet.py` и `python -m timesheet_app` проверяют это ещё до
+    импорта openpyxl и передают сюда занятую блокировку).
+    """
+
+    args = sys.argv[1:] if argv is None else argv
+    path = str(Path(args[0]).resolve()) if args else None
+    if lock is None:
+        lock = claim(path)
+        if lock is None:
+            return
+    try:
+        app = TimeTrackerApp(open_path=path)
+        app.accept_instances(lock)
+        app.mainloop()
+    finally:
+        lock.close()
 
 
 if __name__ == "__main__":
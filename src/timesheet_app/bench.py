@@ -0,0 +1,276 @@
+"""Воспроизводимые замеры производительности на синтетических данных.
+
+Каждая команда строит одинаковые данные заданного размера, повторяет замер
+`--repeat` раз и печатает медиану, минимум и пропускную способность:
+
+- `codec` — разбор строк листа учёта через `codec.TIMESHEET_CODEC`:
+  серийные числа (так значения отдаёт движок "xml") и `datetime`/`timedelta`
+  (так их отдаёт openpyxl);
+- `engines` — движки чтения "xml" и "openpyxl" на операциях приложения:
+  загрузка справочника, проход по истории (`iter_time_entries`) и выгрузка
+  в CSV (`export_rows`);
+- `inflate` — чтение всех листов учёта и рабочего дня движком "xml" с
+  последовательной распаковкой и с фоновой (`parallel_inflate`). Выигрыш
+  возможен только на нескольких ядрах: число ядер печатается вместе с
+  результатом.
+
+Книги для замеров строит `make_workbook` (openpyxl в режиме write-only) во
+временном каталоге; `--workbook` позволяет взять свою книгу вместо неё.
+
+Результаты зависят от машины (частота, число ядер, версия Python), поэтому
+числа в описаниях изменений — лишь пример; сравнивать стоит запуски на одной
+машине.
+
+Запуск:
+    python -m timesheet_app.bench codec [--rows 1000000] [--repeat 5] [--json отчёт.json]
+    python -m timesheet_app.bench engines [--rows 200000 | --workbook книга.xlsx]
+    python -m timesheet_app.bench inflate [--rows 150000 | --workbook книга.xlsx]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from openpyxl import Workbook
+
+from .codec import EXCEL_EPOCH, SECONDS_PER_DAY, TIMESHEET_CODEC, WORKDAY_CODEC
+from .config import sidecar_path
+from .entry_index import INDEX_SUFFIX
+from .excel_manager import (
+    READ_ENGINE_XML,
+    READ_ENGINES,
+    REFERENCE_HEADERS,
+    REFERENCE_SHEET,
+    SUMMARY_HEADERS,
+    SUMMARY_SHEET,
+    TIMESHEET_HEADERS,
+    TIMESHEET_SHEET,
+    WORKDAY_HEADERS,
+    WORKDAY_SHEET,
+    configure,
+    export_rows,
+    iter_time_entries,
+    iter_timesheet_rows,
+    load_reference_index,
+    open_read_only,
+)
+
+
+@dataclass
+class Timing:
+    """Замер одного варианта: время каждого повтора и объём работы за повтор."""
+
+    name: str
+    items: int
+    unit: str
+    seconds: List[float] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        median = statistics.median(self.seconds)
+        return {
+            "name": self.name,
+            "items": self.items,
+            "unit": self.unit,
+            "median_s": round(median, 4),
+            "min_s": round(min(self.seconds), 4),
+            "per_second": round(self.items / median) if median > 0 else None,
+        }
+
+
+def measure(name: str, run: Callable[[], Any], *, items: int, unit: str, repeat: int) -> Timing:
+    """Выполнить `run` `repeat` раз и вернуть время каждого запуска."""
+
+    timing = Timing(name, items, unit)
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        run()
+        timing.seconds.append(time.perf_counter() - begin)
+    return timing
+
+
+def _pair(i: int) -> Tuple[str, str]:
+    return f"Проект {i % 40 + 1}", f"Вид работ {i % 12 + 1}"
+
+
+def _serial_rows(rows: int) -> List[Tuple[Any, ...]]:
+    """Строки листа учёта так, как их отдаёт движок "xml": даты и длительности — числа."""
+
+    result = []
+    for i in range(rows):
+        project, work_type = _pair(i)
+        result.append((45000.0 + i // 20, project, work_type, (300 + i % 3600) / SECONDS_PER_DAY))
+    return result
+
+
+def _typed_rows(rows: int) -> List[Tuple[Any, ...]]:
+    """Те же строки так, как их отдаёт openpyxl: `datetime` и `timedelta`."""
+
+    result = []
+    for i in range(rows):
+        project, work_type = _pair(i)
+        result.append((EXCEL_EPOCH + timedelta(days=45000 + i // 20), project, work_type, timedelta(seconds=300 + i % 3600)))
+    return result
+
+
+def bench_codec(rows: int, repeat: int) -> List[Timing]:
+    """Разбор строк листа учёта кодеком: ячеек в секунду."""
+
+    decode = TIMESHEET_CODEC.decode
+    timings = []
+    for name, data in (("serial", _serial_rows(rows)), ("datetime", _typed_rows(rows))):
+        timings.append(
+            measure(f"codec/{name}", lambda data=data: [decode(row) for row in data], items=rows * 4, unit="ячеек", repeat=repeat)
+        )
+    return timings
+
+
+def make_workbook(path: Path | str, rows: int, *, workdays: Optional[int] = None) -> Path:
+    """Построить книгу шаблона с `rows` записями учёта и `workdays` днями (по умолчанию rows // 2)."""
+
+    path = Path(path)
+    workdays = rows // 2 if workdays is None else workdays
+    wb = Workbook(write_only=True)
+    reference = wb.create_sheet(REFERENCE_SHEET)
+    reference.append(REFERENCE_HEADERS)
+    for i in range(40 * 12):
+        reference.append(list(_pair(i)))
+    timesheet = wb.create_sheet(TIMESHEET_SHEET)
+    timesheet.append(TIMESHEET_HEADERS)
+    first = date(2020, 1, 1)
+    for i in range(rows):
+        project, work_type = _pair(i)
+        timesheet.append([first + timedelta(days=i // 20), project, work_type, timedelta(seconds=300 + i % 3600)])
+    workday = wb.create_sheet(WORKDAY_SHEET)
+    workday.append(WORKDAY_HEADERS)
+    for i in range(workdays):
+        workday.append([first + timedelta(days=i), dt_time(9, i % 60), dt_time(18, i % 60), timedelta(hours=9)])
+    wb.create_sheet(SUMMARY_SHEET).append(SUMMARY_HEADERS)
+    wb.save(path)
+    return path
+
+
+def bench_engines(path: Path, repeat: int) -> List[Timing]:
+    """Движки чтения на операциях приложения: справочник, проход по истории, выгрузка.
+
+    Движок выбирается настройкой модуля (`excel_manager.configure`), как в
+    приложении; после замера возвращается движок по умолчанию.
+    """
+
+    rows = sum(1 for _entry in iter_time_entries(path))
+    timings = []
+    with tempfile.TemporaryDirectory(prefix="timesheet-bench-") as tmp:
+        output = Path(tmp) / "export.csv"
+        try:
+            for engine in READ_ENGINES:
+                configure(read_engine=engine)
+                timings += [
+                    measure(f"reference/{engine}", lambda: load_reference_index(path), items=1, unit="загрузок", repeat=repeat),
+                    measure(
+                        f"iter_time_entries/{engine}",
+                        lambda: sum(1 for _entry in iter_time_entries(path)),
+                        items=rows,
+                        unit="строк",
+                        repeat=repeat,
+                    ),
+                    measure(f"export_rows/{engine}", lambda: export_rows(path, output), items=rows, unit="строк", repeat=repeat),
+                ]
+        finally:
+            configure(read_engine=READ_ENGINE_XML)
+    return timings
+
+
+def _read_history(path: Path, parallel_inflate: bool) -> int:
+    """Разобрать все строки листов учёта и рабочего дня; вернуть их число."""
+
+    wb = open_read_only(path, engine=READ_ENGINE_XML, history=True, parallel_inflate=parallel_inflate)
+    try:
+        decode = TIMESHEET_CODEC.decode
+        count = sum(1 for _sheet, _row, row in iter_timesheet_rows(wb) if decode(row)[0] is not None)
+        if WORKDAY_SHEET in wb.sheetnames:
+            decode = WORKDAY_CODEC.decode
+            rows = wb[WORKDAY_SHEET].iter_rows(min_row=2, max_col=4, values_only=True)
+            count += sum(1 for row in rows if decode(row)[0] is not None)
+        return count
+    finally:
+        wb.close()
+
+
+def bench_inflate(path: Path, repeat: int) -> List[Timing]:
+    """Последовательная и фоновая распаковка листов при чтении всей истории."""
+
+    rows = _read_history(path, False)
+    return [
+        measure(
+            f"history/{name}",
+            lambda parallel=parallel: _read_history(path, parallel),
+            items=rows,
+            unit="строк",
+            repeat=repeat,
+        )
+        for name, parallel in (("sequential", False), ("prefetch", True))
+    ]
+
+
+def _print(timings: List[Timing]) -> None:
+    print(f"{'Замер':<28}{'N':>10}{'медиана, с':>12}{'мин, с':>10}{'в секунду':>14}")
+    for timing in timings:
+        data = timing.as_dict()
+        rate = f"{data['per_second']:,}".replace(",", " ") if data["per_second"] else "?"
+        print(f"{data['name']:<28}{data['items']:>10}{data['median_s']:>12.3f}{data['min_s']:>10.3f}{rate:>14} {data['unit']}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа командной строки."""
+
+    parser = argparse.ArgumentParser(description="Замеры производительности на синтетических данных")
+    parser.add_argument("--repeat", type=int, default=5, help="повторов каждого замера (по умолчанию 5)")
+    parser.add_argument("--json", dest="json_path", default=None, help="сохранить результаты в JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    codec = commands.add_parser("codec", help="разбор значений ячеек кодеком")
+    codec.add_argument("--rows", type=int, default=1_000_000, help="строк листа учёта (по умолчанию 1 000 000)")
+
+    engines = commands.add_parser("engines", help="движки чтения книги: xml и openpyxl")
+    engines.add_argument("--rows", type=int, default=200_000, help="строк учёта в синтетической книге")
+    engines.add_argument("--workbook", default=None, help="своя книга вместо синтетической")
+
+    inflate = commands.add_parser("inflate", help="последовательная и фоновая распаковка листов")
+    inflate.add_argument("--rows", type=int, default=150_000, help="строк учёта в синтетической книге")
+    inflate.add_argument("--workbook", default=None, help="своя книга вместо синтетической")
+
+    args = parser.parse_args(argv)
+    if args.command == "codec":
+        timings = bench_codec(args.rows, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory(prefix="timesheet-bench-") as tmp:
+            path = Path(args.workbook) if args.workbook else make_workbook(Path(tmp) / "bench.xlsx", args.rows)
+            try:
+                timings = (bench_engines if args.command == "engines" else bench_inflate)(path, args.repeat)
+            finally:
+                if not args.workbook:
+                    # индекс дат, который оставила выгрузка временной книги
+                    sidecar_path(path, INDEX_SUFFIX).unlink(missing_ok=True)
+
+    _print(timings)
+    print(f"Ядер: {os.cpu_count()}")
+    if args.json_path:
+        report = {
+            "command": args.command,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "cpu_count": os.cpu_count(),
+            "timings": [timing.as_dict() for timing in timings],
+        }
+        Path(args.json_path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
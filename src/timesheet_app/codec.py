@@ -0,0 +1,300 @@
+"""Преобразование значений ячеек: даты, время и длительности.
+
+Excel и пользователи хранят одно и то же по-разному: дата может прийти как
+`datetime`, `date`, серийное число (дни от 30.12.1899) или текст
+"18.10.2026"; время — как `time`, доля суток или "08:30"; длительность —
+как `timedelta`, доля суток или текст "[h]:mm:ss" вроде "25:30:00".
+
+Серийные даты отсчитываются от эпохи книги: 30.12.1899 или, в книгах с
+`date1904`, 01.01.1904. openpyxl и `xlsx_reader.XlsxReader` отдают её как
+`wb.epoch`; `RowCodec.for_workbook` и `date_decoder` подбирают конвертеры под
+неё.
+
+Нечисловые (nan, inf) и выходящие за пределы Excel значения дают None, как и
+нераспознанные: одна испорченная ячейка не должна ронять сводку или выгрузку.
+
+Модуль даёт единый слой преобразования для всех читателей и писателей
+`excel_manager`. Конвертеры выбираются по точному типу значения через
+словарь (без цепочек isinstance), а `RowCodec` заранее собирает кортеж
+конвертеров для столбцов листа, поэтому разбор строки — это один проход zip.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import re
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+
+# Нулевой день серийных дат Excel (с учётом ошибки 1900 года)
+EXCEL_EPOCH = datetime(1899, 12, 30)
+# Нулевой день в книгах с `<workbookPr date1904="1">` (так их сохраняет Excel для Mac)
+EXCEL_EPOCH_1904 = datetime(1904, 1, 1)
+SECONDS_PER_DAY = 86400
+# Последний день, который умеет Excel (31.12.9999); больше — не дата и не длительность
+MAX_SERIAL = 2958465
+_MAX_SECONDS = (MAX_SERIAL + 1) * SECONDS_PER_DAY
+
+# Форматы ячеек, которые пишет приложение
+DATE_FORMAT = "DD.MM.YYYY"
+TIME_FORMAT = "HH:MM"
+DURATION_FORMAT = "[h]:mm:ss"
+DURATION_HM_FORMAT = "[h]:mm"
+
+_CLOCK_RE = re.compile(r"^\s*(-?\d+):(\d{1,2})(?::(\d{1,2})(?:[.,](\d+))?)?\s*$")
+_DOTTED_DATE_RE = re.compile(r"^\s*(\d{1,2})\.(\d{1,2})\.(\d{4})\s*$")
+_ISO_DATE_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})")
+
+
+def _none(_value: Any) -> None:
+    return None
+
+
+def _clock_seconds(text: str) -> Optional[float]:
+    """Разобрать "ч:мм" или "ч:мм:сс" (часы могут быть больше 24)."""
+
+    match = _CLOCK_RE.match(text)
+    if match is None:
+        return None
+    hours, minutes, seconds, fraction = match.groups()
+    total = int(hours) * 3600 + int(minutes) * 60 + int(seconds or 0)
+    if fraction:
+        total += float(f"0.{fraction}")
+    return _checked_seconds(float(total))
+
+
+def _checked_seconds(seconds: float) -> Optional[float]:
+    """Секунды или None для nan, inf и значений за пределами Excel."""
+
+    return seconds if math.isfinite(seconds) and -_MAX_SECONDS < seconds < _MAX_SECONDS else None
+
+
+# ---------------------------- Длительность (секунды) ----------------------------
+def _duration_from_text(value: str) -> Optional[float]:
+    seconds = _clock_seconds(value)
+    if seconds is not None:
+        return seconds
+    try:
+        return _duration_from_days(float(value.replace(",", ".")))
+    except ValueError:
+        return None
+
+
+def _duration_from_days(value: float) -> Optional[float]:
+    # Доли суток округляем до микросекунд, как openpyxl при переводе в timedelta
+    return _checked_seconds(round(value * SECONDS_PER_DAY, 6)) if math.isfinite(value) else None
+
+
+_DURATION_DECODERS: Dict[type, Callable[[Any], Optional[float]]] = {
+    timedelta: lambda v: v.total_seconds(),
+    float: _duration_from_days,
+    int: lambda v: _checked_seconds(float(v * SECONDS_PER_DAY)),
+    time: lambda v: float(v.hour * 3600 + v.minute * 60 + v.second) + v.microsecond / 1e6,
+    # openpyxl отдаёт длительности до суток в формате "ч:мм" как datetime от эпохи
+    datetime: lambda v: (v - EXCEL_EPOCH).total_seconds(),
+    str: _duration_from_text,
+    type(None): _none,
+}
+
+
+def decode_duration(value: Any) -> Optional[float]:
+    """Длительность в секундах или None, если значение не распознано."""
+
+    decoder = _DURATION_DECODERS.get(type(value))
+    return decoder(value) if decoder is not None else None
+
+
+# ---------------------------------- Дата ----------------------------------
+def _date_from_serial(value: float, epoch: datetime = EXCEL_EPOCH) -> Optional[date]:
+    # Отрицательных дат в Excel нет; nan и inf не проходят сравнения
+    if not 0 <= value < MAX_SERIAL + 1:
+        return None
+    # timedelta округляет до микросекунд: 45000.9999999999 — это уже следующий день
+    try:
+        return (epoch + timedelta(days=value)).date()
+    except OverflowError:  # MAX_SERIAL + 0.9999999999 округляется в 10000 год
+        return None
+
+
+def _date_from_text(value: str) -> Optional[date]:
+    match = _DOTTED_DATE_RE.match(value)
+    if match is not None:
+        day, month, year = match.groups()
+        try:
+            return date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+    match = _ISO_DATE_RE.match(value)
+    if match is not None:
+        try:
+            return date(*(int(part) for part in match.groups()))
+        except ValueError:
+            return None
+    return None
+
+
+_DATE_DECODERS: Dict[type, Callable[[Any], Optional[date]]] = {
+    datetime: datetime.date,
+    date: lambda v: v,
+    float: _date_from_serial,
+    int: _date_from_serial,
+    str: _date_from_text,
+    type(None): _none,
+}
+
+
+def decode_date(value: Any) -> Optional[date]:
+    """Дата из любого представления Excel или None."""
+
+    decoder = _DATE_DECODERS.get(type(value))
+    return decoder(value) if decoder is not None else None
+
+
+def date_decoder(epoch: datetime = EXCEL_EPOCH) -> Callable[[Any], Optional[date]]:
+    """`decode_date` для книги с эпохой `epoch` (см. `workbook_epoch`)."""
+
+    return _decoders(epoch)["date"]
+
+
+# ---------------------------------- Время ----------------------------------
+def _time_from_seconds(seconds: Optional[float]) -> Optional[time]:
+    if seconds is None:
+        return None
+    # Точность — микросекунды, как у openpyxl при чтении долей суток
+    micros = int(round(seconds * 1_000_000)) % (SECONDS_PER_DAY * 1_000_000)
+    whole, micros = divmod(micros, 1_000_000)
+    hours, rest = divmod(whole, 3600)
+    minutes, secs = divmod(rest, 60)
+    return time(hours, minutes, secs, micros)
+
+
+_TIME_DECODERS: Dict[type, Callable[[Any], Optional[time]]] = {
+    time: lambda v: v,
+    datetime: datetime.time,
+    float: lambda v: _time_from_seconds((v % 1) * SECONDS_PER_DAY) if math.isfinite(v) else None,
+    int: lambda v: time(0, 0),
+    str: lambda v: _time_from_seconds(_clock_seconds(v)),
+    timedelta: lambda v: _time_from_seconds(v.total_seconds()),
+    type(None): _none,
+}
+
+
+def decode_time(value: Any) -> Optional[time]:
+    """Время суток из любого представления Excel или None."""
+
+    decoder = _TIME_DECODERS.get(type(value))
+    return decoder(value) if decoder is not None else None
+
+
+# ---------------------------------- Текст ----------------------------------
+def decode_text(value: Any) -> Optional[str]:
+    """Строка без пробелов по краям; пустая строка превращается в None."""
+
+    if value is None:
+        return None
+    text = value.strip() if type(value) is str else str(value).strip()
+    return text or None
+
+
+DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "date": decode_date,
+    "time": decode_time,
+    "duration": decode_duration,
+    "text": decode_text,
+}
+
+
+def workbook_epoch(wb: Any) -> datetime:
+    """Эпоха серийных дат книги openpyxl или `XlsxReader`."""
+
+    return getattr(wb, "epoch", EXCEL_EPOCH)
+
+
+@functools.lru_cache(maxsize=None)
+def _decoders(epoch: datetime) -> Dict[str, Callable[[Any], Any]]:
+    """`DECODERS` для другой эпохи: от неё зависят серийные даты и длительности-`datetime`."""
+
+    if epoch == EXCEL_EPOCH:
+        return DECODERS
+    dates = dict(_DATE_DECODERS)
+    dates[float] = dates[int] = functools.partial(_date_from_serial, epoch=epoch)
+    durations = dict(_DURATION_DECODERS)
+    durations[datetime] = lambda v: (v - epoch).total_seconds()
+
+    def decode_epoch_date(value: Any) -> Optional[date]:
+        decoder = dates.get(type(value))
+        return decoder(value) if decoder is not None else None
+
+    def decode_epoch_duration(value: Any) -> Optional[float]:
+        decoder = durations.get(type(value))
+        return decoder(value) if decoder is not None else None
+
+    return {**DECODERS, "date": decode_epoch_date, "duration": decode_epoch_duration}
+
+
+class RowCodec:
+    """Набор конвертеров для столбцов листа, собранный один раз."""
+
+    def __init__(self, kinds: Sequence[str], epoch: datetime = EXCEL_EPOCH) -> None:
+        self.kinds: Tuple[str, ...] = tuple(kinds)
+        self.epoch = epoch
+        decoders = _decoders(epoch)
+        self._decoders = tuple(decoders[kind] for kind in self.kinds)
+        self.width = len(self.kinds)
+        self._by_epoch: Dict[datetime, RowCodec] = {epoch: self}
+
+    def for_workbook(self, wb: Any) -> "RowCodec":
+        """Тот же набор столбцов для эпохи книги `wb` (обычно — этот же кодек)."""
+
+        epoch = workbook_epoch(wb)
+        codec = self._by_epoch.get(epoch)
+        if codec is None:
+            codec = self._by_epoch[epoch] = RowCodec(self.kinds, epoch)
+        return codec
+
+    def decode(self, row: Sequence[Any]) -> Tuple[Any, ...]:
+        """Преобразовать сырые значения строки (лишние столбцы отбрасываются)."""
+
+        if len(row) < self.width:
+            row = tuple(row) + (None,) * (self.width - len(row))
+        return tuple(decoder(value) for decoder, value in zip(self._decoders, row))
+
+
+# Раскладки листов учёта: Дата, Проект, Вид работ, Длительность и
+# Дата, Время начала, Время окончания, Длительность
+TIMESHEET_CODEC = RowCodec(("date", "text", "text", "duration"))
+WORKDAY_CODEC = RowCodec(("date", "time", "time", "duration"))
+
+
+# -------------------------------- Запись --------------------------------
+def write_cell(cell, value: Any, number_format: Optional[str] = None) -> None:
+    """Записать значение в ячейку openpyxl и (если задан) формат отображения."""
+
+    cell.value = value
+    if number_format is not None:
+        try:
+            cell.number_format = number_format
+        except Exception:
+            pass
+
+
+def write_date(cell, value: date) -> None:
+    write_cell(cell, value.date() if isinstance(value, datetime) else value, DATE_FORMAT)
+
+
+def write_time(cell, value: time) -> None:
+    write_cell(cell, value, TIME_FORMAT)
+
+
+def write_duration(cell, seconds: float, number_format: str = DURATION_FORMAT) -> None:
+    write_cell(cell, timedelta(seconds=seconds), number_format)
+
+
+def format_hm(seconds: float) -> str:
+    """Строка "ЧЧ:ММ" для сообщений (минуты отбрасываются вниз)."""
+
+    minutes = int(seconds // 60)
+    hours, mins = divmod(minutes, 60)
+    return f"{hours:02d}:{mins:02d}"
@@ -2,14 +2,133 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass, asdict
+import os
+import secrets
+import stat
+from dataclasses import dataclass, asdict, field, fields
 from pathlib import Path
-from typing import Optional
+from typing import IO, Callable, List, Optional
 
 
 APP_DIR = Path.home() / ".timesheet_app"
 CONFIG_FILE = APP_DIR / "config.json"
+REFERENCE_CACHE_FILE = APP_DIR / "reference_cache.json"
+CACHE_DIR = APP_DIR / "cache"
+
+# How many recently used workbooks to remember
+RECENT_FILES_LIMIT = 5
+
+
+def atomic_write(path: Path, write: Callable[[IO[bytes]], None], *, mode: Optional[int] = None) -> None:
+    """Write a file so that readers see either the old or the new content.
+
+    ``write`` receives a binary file object for a temporary file in the same
+    directory; the data is then flushed to disk and the temporary file is
+    renamed over the target, so a crash or a full disk mid-write cannot leave
+    a truncated file behind. The target keeps its permission bits; a new
+    file gets the usual mode for the process umask.
+
+    An explicit ``mode`` (e.g. ``0o600`` for a file holding a secret) is
+    applied to the temporary file from the moment it is created and replaces
+    the bits of an existing target.
+    """
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if mode is None:
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            mode = None
+        fd, tmp_name = _create_temp(path.parent, path.name)
+    else:
+        fd, tmp_name = _create_temp(path.parent, path.name, mode)
+    try:
+        with os.fdopen(fd, "w+b") as fh:
+            write(fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path.parent)
+
+
+def _create_temp(directory: Path, name: str, mode: int = 0o666) -> tuple[int, str]:
+    """Create a unique temporary file next to the target.
+
+    Unlike ``tempfile.mkstemp`` (mode 0600) the file is opened with mode 0666
+    by default, so the kernel applies the process umask exactly as for any new
+    file; the umask itself is never read or changed, which would race with
+    other threads.
+    """
+
+    flags = os.O_RDWR | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0) | getattr(os, "O_NOINHERIT", 0)
+    for _attempt in range(100):
+        tmp_name = str(directory / f".{name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(tmp_name, flags, mode), tmp_name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No free temporary file name for {directory / name}")
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Persist a rename on POSIX; directories cannot be opened on Windows."""
+
+    if os.name != "posix":
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_text(path: Path, text: str, *, mode: Optional[int] = None) -> None:
+    """Write UTF-8 text atomically (see :func:`atomic_write`)."""
+
+    data = text.encode("utf-8")
+    atomic_write(path, lambda fh: fh.write(data), mode=mode)
+
+
+def file_stamp(path: Path | str) -> Optional[tuple[int, int]]:
+    """Return ``(mtime_ns, size)`` of a file, or None when it does not exist.
+
+    Caches derived from a workbook store this stamp to notice external edits.
+    """
+
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def sidecar_path(workbook: Path | str, suffix: str) -> Path:
+    """Path of a helper file kept next to the app settings for a given workbook.
+
+    Sidecars live under ``CACHE_DIR`` rather than beside the workbook, so the
+    user's folder stays clean; the name combines the workbook stem with a hash
+    of its absolute path to keep same-named files apart.
+    """
+
+    resolved = Path(workbook).resolve()
+    digest = hashlib.sha1(str(resolved).encode("utf-8")).hexdigest()[:12]
+    return CACHE_DIR / f"{resolved.stem}-{digest}{suffix}"
 
 
 @dataclass
@@ -17,6 +136,29 @@ class AppConfig:
     """Persisted configuration."""
 
     excel_path: Optional[str] = None
+    recent_files: List[str] = field(default_factory=list)
+    # Write time entries to per-month sheets ("Учет времени 2026-10")
+    monthly_sheets: bool = False
+    # Merge same-day entries of one project/work type when the workday ends
+    compact_on_day_close: bool = False
+    # Offer only the work types paired with the selected project on the reference sheet
+    work_types_by_project: bool = False
+    # Reader for read-only workbook access: "xml" (direct XML parsing) or "openpyxl"
+    read_engine: str = "xml"
+    # Inflate history sheets in background threads while parsing (helps on multi-core machines)
+    parallel_inflate: bool = False
+    # Zip compression of saved workbooks: 0 = stored, 1..9 = deflate level
+    save_compress_level: int = 6
+    # Level for the timesheet sheets only (the largest parts); None = same as above
+    hot_sheet_compress_level: Optional[int] = None
+    # Write a hidden entry-ID column (E) so that a retried write never duplicates a row
+    entry_ids: bool = False
+    # Central time database: entries are also POSTed here in batches (None = off)
+    sync_url: Optional[str] = None
+    # Bearer token for sync_url, if the server requires one
+    sync_token: Optional[str] = None
+    # Record a trace of window operations for the replay tool (also TIMESHEET_RECORD=1)
+    record_trace: bool = False
 
     @classmethod
     def load(cls) -> "AppConfig":
@@ -25,14 +167,26 @@ class AppConfig:
         if CONFIG_FILE.exists():
             try:
                 data = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-                return cls(**data)
-            except (json.JSONDecodeError, TypeError, ValueError):
+                # Ignore keys written by other versions of the application.
+                known = {f.name for f in fields(cls)}
+                config = cls(**{key: value for key, value in data.items() if key in known})
+                if config.excel_path and config.excel_path not in config.recent_files:
+                    config.recent_files.insert(0, config.excel_path)
+                return config
+            except (json.JSONDecodeError, TypeError, ValueError, AttributeError):
                 # Fall back to defaults if the file is corrupted.
                 pass
         return cls()
 
+    def remember_file(self, path: str) -> None:
+        """Make `path` the current workbook and move it to the top of the MRU list."""
+
+        self.excel_path = path
+        self.recent_files = [path] + [p for p in self.recent_files if p != path]
+        del self.recent_files[RECENT_FILES_LIMIT:]
+
     def save(self) -> None:
         """Persist configuration to disk."""
 
-        APP_DIR.mkdir(parents=True, exist_ok=True)
-        CONFIG_FILE.write_text(json.dumps(asdict(self), ensure_ascii=False, indent=2), encoding="utf-8")
+        # Owner-only: the file holds the sync server token
+        atomic_write_text(CONFIG_FILE, json.dumps(asdict(self), ensure_ascii=False, indent=2), mode=0o600)
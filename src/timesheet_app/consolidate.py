@@ -0,0 +1,208 @@
+"""Сводный отчёт по книгам сотрудников.
+
+Каждый сотрудник ведёт свою книгу (структура как у `create_template`).
+Команда проходит по каталогу с книгами, разбирает листы "Учет времени"
+(включая помесячные) и "Учет рабочего времени" в пуле процессов (чтение в режиме read-only),
+сливает частичные итоги и записывает одну сводную книгу. Если для книги есть
+актуальный двоичный снимок истории (см. `snapshot`), записи учёта берутся из
+него без разбора XML.
+
+Запуск:
+    python -m timesheet_app.consolidate <каталог> <сводка.xlsx> [--workers N] [--engine xml|openpyxl] [--parallel-inflate]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from openpyxl import Workbook
+
+from .codec import TIMESHEET_CODEC, WORKDAY_CODEC
+from .excel_manager import READ_ENGINES, WORKDAY_SHEET, iter_timesheet_rows, open_read_only
+from .snapshot import HistorySnapshot, record_seconds
+
+
+SUMMARY_SHEET = "Сводка"
+WORKDAY_SUMMARY_SHEET = "Рабочее время"
+TIMINGS_SHEET = "Файлы"
+
+
+@dataclass
+class PartialAggregate:
+    """Частичные итоги по одной книге (результат рабочего процесса)."""
+
+    employee: str
+    path: str
+    # (проект, вид работ) -> [число записей, секунды]
+    entries: Dict[Tuple[str, str], List[float]] = field(default_factory=dict)
+    # дата -> секунды рабочего дня
+    workdays: Dict[date, float] = field(default_factory=dict)
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class ConsolidationReport:
+    """Итог консолидации: слитые данные и время обработки каждого файла."""
+
+    files: List[PartialAggregate]
+    elapsed: float
+
+    @property
+    def total_rows(self) -> int:
+        return sum(part.rows for part in self.files)
+
+
+def parse_workbook(path: str, engine: Optional[str] = None, parallel_inflate: bool = False) -> PartialAggregate:
+    """Разобрать одну книгу сотрудника и вернуть частичные итоги.
+
+    Выполняется в рабочем процессе, поэтому ошибки не выбрасываются, а
+    сохраняются в поле `error` — одна битая книга не должна срывать отчёт.
+    """
+
+    started = time.perf_counter()
+    part = PartialAggregate(employee=Path(path).stem, path=path)
+    try:
+        snapshot = HistorySnapshot.load(path)
+        if snapshot is not None and not snapshot.is_current():
+            snapshot = None
+        if snapshot is not None:
+            for pair, (count, seconds) in snapshot.totals_by_pair().items():
+                part.entries[pair] = [count, float(seconds)]
+                part.rows += count
+        wb = open_read_only(path, engine=engine, history=snapshot is None, parallel_inflate=parallel_inflate)
+        try:
+            # Основной лист и помесячные листы учёта времени, если они есть.
+            # Считаются только строки с датой, а секунды округляются по записи —
+            # как в снимке истории, чтобы итоги не зависели от того, был ли снимок
+            decode = TIMESHEET_CODEC.for_workbook(wb).decode
+            rows = iter_timesheet_rows(wb) if snapshot is None else iter(())
+            for _sheet_name, _row_idx, row in rows:
+                day, project, work_type, duration = decode(row)
+                if day is None:
+                    continue
+                bucket = part.entries.setdefault((project or "", work_type or ""), [0, 0.0])
+                bucket[0] += 1
+                bucket[1] += record_seconds(duration)
+                part.rows += 1
+            if WORKDAY_SHEET in wb.sheetnames:
+                decode = WORKDAY_CODEC.for_workbook(wb).decode
+                for row in wb[WORKDAY_SHEET].iter_rows(min_row=2, max_col=4, values_only=True):
+                    day, _start, _end, duration = decode(row)
+                    if day is None:
+                        continue
+                    part.workdays[day] = part.workdays.get(day, 0.0) + (duration or 0.0)
+                    part.rows += 1
+        finally:
+            wb.close()
+    except Exception as exc:  # pylint: disable=broad-except
+        part.error = f"{type(exc).__name__}: {exc}"
+    part.seconds = time.perf_counter() - started
+    return part
+
+
+def consolidate_directory(
+    directory: Path | str,
+    output: Path | str,
+    *,
+    workers: Optional[int] = None,
+    engine: Optional[str] = None,
+    parallel_inflate: bool = False,
+) -> ConsolidationReport:
+    """Собрать все книги `*.xlsx` из каталога в одну сводную книгу.
+
+    `engine` — движок чтения (см. `excel_manager.READ_ENGINES`), а
+    `parallel_inflate` — распаковка листов в фоновых потоках (см.
+    `excel_manager.open_read_only`); передаются рабочим процессам явно, так
+    как настройки модуля в них не наследуются.
+    """
+
+    source_dir = Path(directory)
+    if not source_dir.is_dir():
+        raise FileNotFoundError(f"Directory not found: {source_dir}")
+    output_path = Path(output).resolve()
+
+    paths = sorted(
+        str(p)
+        for p in source_dir.glob("*.xlsx")
+        # Временные файлы Excel (~$...) и сама сводка в разбор не попадают
+        if not p.name.startswith("~$") and p.resolve() != output_path
+    )
+
+    started = time.perf_counter()
+    parts: List[PartialAggregate] = []
+    if paths:
+        max_workers = min(workers or os.cpu_count() or 1, len(paths))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(parse_workbook, p, engine, parallel_inflate) for p in paths]
+            for future in as_completed(futures):
+                parts.append(future.result())
+    parts.sort(key=lambda part: part.path)
+
+    _write_summary(output_path, parts)
+    return ConsolidationReport(files=parts, elapsed=time.perf_counter() - started)
+
+
+def _write_summary(path: Path, parts: List[PartialAggregate]) -> None:
+    """Записать сводную книгу (write-only, строки уходят на диск потоком)."""
+
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet(SUMMARY_SHEET)
+    ws.append(["Сотрудник", "Проект", "Вид работ", "Записей", "Длительность, ч"])
+    totals: Dict[Tuple[str, str], List[float]] = {}
+    for part in parts:
+        for (project, work_type), (count, seconds) in sorted(part.entries.items()):
+            ws.append([part.employee, project, work_type, count, round(seconds / 3600, 2)])
+            bucket = totals.setdefault((project, work_type), [0, 0.0])
+            bucket[0] += count
+            bucket[1] += seconds
+    for (project, work_type), (count, seconds) in sorted(totals.items()):
+        ws.append(["Итого", project, work_type, count, round(seconds / 3600, 2)])
+
+    ws_wd = wb.create_sheet(WORKDAY_SUMMARY_SHEET)
+    ws_wd.append(["Сотрудник", "Дата", "Длительность, ч"])
+    for part in parts:
+        for day, seconds in sorted(part.workdays.items()):
+            ws_wd.append([part.employee, day, round(seconds / 3600, 2)])
+
+    ws_files = wb.create_sheet(TIMINGS_SHEET)
+    ws_files.append(["Файл", "Строк", "Время обработки, с", "Ошибка"])
+    for part in parts:
+        ws_files.append([Path(part.path).name, part.rows, round(part.seconds, 3), part.error or ""])
+
+    wb.save(path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа командной строки."""
+
+    parser = argparse.ArgumentParser(description="Сводный отчёт по книгам учёта времени")
+    parser.add_argument("directory", help="каталог с книгами сотрудников")
+    parser.add_argument("output", help="путь к сводной книге .xlsx")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument("--engine", choices=READ_ENGINES, default=None, help="движок чтения книг (по умолчанию xml)")
+    parser.add_argument(
+        "--parallel-inflate", action="store_true", help="распаковывать листы книги в фоновых потоках во время разбора"
+    )
+    args = parser.parse_args(argv)
+
+    report = consolidate_directory(
+        args.directory, args.output, workers=args.workers, engine=args.engine, parallel_inflate=args.parallel_inflate
+    )
+    for part in report.files:
+        status = f"ошибка: {part.error}" if part.error else f"{part.rows} строк"
+        print(f"{Path(part.path).name}: {part.seconds:.3f} с, {status}")
+    print(f"Итого: {len(report.files)} файлов, {report.total_rows} строк за {report.elapsed:.3f} с")
+
+
+if __name__ == "__main__":
+    main()
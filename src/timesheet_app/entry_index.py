@@ -0,0 +1,210 @@
+"""Индекс «дата → диапазон строк» для листов учёта.
+
+Компактный файл рядом с настройками приложения (см. `config.sidecar_path`)
+хранит для каждого листа учёта времени и листа рабочего дня, в каких строках
+лежат записи каждой даты, стек последних добавленных записей для отмены и
+множество идентификаторов записей из скрытого столбца «ID записи» (по нему
+повторная запись той же сессии отбрасывается за O(1)). Индекс обновляется
+при каждой записи через `excel_manager`; если книгу меняли в обход
+приложения (не совпал размер/время изменения файла), индекс перестраивается
+одним проходом по листам.
+
+Каждое изменение дня листа (запись, правка, удаление, отмена, сжатие)
+получает номер из монотонного счётчика `seq`; по нему выгрузка отбирает дни,
+изменённые после прошлой выгрузки (см. `changed_since`). Перестройка индекса
+помечает изменёнными все дни — что поменяли вне приложения, неизвестно.
+"""
+
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from .config import atomic_write_text, file_stamp, sidecar_path
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import atomic_write_text, file_stamp, sidecar_path  # type: ignore
+
+
+INDEX_SUFFIX = ".index.json"
+
+# Сколько последних записей можно отменить подряд
+UNDO_DEPTH = 20
+
+
+class EntryIndex:
+    """Диапазоны строк по датам для одной книги."""
+
+    def __init__(self, workbook_path: Path | str) -> None:
+        self.workbook_path = Path(workbook_path)
+        # лист -> дата ISO -> [первая строка, последняя строка]
+        self.sheets: Dict[str, Dict[str, List[int]]] = {}
+        # стек добавленных записей: [лист, строка]
+        self.recent: List[List[Any]] = []
+        # идентификаторы записей, которые есть в листах учёта
+        self.ids: Set[str] = set()
+        # номер последнего изменения и номер изменения каждого дня: лист -> дата ISO -> seq;
+        # `epoch` меняется, только если индекс создан заново и прежние номера потеряны
+        self.epoch = uuid.uuid4().hex
+        self.seq = 0
+        self.changes: Dict[str, Dict[str, int]] = {}
+        self.stamp: Optional[Tuple[int, int]] = None
+
+    @property
+    def sidecar(self) -> Path:
+        return sidecar_path(self.workbook_path, INDEX_SUFFIX)
+
+    @classmethod
+    def load(cls, workbook_path: Path | str) -> "EntryIndex":
+        """Прочитать индекс с диска (пустой, если файла нет или он повреждён)."""
+
+        index = cls(workbook_path)
+        try:
+            data = json.loads(index.sidecar.read_text(encoding="utf-8"))
+            index.sheets = {sheet: dict(days) for sheet, days in data["sheets"].items()}
+            index.recent = list(data.get("recent", []))
+            index.ids = set(data.get("ids", []))
+            stamp = data.get("stamp")
+            index.stamp = tuple(stamp) if stamp else None  # type: ignore[assignment]
+            if data.get("epoch"):
+                index.epoch = str(data["epoch"])
+                index.seq = int(data.get("seq", 0))
+                index.changes = {sheet: dict(days) for sheet, days in data.get("changes", {}).items()}
+            else:
+                index.stamp = None  # индекс без номеров изменений перестраивается
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+            index = cls(workbook_path)
+        return index
+
+    def is_current(self) -> bool:
+        """Индекс соответствует книге на диске (её не меняли в обход приложения)."""
+
+        return self.stamp is not None and file_stamp(self.workbook_path) == self.stamp
+
+    def rebuild(
+        self, rows: Iterable[Tuple[str, int, Optional[date], Optional[str]]], *, keep_changes: bool = False
+    ) -> None:
+        """Построить индекс заново по строкам (лист, номер строки, дата, ID записи).
+
+        В поле ID может быть несколько ID через пробел (строка, слитая при сжатии).
+
+        Все дни — и прежние, и найденные — помечаются изменёнными; с
+        `keep_changes=True` (строки лишь сдвинулись внутри приложения, например
+        при сжатии) номера изменений дней не трогаются.
+        """
+
+        previous = self.sheets
+        self.sheets = {}
+        self.recent = []
+        self.ids = set()
+        for sheet, row, day, entry_id in rows:
+            if day is not None:
+                self._add(sheet, day, row, entry_id)
+        if keep_changes:
+            return
+        self.seq += 1
+        for source in (previous, self.sheets, dict(self.changes)):
+            for sheet, days in source.items():
+                marks = self.changes.setdefault(sheet, {})
+                for key in days:
+                    marks[key] = self.seq
+
+    def record(
+        self, sheet: str, day: date, row: int, *, undoable: bool = True, entry_id: Optional[str] = None
+    ) -> None:
+        """Учесть строку `row` листа `sheet` с датой `day` (и её ID, если есть)."""
+
+        self._add(sheet, day, row, entry_id)
+        self.touch(sheet, day)
+        if undoable:
+            self.recent.append([sheet, row])
+            del self.recent[:-UNDO_DEPTH]
+
+    def touch(self, sheet: str, day: date) -> None:
+        """Отметить, что строки дня `day` листа `sheet` изменились."""
+
+        self.seq += 1
+        self.changes.setdefault(sheet, {})[day.isoformat()] = self.seq
+
+    def _add(self, sheet: str, day: date, row: int, entry_id: Optional[str]) -> None:
+        days = self.sheets.setdefault(sheet, {})
+        key = day.isoformat()
+        bounds = days.get(key)
+        if bounds is None:
+            days[key] = [row, row]
+        else:
+            bounds[0] = min(bounds[0], row)
+            bounds[1] = max(bounds[1], row)
+        if entry_id:
+            self.ids.update(entry_id.split())
+
+    def forget(self, sheet: str, row: int, *, entry_id: Optional[str] = None) -> None:
+        """Убрать строку из стека отмены (строку удалили или правили вручную)."""
+
+        self.recent = [item for item in self.recent if item != [sheet, row]]
+        if entry_id:
+            self.ids.difference_update(entry_id.split())
+
+    def pop_recent(self) -> Optional[Tuple[str, int]]:
+        """Снять с вершины стека последнюю добавленную запись."""
+
+        if not self.recent:
+            return None
+        sheet, row = self.recent.pop()
+        return sheet, int(row)
+
+    def rows_for(self, day: date, sheets: Optional[Iterable[str]] = None) -> Dict[str, Tuple[int, int]]:
+        """Диапазоны строк с датой `day` по листам (все листы или перечисленные)."""
+
+        key = day.isoformat()
+        wanted = set(sheets) if sheets is not None else None
+        result: Dict[str, Tuple[int, int]] = {}
+        for sheet, days in self.sheets.items():
+            if wanted is not None and sheet not in wanted:
+                continue
+            bounds = days.get(key)
+            if bounds is not None:
+                result[sheet] = (bounds[0], bounds[1])
+        return result
+
+    @property
+    def watermark(self) -> str:
+        """Водяной знак выгрузки: все изменения до текущего включительно."""
+
+        return f"{self.epoch}:{self.seq}"
+
+    def changed_since(self, watermark: Optional[str]) -> Optional[Dict[str, Dict[str, int]]]:
+        """Дни, изменённые после `watermark`: лист -> дата ISO -> номер изменения.
+
+        None — нужна полная выгрузка: знака нет или он выдан другим
+        индексом (файл индекса удалили или он был повреждён).
+        """
+
+        epoch, _sep, seq = (watermark or "").partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        since = int(seq)
+        result: Dict[str, Dict[str, int]] = {}
+        for sheet, days in self.changes.items():
+            changed = {key: mark for key, mark in days.items() if mark > since}
+            if changed:
+                result[sheet] = changed
+        return result
+
+    def save(self) -> None:
+        """Сохранить индекс, привязав его к текущему состоянию файла книги."""
+
+        self.stamp = file_stamp(self.workbook_path)
+        payload = {
+            "stamp": list(self.stamp) if self.stamp else None,
+            "sheets": self.sheets,
+            "recent": self.recent,
+            "ids": sorted(self.ids),
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "changes": self.changes,
+        }
+        atomic_write_text(self.sidecar, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
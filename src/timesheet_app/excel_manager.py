@@ -2,72 +2,288 @@
 
 Содержит:
 - константы имён листов;
-- загрузку справочников (проекты и виды работ);
-- добавление записи о затраченном времени;
-- создание шаблонной книги с нужными листами и заголовками.
+- загрузку справочников (проекты, виды работ и их допустимые сочетания);
+- добавление записей о затраченном времени (по одной и пакетом);
+- создание шаблонной книги с нужными листами и заголовками;
+- поддержку листа "Итоги" (суммы по дням и по проектам за месяц);
+- помесячные листы учёта времени ("Учет времени 2026-10") по желанию;
+- правку записей за день и отмену последней записи (через индекс дат);
+- сжатие листов учёта: слияние дробных записей одного дня, проекта и вида работ;
+- двоичный снимок истории для быстрых отчётов (см. `snapshot`);
+- потоковую выгрузку листов учёта в CSV/JSONL;
+- выбор движка чтения: прямой разбор XML (`xlsx_reader`) или openpyxl;
+- атомарное сохранение книги (временный файл + fsync + переименование)
+  с настраиваемым уровнем сжатия zip;
+- замеры этапов операций (см. `metrics`, включаются `TIMESHEET_METRICS=1`).
 """
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import csv
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone
 from pathlib import Path
-from typing import Iterable, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
+
+try:
+    from .codec import (
+        DURATION_HM_FORMAT,
+        TIMESHEET_CODEC,
+        WORKDAY_CODEC,
+        RowCodec,
+        date_decoder,
+        decode_date,
+        decode_duration,
+        decode_text,
+        decode_time,
+        format_hm,
+        write_cell,
+        write_date,
+        write_duration,
+        write_time,
+        workbook_epoch,
+    )
+    from . import metrics
+    from .config import atomic_write
+    from .entry_index import EntryIndex
+    from .reference_index import ReferenceIndex
+    from .snapshot import HistorySnapshot, SnapshotOverflow
+    from .xlsx_reader import XlsxFormatError, XlsxReader
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from codec import (  # type: ignore
+        DURATION_HM_FORMAT,
+        TIMESHEET_CODEC,
+        WORKDAY_CODEC,
+        RowCodec,
+        date_decoder,
+        decode_date,
+        decode_duration,
+        decode_text,
+        decode_time,
+        format_hm,
+        write_cell,
+        write_date,
+        write_duration,
+        write_time,
+        workbook_epoch,
+    )
+    import metrics  # type: ignore
+    from config import atomic_write  # type: ignore
+    from entry_index import EntryIndex  # type: ignore
+    from reference_index import ReferenceIndex  # type: ignore
+    from snapshot import HistorySnapshot, SnapshotOverflow  # type: ignore
+    from xlsx_reader import XlsxFormatError, XlsxReader  # type: ignore
 
 
 # Имена листов в книге Excel
 REFERENCE_SHEET = "Справочник"
 TIMESHEET_SHEET = "Учет времени"
 WORKDAY_SHEET = "Учет рабочего времени"
+SUMMARY_SHEET = "Итоги"
+
+# Заголовки листов (их же пишет шаблон)
+REFERENCE_HEADERS = ["Проект", "Вид работ"]
+TIMESHEET_HEADERS = ["Дата", "Проект", "Вид работ", "Длительность"]
+WORKDAY_HEADERS = ["Дата", "Время начала", "Время окончания", "Длительность"]
+
+# Необязательный скрытый столбец листов учёта времени: ID записи (появляется с первой записью с ID)
+ENTRY_ID_COLUMN = 5
+ENTRY_ID_HEADER = "ID записи"
+
+# Помесячные листы учёта времени: "Учет времени 2026-10"
+_SHARD_RE = re.compile(rf"^{re.escape(TIMESHEET_SHEET)} (\d{{4}}-\d{{2}})$")
+
+# Разделы листа итогов
+SUMMARY_HEADERS = ["Раздел", "Период", "Проект", "Длительность"]
+SUMMARY_DAY = "День"
+SUMMARY_WORKDAY = "Рабочий день"
+SUMMARY_PROJECT_MONTH = "Проект за месяц"
+
+
+# Движки чтения для операций только на чтение (справочник, отчёты, выгрузка)
+READ_ENGINE_XML = "xml"
+READ_ENGINE_OPENPYXL = "openpyxl"
+READ_ENGINES = (READ_ENGINE_XML, READ_ENGINE_OPENPYXL)
+
+_read_engine = READ_ENGINE_XML
+# Распаковывать листы истории в фоновых потоках параллельно с разбором (движок xml)
+_parallel_inflate = False
+
+# Сжатие при сохранении: 0 — без сжатия (stored), 1..9 — уровень deflate.
+# 6 — уровень zlib по умолчанию, как у `Workbook.save`.
+DEFAULT_COMPRESS_LEVEL = 6
+_compress_level = DEFAULT_COMPRESS_LEVEL
+# Отдельный уровень для листов учёта времени (самые большие части книги)
+_hot_sheet_level: Optional[int] = None
+
+_UNSET: Any = object()
 
 
 class ExcelStructureError(RuntimeError):
     """Структура книги Excel не соответствует ожиданиям."""
 
 
-def _normalise(values: Iterable[str | None]) -> List[str]:
-    """Очистка и нормализация значений (удаляем пустые, дубликаты)."""
+def _check_level(level: int) -> int:
+    if not isinstance(level, int) or not 0 <= level <= 9:
+        raise ValueError(f"Compression level must be an integer 0..9, got {level!r}")
+    return level
 
-    items: List[str] = []
-    for value in values:
-        if value is None:
-            continue
-        text = str(value).strip()
-        if text and text not in items:
-            items.append(text)
-    return items
 
+def configure(
+    *,
+    read_engine: Optional[str] = None,
+    compress_level: Optional[int] = None,
+    hot_sheet_level: Optional[int] = _UNSET,
+    parallel_inflate: Optional[bool] = None,
+) -> None:
+    """Настроить модуль (приложение вызывает при запуске по `AppConfig`).
+
+    `compress_level` — сжатие всех частей книги при сохранении, а
+    `hot_sheet_level` — только листов учёта времени (None — как у остальных).
+    `parallel_inflate` — см. `open_read_only`. Не переданные параметры не меняются.
+    """
+
+    global _read_engine, _compress_level, _hot_sheet_level, _parallel_inflate
+    if read_engine is not None:
+        if read_engine not in READ_ENGINES:
+            raise ValueError(f"Unknown read engine: {read_engine!r}. Expected one of: {', '.join(READ_ENGINES)}")
+        _read_engine = read_engine
+    if compress_level is not None:
+        _compress_level = _check_level(compress_level)
+    if hot_sheet_level is not _UNSET:
+        _hot_sheet_level = None if hot_sheet_level is None else _check_level(hot_sheet_level)
+    if parallel_inflate is not None:
+        _parallel_inflate = bool(parallel_inflate)
+
+
+def open_read_only(
+    path: Path | str,
+    *,
+    engine: Optional[str] = None,
+    history: bool = False,
+    parallel_inflate: Optional[bool] = None,
+):
+    """Открыть книгу только для чтения значений выбранным движком.
+
+    Движок "xml" читает XML листов напрямую (даты приходят серийными
+    числами — их понимает `codec`); если файл ему не по силам, используется
+    openpyxl в режиме read-only. Результат закрывается через `close()`.
+
+    `history=True` — вызывающий прочитает все листы учёта и рабочего дня.
+    Тогда с `parallel_inflate` (по умолчанию — настройка модуля) их
+    распаковка сразу начинается в фоновых потоках (`XlsxReader.prefetch`).
+    """
+
+    with metrics.span("open"):
+        if (engine or _read_engine) == READ_ENGINE_XML:
+            try:
+                reader = XlsxReader(path)
+            except XlsxFormatError:
+                pass
+            else:
+                if history and (_parallel_inflate if parallel_inflate is None else parallel_inflate):
+                    reader.prefetch(timesheet_sheet_names(reader.sheetnames) + [WORKDAY_SHEET])
+                return reader
+        return load_workbook(path, read_only=True, data_only=True)
+
+
+def _load_workbook(path: Path):
+    """Загрузить книгу целиком для изменения."""
+
+    with metrics.span("open"):
+        return load_workbook(path)
 
-def load_reference_data(path: Path | str) -> Tuple[List[str], List[str]]:
-    """Прочитать лист справочника и вернуть два списка: проекты и виды работ."""
+
+def timesheet_shard_name(day: date) -> str:
+    """Имя помесячного листа учёта времени для даты."""
+
+    return f"{TIMESHEET_SHEET} {day:%Y-%m}"
+
+
+def timesheet_sheet_names(sheetnames: Iterable[str]) -> List[str]:
+    """Листы учёта времени книги: основной (если есть), затем помесячные по порядку."""
+
+    names = list(sheetnames)
+    shards = sorted((m.group(1), name) for name in names if (m := _SHARD_RE.match(name)))
+    base = [TIMESHEET_SHEET] if TIMESHEET_SHEET in names else []
+    return base + [name for _month, name in shards]
+
+
+def _timesheet_shard(wb, day: date):
+    """Вернуть помесячный лист для даты, создав его с заголовками при необходимости."""
+
+    name = timesheet_shard_name(day)
+    if name in wb.sheetnames:
+        return wb[name]
+    # Листы держим по порядку месяцев рядом с основным листом учёта времени
+    existing = timesheet_sheet_names(wb.sheetnames)
+    later = [other for other in existing if other != TIMESHEET_SHEET and other > name]
+    if later:
+        index = wb.sheetnames.index(later[0])
+    else:
+        index = wb.sheetnames.index(existing[-1]) + 1 if existing else None
+    ws = wb.create_sheet(name, index)
+    ws.append(TIMESHEET_HEADERS)
+    return ws
+
+
+@metrics.timed("load_reference_index")
+def load_reference_index(path: Path | str) -> ReferenceIndex:
+    """Прочитать лист справочника с сохранением пар (проект, вид работ) по строкам.
+
+    Значения очищаются от пробелов, пустые и повторы отбрасываются (см.
+    `ReferenceIndex`).
+    """
 
     workbook_path = Path(path)
     if not workbook_path.exists():
         raise FileNotFoundError(f"Excel file not found: {workbook_path}")
 
-    workbook = load_workbook(workbook_path, data_only=True)
-
-    if REFERENCE_SHEET not in workbook:
-        raise ExcelStructureError(
-            f"Workbook must contain sheet '{REFERENCE_SHEET}'. Found: {', '.join(workbook.sheetnames)}"
-        )
+    workbook = open_read_only(workbook_path)
+    try:
+        if REFERENCE_SHEET not in workbook.sheetnames:
+            raise ExcelStructureError(
+                f"Workbook must contain sheet '{REFERENCE_SHEET}'. Found: {', '.join(workbook.sheetnames)}"
+            )
 
-    sheet = workbook[REFERENCE_SHEET]
+        sheet = workbook[REFERENCE_SHEET]
 
-    projects: List[str] = []
-    work_types: List[str] = []
-    for idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
         # Пропускаем возможную строку заголовков
-        if idx == 1:
-            continue
-        project, work_type, *_ = row + (None, None)
-        projects.append(project)
-        work_types.append(work_type)
+        with metrics.span("scan"):
+            return ReferenceIndex(sheet.iter_rows(min_row=2, max_col=2, values_only=True))
+    finally:
+        workbook.close()
 
-    return _normalise(projects), _normalise(work_types)
 
+@metrics.timed("load_reference_data")
+def load_reference_data(path: Path | str) -> Tuple[List[str], List[str]]:
+    """Прочитать лист справочника и вернуть два списка: проекты и виды работ."""
 
+    index = load_reference_index(path)
+    return index.projects, index.work_types
+
+
+@dataclass
+class TimeEntry:
+    """Одна запись учёта времени для пакетной записи."""
+
+    project: str
+    work_type: str
+    elapsed_seconds: float
+    finished_at: Optional[datetime] = None
+    # идентификатор записи (без пробелов): запись с уже известным ID повторно не добавляется
+    entry_id: Optional[str] = None
+
+
+@metrics.timed("append_time_entry")
 def append_time_entry(
     path: Path | str,
     *,
@@ -75,67 +291,138 @@ def append_time_entry(
     work_type: str,
     elapsed_seconds: float,
     finished_at: datetime | None = None,
+    sharded: bool = False,
+    entry_id: Optional[str] = None,
 ) -> None:
     """Добавить строку на лист учёта времени (дата, проект, вид работ, длительность).
 
     В отличие от простого `sheet.append`, мы ищем первую по-настоящему пустую
     строку, игнорируя форматирование (цвета, границы) и удалённые строки.
+    С `sharded=True` запись идёт на помесячный лист ("Учет времени 2026-10").
+    """
+
+    append_time_entries(
+        path, [TimeEntry(project, work_type, elapsed_seconds, finished_at, entry_id)], sharded=sharded
+    )
+
+
+@metrics.timed("append_time_entries")
+def append_time_entries(path: Path | str, entries: Iterable[TimeEntry], *, sharded: bool = False) -> int:
+    """Добавить несколько записей за одну загрузку и одно сохранение книги.
+
+    Помесячные листы (`sharded=True`) создаются по мере надобности, поэтому
+    поиск пустой строки проходит только по листу текущего месяца.
+
+    `entry_id` записи пишется в скрытый столбец «ID записи»; запись, чей ID уже
+    есть в книге (повтор после ошибки) или встретился в пакете раньше,
+    пропускается — проверка идёт по множеству ID из индекса, без прохода по
+    листу. Возвращает число записанных строк.
     """
 
+    batch = list(entries)
     workbook_path = Path(path)
     if not workbook_path.exists():
         raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+    if not batch:
+        return 0
 
-    workbook = load_workbook(workbook_path)
+    workbook = _load_workbook(workbook_path)
 
-    if TIMESHEET_SHEET not in workbook:
+    if not sharded and TIMESHEET_SHEET not in workbook:
         raise ExcelStructureError(
             f"Workbook must contain sheet '{TIMESHEET_SHEET}'. Found: {', '.join(workbook.sheetnames)}"
         )
 
-    sheet = workbook[TIMESHEET_SHEET]
-    timestamp = finished_at or datetime.now()
-
-    duration = timedelta(seconds=elapsed_seconds)
-
-    # Поиск первой полностью пустой строки, начиная со 2-й (после заголовков)
-    def is_empty_row(r: int) -> bool:
-        return (
-            sheet.cell(row=r, column=1).value is None
-            and sheet.cell(row=r, column=2).value is None
-            and sheet.cell(row=r, column=3).value is None
-            and sheet.cell(row=r, column=4).value is None
-        )
-
-    first = 2
-    last = sheet.max_row
-    target_row = None
-    for r in range(first, last + 1):
-        if is_empty_row(r):
-            target_row = r
-            break
-    if target_row is None:
-        target_row = last + 1
-
-    # Записываем значения по ячейкам — так мы не зависим от sheet.append
-    c_date = sheet.cell(row=target_row, column=1)
-    c_date.value = timestamp.date()
-    # Дата в формате ДД.ММ.ГГГГ
-    try:
-        c_date.number_format = "DD.MM.YYYY"
-    except Exception:
-        pass
-    sheet.cell(row=target_row, column=2).value = project
-    sheet.cell(row=target_row, column=3).value = work_type
-    cell_duration = sheet.cell(row=target_row, column=4)
-    cell_duration.value = duration
-    # Красивый формат времени часов:минуты:секунды
-    try:
-        cell_duration.number_format = "[h]:mm:ss"
-    except Exception:
-        pass
+    summary = _SummaryUpdater.for_workbook(workbook)
+    index = _open_index(workbook_path, workbook)
+
+    if any(entry.entry_id for entry in batch):
+        if index is not None:
+            known = index.ids
+        else:
+            # Без индекса ID собираются проходом по листам — только в этом редком случае
+            known = {item for *_row, ids in _index_rows(workbook) if ids for item in ids.split()}
+        seen: Set[str] = set()  # ID, уже встреченные в этом пакете
+        fresh: List[TimeEntry] = []
+        for entry in batch:
+            if entry.entry_id:
+                if entry.entry_id in known or entry.entry_id in seen:
+                    continue
+                seen.add(entry.entry_id)
+            fresh.append(entry)
+        metrics.count("rows_deduplicated", len(batch) - len(fresh))
+        batch = fresh
+        if not batch:
+            # Всё уже записано — книгу не переписываем
+            return 0
+
+    snapshot = _open_snapshot(workbook_path)
+
+    # Поиск первой полностью пустой строки, начиная со 2-й (после заголовков);
+    # следующая запись пакета ищет место уже после только что заполненной.
+    last_rows: Dict[str, int] = {}
+    for entry in batch:
+        timestamp = entry.finished_at or datetime.now()
+        sheet = _timesheet_shard(workbook, timestamp.date()) if sharded else workbook[TIMESHEET_SHEET]
+        target_row = _first_empty_row(sheet, start_row=last_rows.get(sheet.title, 1) + 1, last_col=4)
+        last_rows[sheet.title] = target_row
+
+        with metrics.span("write"):
+            # Записываем значения по ячейкам — так мы не зависим от sheet.append
+            write_date(sheet.cell(row=target_row, column=1), timestamp.date())
+            write_cell(sheet.cell(row=target_row, column=2), entry.project)
+            write_cell(sheet.cell(row=target_row, column=3), entry.work_type)
+            # Формат времени часов:минуты:секунды
+            write_duration(sheet.cell(row=target_row, column=4), entry.elapsed_seconds)
+            if entry.entry_id:
+                _write_entry_id(sheet, target_row, entry.entry_id)
+
+            if summary is not None:
+                summary.add_entry(timestamp.date(), entry.project, entry.elapsed_seconds)
+            if index is not None:
+                index.record(sheet.title, timestamp.date(), target_row, entry_id=entry.entry_id)
+            if snapshot is not None:
+                try:
+                    snapshot.add(timestamp.date(), entry.project, entry.work_type, entry.elapsed_seconds)
+                except SnapshotOverflow:
+                    snapshot = None
+                    HistorySnapshot.discard(workbook_path)
+
+    metrics.count("rows_written", len(batch))
+    _save_workbook(workbook, workbook_path, index=index, snapshot=snapshot)
+    return len(batch)
+
+
+def _write_entry_id(sheet, row: int, entry_id: str) -> None:
+    """Записать ID в скрытый столбец; заголовок и скрытие — при первой записи на лист."""
+
+    header = sheet.cell(row=1, column=ENTRY_ID_COLUMN)
+    if header.value is None:
+        header.value = ENTRY_ID_HEADER
+        sheet.column_dimensions[get_column_letter(ENTRY_ID_COLUMN)].hidden = True
+    sheet.cell(row=row, column=ENTRY_ID_COLUMN).value = entry_id
+
+
+def _has_entry_ids(ws) -> bool:
+    return ws.cell(row=1, column=ENTRY_ID_COLUMN).value == ENTRY_ID_HEADER
+
+
+def _entry_id(ws, row: int) -> Optional[str]:
+    return decode_text(ws.cell(row=row, column=ENTRY_ID_COLUMN).value) if _has_entry_ids(ws) else None
+
+
+def iter_timesheet_rows(wb) -> Iterator[Tuple[str, int, Tuple[Any, ...]]]:
+    """Лениво перебрать строки всех листов учёта времени (основной и помесячные).
+
+    Отдаёт (имя листа, номер строки, значения A..D); пустые строки пропускаются.
+    Следующий лист открывается только когда дочитан предыдущий.
+    """
 
-    workbook.save(workbook_path)
+    for name in timesheet_sheet_names(wb.sheetnames):
+        rows = wb[name].iter_rows(min_row=2, max_col=4, values_only=True)
+        for row_idx, row in enumerate(rows, start=2):
+            if any(value is not None for value in row):
+                yield name, row_idx, row
 
 
 def _first_empty_row(sheet, start_row: int, last_col: int) -> int:
@@ -151,13 +438,160 @@ def _first_empty_row(sheet, start_row: int, last_col: int) -> int:
                 return False
         return True
 
-    last = sheet.max_row
-    for r in range(start_row, last + 1):
-        if row_empty(r):
-            return r
-    return last + 1
+    with metrics.span("scan"):
+        last = sheet.max_row
+        for r in range(start_row, last + 1):
+            if row_empty(r):
+                metrics.count("rows_scanned", r - start_row + 1)
+                return r
+        metrics.count("rows_scanned", max(last - start_row + 1, 0))
+        return last + 1
+
+
+def _index_rows(wb) -> Iterator[Tuple[str, int, Optional[date], Optional[str]]]:
+    """Строки листов учёта для построения индекса: (лист, номер строки, дата, ID записи).
+
+    У слитой при сжатии строки в ячейке ID записаны ID всех слитых записей через пробел.
+    """
+
+    decode_day = date_decoder(workbook_epoch(wb))
+    for name in timesheet_sheet_names(wb.sheetnames):
+        ws = wb[name]
+        header = next(ws.iter_rows(min_row=1, max_row=1, max_col=ENTRY_ID_COLUMN, values_only=True), ())
+        width = ENTRY_ID_COLUMN if ENTRY_ID_HEADER in header else 4
+        for row_idx, row in enumerate(ws.iter_rows(min_row=2, max_col=width, values_only=True), start=2):
+            if any(value is not None for value in row[:4]):
+                entry_id = decode_text(row[ENTRY_ID_COLUMN - 1]) if width > 4 and len(row) >= width else None
+                yield name, row_idx, decode_day(row[0]), entry_id
+    if WORKDAY_SHEET in wb.sheetnames:
+        for row_idx, (value,) in enumerate(
+            wb[WORKDAY_SHEET].iter_rows(min_row=2, max_col=1, values_only=True), start=2
+        ):
+            yield WORKDAY_SHEET, row_idx, decode_day(value), None
+
+
+def _open_index(path: Path, wb) -> Optional[EntryIndex]:
+    """Загрузить индекс дат книги, перестроив его, если книгу меняли вне приложения.
+
+    Вызывается до изменений в `wb`. Индекс — лишь ускорение: при любой ошибке
+    возвращаем None и работаем без него.
+    """
+
+    try:
+        with metrics.span("parse"):
+            index = EntryIndex.load(path)
+            if not index.is_current():
+                metrics.count("index_rebuilds")
+                index.rebuild(_index_rows(wb))
+        return index
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+def _open_snapshot(path: Path) -> Optional[HistorySnapshot]:
+    """Загрузить снимок истории, если он соответствует книге.
+
+    Устаревший снимок здесь не перестраиваем — это полный проход по истории;
+    его перестроит `load_snapshot` при следующем чтении.
+    """
+
+    with metrics.span("parse"):
+        snapshot = HistorySnapshot.load(path)
+    if snapshot is None or not snapshot.is_current():
+        return None
+    return snapshot
+
+
+class _LevelZipFile(zipfile.ZipFile):
+    """Архив книги, где у отдельных частей свой уровень сжатия."""
+
+    def __init__(self, file, level: int, member_levels: Mapping[str, int]) -> None:
+        super().__init__(file, "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+        self._level = level
+        self._member_levels = member_levels
+
+    def _compression(self, arcname: str) -> Tuple[int, Optional[int]]:
+        level = self._member_levels.get(arcname, self._level)
+        if level == 0:
+            return zipfile.ZIP_STORED, None
+        return zipfile.ZIP_DEFLATED, level
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        compress_type, compresslevel = self._compression(arcname or str(filename))
+        return super().write(filename, arcname, compress_type, compresslevel)
+
+    def writestr(self, zinfo_or_arcname, data, compress_type=None, compresslevel=None):
+        name = getattr(zinfo_or_arcname, "filename", zinfo_or_arcname)
+        compress_type, compresslevel = self._compression(name)
+        return super().writestr(zinfo_or_arcname, data, compress_type, compresslevel)
+
+
+def _write_xlsx(wb, fh) -> None:
+    """Записать книгу в открытый файл (как `Workbook.save`, но со своим архивом)."""
+
+    # Листы нумеруются по порядку при записи: xl/worksheets/sheet<N>.xml
+    member_levels: Dict[str, int] = {}
+    if _hot_sheet_level is not None:
+        hot = set(timesheet_sheet_names(wb.sheetnames))
+        for idx, ws in enumerate(wb.worksheets, 1):
+            if ws.title in hot:
+                member_levels[f"xl/worksheets/sheet{idx}.xml"] = _hot_sheet_level
+    wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    ExcelWriter(wb, _LevelZipFile(fh, _compress_level, member_levels)).save()
+
+
+def _save_workbook(
+    wb,
+    path: Path,
+    *,
+    index: Optional[EntryIndex] = None,
+    snapshot: Optional[HistorySnapshot] = None,
+) -> None:
+    """Сохранить книгу и привязать индекс дат и снимок истории к новому состоянию файла.
+
+    Книга пишется во временный файл рядом с исходной и заменяет её
+    переименованием: сбой или нехватка места во время записи не портят файл.
+    """
+
+    with metrics.span("save"):
+        atomic_write(path, lambda fh: _write_xlsx(wb, fh))
+        for sidecar in (index, snapshot):
+            if sidecar is not None:
+                try:
+                    sidecar.save()
+                except OSError:
+                    pass
+    if metrics.enabled():
+        metrics.count("bytes_saved", os.path.getsize(path))
+
+
+@metrics.timed("load_snapshot")
+def load_snapshot(path: Path | str) -> HistorySnapshot:
+    """Вернуть актуальный снимок истории, построив его при необходимости.
+
+    Построение — один потоковый проход по листам учёта (read-only); дальше
+    снимок поддерживается при каждой записи.
+    """
+
+    workbook_path = Path(path)
+    with metrics.span("parse"):
+        snapshot = HistorySnapshot.load(workbook_path)
+    if snapshot is not None and snapshot.is_current():
+        return snapshot
+    metrics.count("snapshot_rebuilds")
+    with metrics.span("scan"):
+        snapshot = HistorySnapshot.build(
+            workbook_path,
+            ((entry.day, entry.project, entry.work_type, entry.seconds) for entry in iter_time_entries(workbook_path)),
+        )
+    try:
+        snapshot.save()
+    except OSError:
+        pass
+    return snapshot
 
 
+@metrics.timed("workday_start")
 def workday_start(path: Path | str) -> tuple[str, str]:
     """Записать текущую дату и время начала в лист "Учет рабочего времени".
 
@@ -168,12 +602,14 @@ def workday_start(path: Path | str) -> tuple[str, str]:
     if not workbook_path.exists():
         raise FileNotFoundError(f"Excel file not found: {workbook_path}")
 
-    wb = load_workbook(workbook_path)
+    wb = _load_workbook(workbook_path)
+    index = _open_index(workbook_path, wb)
+    snapshot = _open_snapshot(workbook_path)
 
     if WORKDAY_SHEET not in wb:
         # Создадим лист при первом использовании
         ws = wb.create_sheet(WORKDAY_SHEET)
-        ws.append(["Дата", "Время начала", "Время окончания", "Длительность"])
+        ws.append(WORKDAY_HEADERS)
     else:
         ws = wb[WORKDAY_SHEET]
 
@@ -182,28 +618,23 @@ def workday_start(path: Path | str) -> tuple[str, str]:
     date_str = now.strftime("%d.%m.%Y")
     time_str = now.strftime("%H:%M")
 
-    c_date = ws.cell(row=target_row, column=1)
-    c_date.value = now.date()
-    try:
-        c_date.number_format = "DD.MM.YYYY"
-    except Exception:
-        pass
+    with metrics.span("write"):
+        write_date(ws.cell(row=target_row, column=1), now.date())
+        write_time(ws.cell(row=target_row, column=2), now.time())
+        if index is not None:
+            index.record(WORKDAY_SHEET, now.date(), target_row, undoable=False)
 
-    c_start = ws.cell(row=target_row, column=2)
-    c_start.value = now.time()
-    try:
-        c_start.number_format = "HH:MM"
-    except Exception:
-        pass
-
-    wb.save(workbook_path)
+    _save_workbook(wb, workbook_path, index=index, snapshot=snapshot)
     return date_str, time_str
 
 
-def workday_end(path: Path | str) -> str:
+@metrics.timed("workday_end")
+def workday_end(path: Path | str, *, compact: bool = False) -> str:
     """Записать время окончания и длительность в лист "Учет рабочего времени".
 
     Ищет последнюю строку, где заполнены дата/время начала, но пусто время окончания.
+    С `compact=True` записи учёта времени за этот день сливаются (см.
+    `compact_timesheet`) в том же сохранении книги.
     Возвращает строку длительности в формате ЧЧ:ММ для сообщений.
     """
 
@@ -211,62 +642,505 @@ def workday_end(path: Path | str) -> str:
     if not workbook_path.exists():
         raise FileNotFoundError(f"Excel file not found: {workbook_path}")
 
-    wb = load_workbook(workbook_path)
+    wb = _load_workbook(workbook_path)
     if WORKDAY_SHEET not in wb:
         raise ExcelStructureError(f"Workbook must contain sheet '{WORKDAY_SHEET}'.")
+    index = _open_index(workbook_path, wb)
+    snapshot = _open_snapshot(workbook_path)
 
     ws = wb[WORKDAY_SHEET]
 
     # Ищем последнюю незавершённую запись
     target_row = None
-    for r in range(ws.max_row, 1, -1):
-        if ws.cell(row=r, column=1).value is not None and ws.cell(row=r, column=2).value is not None and ws.cell(row=r, column=3).value is None:
-            target_row = r
-            break
+    with metrics.span("scan"):
+        for r in range(ws.max_row, 1, -1):
+            if ws.cell(row=r, column=1).value is not None and ws.cell(row=r, column=2).value is not None and ws.cell(row=r, column=3).value is None:
+                target_row = r
+                break
 
     if target_row is None:
         raise ExcelStructureError("Не найдено незавершённое начало рабочего дня.")
 
+    # Дата и начало могут быть datetime, серийным числом или текстом "08:30"
+    start_date = date_decoder(workbook_epoch(wb))(ws.cell(row=target_row, column=1).value)
+    start_time = decode_time(ws.cell(row=target_row, column=2).value)
+    if start_date is None or start_time is None:
+        raise ExcelStructureError(f"Не удалось распознать дату/время начала в строке {target_row}.")
+
     now = datetime.now()
     # Записываем время окончания
-    c_end = ws.cell(row=target_row, column=3)
-    c_end.value = now.time()
-    try:
-        c_end.number_format = "HH:MM"
-    except Exception:
-        pass
+    write_time(ws.cell(row=target_row, column=3), now.time())
 
-    # Рассчитываем длительность
-    start_cell = ws.cell(row=target_row, column=2)
-    date_cell = ws.cell(row=target_row, column=1)
-
-    # Приводим к datetime для вычисления
-    start_time = start_cell.value
-    start_date = date_cell.value
-    if isinstance(start_date, datetime):
-        start_date = start_date.date()
-    if isinstance(start_time, datetime):
-        start_time = start_time.time()
-
-    start_dt = datetime.combine(start_date, start_time)
-    duration = now - start_dt
-    # Округляем до минут
+    # Длительность округляем вниз до минут
+    duration = now - datetime.combine(start_date, start_time)
     minutes = int(duration.total_seconds() // 60)
-    hours, mins = divmod(minutes, 60)
-    dur_str = f"{hours:02d}:{mins:02d}"
+    dur_str = format_hm(minutes * 60)
 
-    c_dur = ws.cell(row=target_row, column=4)
     # Для Excel пишем как timedelta, а форматируем как ч:мм
-    c_dur.value = timedelta(hours=hours, minutes=mins)
-    try:
-        c_dur.number_format = "[h]:mm"
-    except Exception:
-        pass
+    write_duration(ws.cell(row=target_row, column=4), minutes * 60, DURATION_HM_FORMAT)
+
+    summary = _SummaryUpdater.for_workbook(wb)
+    if summary is not None:
+        summary.add(SUMMARY_WORKDAY, start_date, None, minutes * 60)
+    if index is not None:
+        index.touch(WORKDAY_SHEET, start_date)
+
+    if compact:
+        with metrics.span("scan"):
+            before, after = _compact_workbook(wb, index, start_date)
+            if before != after:
+                snapshot = _rebuilt_snapshot(workbook_path, wb, snapshot)
 
-    wb.save(workbook_path)
+    _save_workbook(wb, workbook_path, index=index, snapshot=snapshot)
     return dur_str
 
 
+class _SummaryUpdater:
+    """Инкрементальное обновление листа "Итоги" без формул.
+
+    Строки итогов адресуются ключом (раздел, период, проект). Индекс ключей
+    строится по самому листу итогов — он растёт с числом дней и пар
+    проект×месяц, а не с историей записей, — после чего каждая запись
+    меняет одну ячейку.
+    """
+
+    def __init__(self, sheet) -> None:
+        self.sheet = sheet
+        self._rows: Dict[Tuple[str, Any, str], int] = {}
+        self._next_row = 2
+        for row_idx, row in enumerate(sheet.iter_rows(min_row=2, max_col=4, values_only=True), start=2):
+            if row[0] is None:
+                continue
+            self._rows[self._key(row[0], row[1], row[2])] = row_idx
+            self._next_row = row_idx + 1
+
+    @classmethod
+    def for_workbook(cls, wb) -> Optional["_SummaryUpdater"]:
+        """Вернуть обновлятель, если в книге есть лист итогов.
+
+        Лист не создаётся автоматически: без истории он бы разошёлся с
+        данными. Его создаёт шаблон или `rebuild_summary`.
+        """
+
+        if SUMMARY_SHEET not in wb.sheetnames:
+            return None
+        return cls(wb[SUMMARY_SHEET])
+
+    @staticmethod
+    def _key(section: Any, period: Any, project: Any) -> Tuple[str, Any, str]:
+        section = str(section).strip()
+        if section == SUMMARY_PROJECT_MONTH:
+            period = str(period).strip()
+        else:
+            period = decode_date(period)
+        return section, period, decode_text(project) or ""
+
+    def add(self, section: str, period: Any, project: Optional[str], seconds: float) -> None:
+        """Прибавить длительность к строке итогов (строка создаётся при первом обращении)."""
+
+        key = self._key(section, period, project)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._next_row
+            self._next_row += 1
+            self._rows[key] = row
+            write_cell(self.sheet.cell(row=row, column=1), key[0])
+            if section == SUMMARY_PROJECT_MONTH:
+                write_cell(self.sheet.cell(row=row, column=2), key[1])
+            else:
+                write_date(self.sheet.cell(row=row, column=2), key[1])
+            write_cell(self.sheet.cell(row=row, column=3), key[2] or None)
+            current = 0.0
+        else:
+            current = decode_duration(self.sheet.cell(row=row, column=4).value) or 0.0
+        write_duration(self.sheet.cell(row=row, column=4), max(current + seconds, 0.0))
+
+    def add_entry(self, day: date, project: str, seconds: float) -> None:
+        """Учесть запись таймера в итогах дня и проекта за месяц."""
+
+        self.add(SUMMARY_DAY, day, None, seconds)
+        self.add(SUMMARY_PROJECT_MONTH, f"{day:%Y-%m}", project, seconds)
+
+
+@metrics.timed("rebuild_summary")
+def rebuild_summary(path: Path | str) -> int:
+    """Пересчитать лист "Итоги" с нуля одним потоковым проходом по истории.
+
+    Нужна, если итоги разошлись с данными (например, строки правили вручную)
+    или листа ещё нет. Возвращает число строк итогов.
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    days: Dict[date, float] = {}
+    workdays: Dict[date, float] = {}
+    months: Dict[Tuple[str, str], float] = {}
+
+    # Проход по истории в режиме read-only: память не зависит от размера листа
+    ro = open_read_only(workbook_path, history=True)
+    try:
+        with metrics.span("scan"):
+            decode = TIMESHEET_CODEC.for_workbook(ro).decode
+            for _sheet_name, _row_idx, row in iter_timesheet_rows(ro):
+                day, project, _work_type, seconds = decode(row)
+                if day is None or seconds is None:
+                    continue
+                days[day] = days.get(day, 0.0) + seconds
+                key = (f"{day:%Y-%m}", project or "")
+                months[key] = months.get(key, 0.0) + seconds
+            if WORKDAY_SHEET in ro.sheetnames:
+                decode = WORKDAY_CODEC.for_workbook(ro).decode
+                for row in ro[WORKDAY_SHEET].iter_rows(min_row=2, max_col=4, values_only=True):
+                    day, _start, _end, seconds = decode(row)
+                    if day is None or seconds is None:
+                        continue
+                    workdays[day] = workdays.get(day, 0.0) + seconds
+    finally:
+        ro.close()
+
+    wb = _load_workbook(workbook_path)
+    index = _open_index(workbook_path, wb)
+    snapshot = _open_snapshot(workbook_path)
+    if SUMMARY_SHEET in wb.sheetnames:
+        position = wb.sheetnames.index(SUMMARY_SHEET)
+        wb.remove(wb[SUMMARY_SHEET])
+        ws = wb.create_sheet(SUMMARY_SHEET, position)
+    else:
+        ws = wb.create_sheet(SUMMARY_SHEET)
+    ws.append(SUMMARY_HEADERS)
+
+    with metrics.span("write"):
+        summary = _SummaryUpdater(ws)
+        for day in sorted(days):
+            summary.add(SUMMARY_DAY, day, None, days[day])
+        for day in sorted(workdays):
+            summary.add(SUMMARY_WORKDAY, day, None, workdays[day])
+        for month, project in sorted(months):
+            summary.add(SUMMARY_PROJECT_MONTH, month, project, months[(month, project)])
+
+    _save_workbook(wb, workbook_path, index=index, snapshot=snapshot)
+    return len(days) + len(workdays) + len(months)
+
+
+@dataclass
+class DayEntry:
+    """Запись листа учёта времени с её адресом в книге."""
+
+    sheet: str
+    row: int
+    day: date
+    project: Optional[str]
+    work_type: Optional[str]
+    seconds: float
+
+
+@metrics.timed("load_day_entries")
+def load_day_entries(path: Path | str, day: date) -> List[DayEntry]:
+    """Вернуть записи учёта времени за дату, читая только строки из индекса."""
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    wb = open_read_only(workbook_path)
+    try:
+        with metrics.span("parse"):
+            index = EntryIndex.load(workbook_path)
+            if not index.is_current():
+                metrics.count("index_rebuilds")
+                index.rebuild(_index_rows(wb))
+                try:
+                    index.save()
+                except OSError:
+                    pass
+
+        entries: List[DayEntry] = []
+        ranges = index.rows_for(day, timesheet_sheet_names(wb.sheetnames))
+        decode = TIMESHEET_CODEC.for_workbook(wb).decode
+        with metrics.span("scan"):
+            for sheet, (first, last) in ranges.items():
+                rows = wb[sheet].iter_rows(min_row=first, max_row=last, max_col=4, values_only=True)
+                for row_idx, row in enumerate(rows, start=first):
+                    row_day, project, work_type, seconds = decode(row)
+                    if row_day == day:
+                        entries.append(DayEntry(sheet, row_idx, row_day, project, work_type, seconds or 0.0))
+        return entries
+    finally:
+        wb.close()
+
+
+@metrics.timed("iter_time_entries")
+def iter_time_entries(path: Path | str) -> Iterator[DayEntry]:
+    """Потоково перебрать все записи учёта времени (read-only, без загрузки книги в память)."""
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    wb = open_read_only(workbook_path)
+    try:
+        decode = TIMESHEET_CODEC.for_workbook(wb).decode
+        for sheet, row_idx, row in iter_timesheet_rows(wb):
+            day, project, work_type, seconds = decode(row)
+            if day is not None:
+                yield DayEntry(sheet, row_idx, day, project, work_type, seconds or 0.0)
+    finally:
+        wb.close()
+
+
+def _read_entry(ws, row: int) -> Tuple[Any, ...]:
+    codec = TIMESHEET_CODEC.for_workbook(ws.parent)
+    return codec.decode(tuple(ws.cell(row=row, column=col).value for col in range(1, 5)))
+
+
+def _clear_entry(ws, row: int) -> None:
+    last_col = ENTRY_ID_COLUMN if _has_entry_ids(ws) else 4
+    for col in range(1, last_col + 1):
+        ws.cell(row=row, column=col).value = None
+
+
+@metrics.timed("update_day_entries")
+def update_day_entries(
+    path: Path | str,
+    day: date,
+    changes: Mapping[Tuple[str, int], Optional[TimeEntry]],
+) -> int:
+    """Изменить или удалить записи за дату.
+
+    `changes` — словарь {(лист, строка): новая запись или None для удаления};
+    у новой записи используются проект, вид работ и длительность, дата
+    остаётся прежней. Меняются только указанные строки и лист итогов.
+    Возвращает число изменённых строк.
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+    if not changes:
+        return 0
+
+    wb = _load_workbook(workbook_path)
+    index = _open_index(workbook_path, wb)
+    summary = _SummaryUpdater.for_workbook(wb)
+
+    with metrics.span("write"):
+        for (sheet_name, row), entry in changes.items():
+            if sheet_name not in wb.sheetnames:
+                raise ExcelStructureError(f"Workbook must contain sheet '{sheet_name}'.")
+            ws = wb[sheet_name]
+            old_day, old_project, _old_work_type, old_seconds = _read_entry(ws, row)
+            if old_day != day:
+                raise ExcelStructureError(f"Строка {row} листа '{sheet_name}' не относится к дате {day:%d.%m.%Y}.")
+            if summary is not None:
+                summary.add_entry(day, old_project or "", -(old_seconds or 0.0))
+            if index is not None:
+                index.touch(sheet_name, day)
+            if entry is None:
+                entry_id = _entry_id(ws, row)
+                _clear_entry(ws, row)
+                if index is not None:
+                    index.forget(sheet_name, row, entry_id=entry_id)
+                continue
+            write_cell(ws.cell(row=row, column=2), entry.project)
+            write_cell(ws.cell(row=row, column=3), entry.work_type)
+            write_duration(ws.cell(row=row, column=4), entry.elapsed_seconds)
+            if summary is not None:
+                summary.add_entry(day, entry.project, entry.elapsed_seconds)
+
+    _save_workbook(wb, workbook_path, index=index)
+    # Снимок только дописывается, поэтому после правки истории он перестраивается
+    HistorySnapshot.discard(workbook_path)
+    return len(changes)
+
+
+@metrics.timed("undo_last_entry")
+def undo_last_entry(path: Path | str) -> Optional[DayEntry]:
+    """Удалить последнюю добавленную приложением запись учёта времени.
+
+    Возвращает удалённую запись или None, если отменять нечего (в том числе
+    если книгу меняли вне приложения и история добавлений неизвестна).
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    wb = _load_workbook(workbook_path)
+    index = _open_index(workbook_path, wb)
+    if index is None:
+        return None
+
+    while True:
+        item = index.pop_recent()
+        if item is None:
+            return None
+        sheet_name, row = item
+        if sheet_name not in wb.sheetnames:
+            continue
+        ws = wb[sheet_name]
+        day, project, work_type, seconds = _read_entry(ws, row)
+        if day is not None:
+            break
+
+    with metrics.span("write"):
+        index.forget(sheet_name, row, entry_id=_entry_id(ws, row))
+        index.touch(sheet_name, day)
+        _clear_entry(ws, row)
+        summary = _SummaryUpdater.for_workbook(wb)
+        if summary is not None:
+            summary.add_entry(day, project or "", -(seconds or 0.0))
+
+    _save_workbook(wb, workbook_path, index=index)
+    HistorySnapshot.discard(workbook_path)
+    return DayEntry(sheet_name, row, day, project, work_type, seconds or 0.0)
+
+
+def _compact_sheet(ws, start_row: int, day: Optional[date]) -> Tuple[int, int, Set[date]]:
+    """Слить строки листа начиная с `start_row` одним проходом.
+
+    Строки с одинаковыми (дата, проект, вид работ) заменяются одной на месте
+    первой из них с суммарной длительностью; остальные строки сдвигаются вверх
+    вместе со своим форматом, пустые строки исчезают. Строки, которые не
+    удалось разобрать, и строки других дат (если задан `day`) не меняются.
+    Скрытый «ID записи» переезжает вместе со строкой; у слитой строки в нём
+    ID всех слитых записей через пробел, чтобы их повтор по-прежнему
+    отбрасывался.
+    Возвращает (строк до, строк после) среди подлежащих слиянию и даты, в
+    которых строки действительно слились.
+    """
+
+    width = ENTRY_ID_COLUMN if _has_entry_ids(ws) else 4
+    last_row = ws.max_row
+    # элементы: исходная строка [(значение, формат), ...] или ключ группы
+    output: List[Any] = []
+    groups: Dict[Tuple[date, str, str], List[Any]] = {}
+    before = 0
+    decode = TIMESHEET_CODEC.for_workbook(ws.parent).decode
+    for cells in ws.iter_rows(min_row=start_row, max_row=last_row, max_col=width):
+        raw = [(cell.value, cell.number_format) for cell in cells]
+        if all(value is None for value, _fmt in raw):
+            continue
+        row_day, project, work_type, seconds = decode(tuple(value for value, _fmt in raw))
+        if row_day is None or seconds is None or (day is not None and row_day != day):
+            output.append(raw)
+            continue
+        before += 1
+        key = (row_day, project or "", work_type or "")
+        entry_ids = (decode_text(raw[ENTRY_ID_COLUMN - 1][0]) or "").split() if width > 4 else []
+        group = groups.get(key)
+        if group is None:
+            # [сумма секунд, число строк, исходная строка, ID записей]
+            groups[key] = [seconds, 1, raw, entry_ids]
+            output.append(key)
+        else:
+            group[0] += seconds
+            group[1] += 1
+            group[3].extend(entry_ids)
+
+    merged: Set[date] = set()
+    row = start_row
+    for item in output:
+        if isinstance(item, tuple):
+            total, count, raw, entry_ids = groups[item]
+            if count == 1:
+                item = raw
+            else:
+                merged.add(item[0])
+                write_date(ws.cell(row=row, column=1), item[0])
+                write_cell(ws.cell(row=row, column=2), item[1] or None)
+                write_cell(ws.cell(row=row, column=3), item[2] or None)
+                write_duration(ws.cell(row=row, column=4), total)
+                if width > 4:
+                    ws.cell(row=row, column=ENTRY_ID_COLUMN).value = " ".join(entry_ids) or None
+                row += 1
+                continue
+        for col, (value, fmt) in enumerate(item, start=1):
+            cell = ws.cell(row=row, column=col)
+            cell.value = value
+            cell.number_format = fmt
+        row += 1
+    for r in range(row, last_row + 1):
+        _clear_entry(ws, r)
+    return before, len(groups), merged
+
+
+def _compact_workbook(wb, index: Optional[EntryIndex], day: Optional[date]) -> Tuple[int, int]:
+    """Сжать все листы учёта книги в памяти; индекс перестраивается по новым строкам."""
+
+    before = after = 0
+    merged: Dict[str, Set[date]] = {}
+    for name in timesheet_sheet_names(wb.sheetnames):
+        start_row = 2
+        if day is not None and index is not None:
+            # За день переписываем лист только с первой строки этой даты
+            bounds = index.rows_for(day, [name]).get(name)
+            if bounds is None:
+                continue
+            start_row = bounds[0]
+        sheet_before, sheet_after, merged[name] = _compact_sheet(wb[name], start_row, day)
+        before += sheet_before
+        after += sheet_after
+    if before != after and index is not None:
+        # Номера строк сдвинулись: стек отмены теряет смысл, диапазоны строим заново;
+        # изменёнными для выгрузки считаются только дни со слитыми строками
+        index.rebuild(_index_rows(wb), keep_changes=True)
+        for name, days in merged.items():
+            for merged_day in days:
+                index.touch(name, merged_day)
+    return before, after
+
+
+def _rebuilt_snapshot(path: Path, wb, snapshot: Optional[HistorySnapshot]) -> Optional[HistorySnapshot]:
+    """Снимок истории после сжатия: пересобираем по книге в памяти, если он вёлся."""
+
+    if snapshot is None:
+        HistorySnapshot.discard(path)
+        return None
+    decode = TIMESHEET_CODEC.for_workbook(wb).decode
+    entries = (decode(row) for _sheet, _row, row in iter_timesheet_rows(wb))
+    try:
+        return HistorySnapshot.build(
+            path, ((day, project, work_type, seconds or 0.0) for day, project, work_type, seconds in entries if day)
+        )
+    except SnapshotOverflow:
+        HistorySnapshot.discard(path)
+        return None
+
+
+@metrics.timed("compact_timesheet")
+def compact_timesheet(path: Path | str, *, day: Optional[date] = None) -> Tuple[int, int]:
+    """Слить дробные записи одного дня, проекта и вида работ в одну строку.
+
+    Паузы дают много коротких строк за день; после сжатия на каждую тройку
+    (дата, проект, вид работ) остаётся одна строка с суммарной длительностью.
+    Без `day` сжимается вся история, с `day` — только записи этой даты.
+    Итоги не меняются, индекс дат и снимок истории перестраиваются.
+    Возвращает (число записей до, число записей после).
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    wb = _load_workbook(workbook_path)
+    index = _open_index(workbook_path, wb)
+    snapshot = _open_snapshot(workbook_path)
+    with metrics.span("scan"):
+        before, after = _compact_workbook(wb, index, day)
+    metrics.count("rows_merged", before - after)
+    if before == after:
+        # Сливать нечего — книгу не переписываем
+        return before, after
+
+    with metrics.span("parse"):
+        snapshot = _rebuilt_snapshot(workbook_path, wb, snapshot)
+    _save_workbook(wb, workbook_path, index=index, snapshot=snapshot)
+    return before, after
+
+
+@metrics.timed("create_template")
 def create_template(path: Path | str) -> None:
     """Создать пустую книгу Excel с нужными листами и заголовками."""
 
@@ -278,14 +1152,171 @@ def create_template(path: Path | str) -> None:
 
     # Лист справочника
     ws_ref = wb.create_sheet(REFERENCE_SHEET)
-    ws_ref.append(["Проект", "Вид работ"])  # заголовки
+    ws_ref.append(REFERENCE_HEADERS)
 
     # Лист учёта времени (суммарные записи)
     ws_ts = wb.create_sheet(TIMESHEET_SHEET)
-    ws_ts.append(["Дата", "Проект", "Вид работ", "Длительность"])  # заголовки
+    ws_ts.append(TIMESHEET_HEADERS)
 
     # Лист учёта рабочего дня (начала/окончания)
     ws_wd = wb.create_sheet(WORKDAY_SHEET)
-    ws_wd.append(["Дата", "Время начала", "Время окончания", "Длительность"])  # заголовки
+    ws_wd.append(WORKDAY_HEADERS)
+
+    # Лист итогов (обновляется при каждой записи)
+    ws_sum = wb.create_sheet(SUMMARY_SHEET)
+    ws_sum.append(SUMMARY_HEADERS)
+
+    _save_workbook(wb, workbook_path)
+
+
+# Поля выгрузки и конвертеры для каждого листа (в порядке столбцов A..D)
+EXPORT_FIELDS: Dict[str, Tuple[Tuple[str, ...], RowCodec]] = {
+    TIMESHEET_SHEET: (("date", "project", "work_type", "duration_seconds"), TIMESHEET_CODEC),
+    WORKDAY_SHEET: (("date", "start", "end", "duration_seconds"), WORKDAY_CODEC),
+}
+EXPORT_COLUMNS = (
+    "sheet", "row", "date", "project", "work_type", "start", "end", "duration_seconds", "change_seq", "deleted",
+)
+
+
+def _export_value(value: Any) -> Any:
+    """Привести раскодированное значение к JSON: даты/время в ISO, секунды — целые."""
+
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float):
+        return int(round(value))
+    if isinstance(value, time):
+        value = value.replace(microsecond=0)
+    return value.isoformat()
+
+
+def _export_index(path: Path, wb) -> EntryIndex:
+    """Индекс книги для выгрузки; перестроенный индекс сразу сохраняется, чтобы закрепить его номера."""
+
+    index = EntryIndex.load(path)
+    if not index.is_current():
+        metrics.count("index_rebuilds")
+        index.rebuild(_index_rows(wb))
+        try:
+            index.save()
+        except OSError:
+            pass
+    return index
+
+
+def _iter_export(wb, index: EntryIndex, since: Optional[str]) -> Iterator[Dict[str, Any]]:
+    changed = index.changed_since(since)
+    sheet_names = timesheet_sheet_names(wb.sheetnames)
+    if WORKDAY_SHEET in wb.sheetnames:
+        sheet_names.append(WORKDAY_SHEET)
+    for sheet_name in sheet_names:
+        marks = index.changes.get(sheet_name, {})
+        min_row, max_row = 2, None
+        if changed is not None:
+            marks = changed.pop(sheet_name, {})
+            if not marks:
+                continue
+            # Читаем только строки от первой до последней строки изменённых дней;
+            # дни без строк (всё удалено) дают лишь отметки об удалении
+            days = index.sheets.get(sheet_name, {})
+            ranges = [days[key] for key in marks if key in days]
+            min_row = min((first for first, _last in ranges), default=2)
+            max_row = max((last for _first, last in ranges), default=1)
+        fields, codec = EXPORT_FIELDS[WORKDAY_SHEET if sheet_name == WORKDAY_SHEET else TIMESHEET_SHEET]
+        codec = codec.for_workbook(wb)
+        seen: Set[str] = set()
+        if max_row is None or max_row >= min_row:
+            rows = wb[sheet_name].iter_rows(min_row=min_row, max_row=max_row, max_col=codec.width, values_only=True)
+            for row_idx, row in enumerate(rows, start=min_row):
+                if all(value is None for value in row):
+                    continue
+                record: Dict[str, Any] = {"sheet": sheet_name, "row": row_idx}
+                for field, value in zip(fields, codec.decode(row)):
+                    record[field] = _export_value(value)
+                day = record.get("date")
+                if changed is not None and day not in marks:
+                    continue
+                record["change_seq"] = marks.get(day, 0) if day else 0
+                if day:
+                    seen.add(day)
+                yield record
+        if changed is not None:
+            for key in sorted(set(marks) - seen):
+                yield {"sheet": sheet_name, "date": key, "change_seq": marks[key], "deleted": True}
+    # Изменённые дни листов, которых в книге больше нет
+    for sheet_name, marks in (changed or {}).items():
+        for key in sorted(marks):
+            yield {"sheet": sheet_name, "date": key, "change_seq": marks[key], "deleted": True}
+
+
+@metrics.timed("iter_export_rows")
+def iter_export_rows(path: Path | str, *, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Построчно отдать записи листов учёта времени и рабочего дня.
+
+    Книга открывается в режиме read-only, поэтому память не растёт с размером
+    листа. Без `since` отдаются все строки. `since` — водяной знак прошлой
+    выгрузки (см. `export_rows`): отдаются все текущие строки только тех
+    дней (лист, дата), которые менялись после него — добавление, правка,
+    удаление, отмена, окончание рабочего дня, сжатие, — а для дня, где строк
+    не осталось, — запись `{"sheet", "date", "deleted": true}`. Строки
+    такого дня заменяют у получателя все ранее выгруженные строки этой пары
+    (лист, дата): номер строки `row` после сжатия или отмены может сдвинуться.
+    У каждой записи есть `change_seq` — номер последнего изменения её дня.
+    Знак от другого индекса (файл индекса удалён) даёт полную выгрузку.
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+
+    wb = open_read_only(workbook_path, history=True)
+    try:
+        yield from _iter_export(wb, _export_index(workbook_path, wb), since)
+    finally:
+        wb.close()
+
 
-    wb.save(workbook_path)
+@metrics.timed("export_rows")
+def export_rows(
+    path: Path | str,
+    output: Path | str,
+    *,
+    fmt: Optional[str] = None,
+    since: Optional[str] = None,
+) -> Tuple[int, str]:
+    """Выгрузить записи в CSV или JSONL, записывая их по мере чтения.
+
+    Формат берётся из `fmt` ("csv"/"jsonl") или из расширения файла.
+    Возвращает число выгруженных записей и новый водяной знак — его стоит
+    передать в `since` при следующей выгрузке (см. `iter_export_rows`).
+    """
+
+    workbook_path = Path(path)
+    if not workbook_path.exists():
+        raise FileNotFoundError(f"Excel file not found: {workbook_path}")
+    output_path = Path(output)
+    kind = (fmt or output_path.suffix.lstrip(".")).lower()
+    if kind not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {kind!r}")
+
+    count = 0
+    wb = open_read_only(workbook_path, history=True)
+    try:
+        index = _export_index(workbook_path, wb)
+        with output_path.open("w", encoding="utf-8", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=EXPORT_COLUMNS) if kind == "csv" else None
+            if writer is not None:
+                writer.writeheader()
+            for record in _iter_export(wb, index, since):
+                if writer is not None:
+                    writer.writerow(record)
+                else:
+                    fh.write(json.dumps(record, ensure_ascii=False))
+                    fh.write("\n")
+                count += 1
+    finally:
+        wb.close()
+
+    metrics.count("rows_exported", count)
+    return count, index.watermark
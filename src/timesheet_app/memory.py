@@ -0,0 +1,198 @@
+"""Освобождение памяти, пока приложение простаивает.
+
+Окно открыто весь день, а после загрузки и сохранения большой книги процесс
+остаётся «толстым»: мусор от объектов openpyxl (циклические ссылки ячеек,
+стилей и листов) ждёт сборщика, а освобождённые блоки остаются у
+распределителя C и не возвращаются системе.
+
+`IdleTrimmer` раз в `CHECK_INTERVAL_MS` смотрит, когда была последняя
+операция с книгой (`metrics.last_activity`). Если дольше `IDLE_TRIM_AFTER_S`
+ничего не происходило, он один раз за период простоя сбрасывает кэши окна
+(переданные функции), запускает полную сборку мусора и возвращает свободную
+кучу системе (`malloc_trim` в glibc). Размер процесса (RSS) до и после
+показывается в окне «Диагностика» вместе с целевым значением простоя
+`TARGET_IDLE_RSS_MB` — для всего процесса окна, с Tk. Tk в тестах недоступен,
+поэтому `tests/test_memory.py` проверяет процесс без окна (запись и чтение
+книги на 5 000 строк, затем очистка) против цели за вычетом `TK_RSS_MB` —
+оценки того, что добавляют Tk и окно.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+import time
+from typing import Callable, Iterable, List, Optional, Tuple
+
+try:
+    from .metrics import last_activity
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from metrics import last_activity  # type: ignore
+
+
+# Сколько секунд без операций с книгой считается простоем
+IDLE_TRIM_AFTER_S = 120.0
+# Период проверки простоя, мс
+CHECK_INTERVAL_MS = 30_000
+# Целевой размер процесса окна в простое после очистки (Tk + openpyxl + книга), МБ
+TARGET_IDLE_RSS_MB = 80
+# Сколько из этой цели приходится на Tk и окно (оценка, в тестах не измеряется), МБ
+TK_RSS_MB = 25
+
+
+def rss_bytes() -> Optional[int]:
+    """Текущий размер резидентной памяти процесса; None — узнать не удалось."""
+
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/statm", "rb") as fh:
+                resident = int(fh.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return resident * os.sysconf("SC_PAGE_SIZE")
+    if sys.platform.startswith("win"):
+        return _windows_working_set()
+    return None
+
+
+def _windows_working_set() -> Optional[int]:
+    from ctypes import wintypes  # pylint: disable=import-outside-toplevel
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):  # noqa: N801 - имя из Windows API
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    try:
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)  # type: ignore[attr-defined]
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        get_info = kernel32.K32GetProcessMemoryInfo
+        get_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        get_info.restype = wintypes.BOOL
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if not get_info(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return int(counters.WorkingSetSize)
+    except (OSError, AttributeError):
+        return None
+
+
+_malloc_trim: Optional[Callable[[int], int]] = None
+_malloc_trim_loaded = False
+
+
+def release_heap() -> bool:
+    """Вернуть системе свободные страницы кучи C (glibc); False — нечем."""
+
+    global _malloc_trim, _malloc_trim_loaded
+    if not _malloc_trim_loaded:
+        _malloc_trim_loaded = True
+        if sys.platform.startswith("linux"):
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+                _malloc_trim = libc.malloc_trim
+                _malloc_trim.argtypes = [ctypes.c_size_t]
+                _malloc_trim.restype = ctypes.c_int
+            except (OSError, AttributeError):
+                _malloc_trim = None  # не glibc (musl и т.п.)
+    if _malloc_trim is None:
+        return False
+    _malloc_trim(0)
+    return True
+
+
+def format_mb(value: Optional[int]) -> str:
+    return "?" if value is None else f"{value / (1024 * 1024):.1f} МБ"
+
+
+class IdleTrimmer:
+    """Очистка памяти после `idle_after_s` секунд без операций с книгой."""
+
+    def __init__(
+        self,
+        root,
+        drop_caches: Iterable[Callable[[], None]] = (),
+        *,
+        idle_after_s: float = IDLE_TRIM_AFTER_S,
+        check_interval_ms: int = CHECK_INTERVAL_MS,
+    ) -> None:
+        self.root = root
+        self.drop_caches: List[Callable[[], None]] = list(drop_caches)
+        self.idle_after_s = idle_after_s
+        self.check_interval_ms = check_interval_ms
+        # (время, RSS до, RSS после, освобождено объектов сборщиком)
+        self.last_trim: Optional[Tuple[float, Optional[int], Optional[int], int]] = None
+        self.trims = 0
+        # операция с книгой, после которой память уже очищали
+        self._trimmed_after: Optional[float] = None
+        self._job: Optional[str] = None
+
+    def start(self) -> None:
+        if self._job is None:
+            self._job = self.root.after(self.check_interval_ms, self._check)
+
+    def stop(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _check(self) -> None:
+        self._job = None
+        activity = last_activity()
+        if activity != self._trimmed_after and time.monotonic() - activity >= self.idle_after_s:
+            self.trim()
+            self._trimmed_after = activity
+        self.start()
+
+    def trim(self) -> Tuple[Optional[int], Optional[int]]:
+        """Сбросить кэши, собрать мусор и вернуть память системе; вернуть RSS до и после."""
+
+        before = rss_bytes()
+        for drop in self.drop_caches:
+            try:
+                drop()
+            except Exception:  # pylint: disable=broad-except
+                pass  # кэш — лишь ускорение
+        collected = gc.collect()
+        release_heap()
+        after = rss_bytes()
+        self.trims += 1
+        self.last_trim = (time.time(), before, after, collected)
+        return before, after
+
+    def summary(self) -> str:
+        """Текстовая сводка для окна «Диагностика»."""
+
+        current = rss_bytes()
+        lines = [
+            f"Память процесса: {format_mb(current)} (цель в простое: {TARGET_IDLE_RSS_MB} МБ)",
+        ]
+        if self.last_trim is None:
+            lines.append(f"Очистка после {self.idle_after_s:.0f} с простоя ещё не выполнялась")
+        else:
+            when, before, after, collected = self.last_trim
+            verdict = ""
+            if after is not None:
+                verdict = " — в пределах цели" if after <= TARGET_IDLE_RSS_MB * 1024 * 1024 else " — выше цели"
+            lines.append(
+                f"Последняя очистка {time.strftime('%H:%M:%S', time.localtime(when))}: "
+                f"{format_mb(before)} -> {format_mb(after)}{verdict}; объектов собрано: {collected}; "
+                f"всего очисток: {self.trims}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,319 @@
+"""Трассировка операций с Excel: этапы, счётчики и гистограммы.
+
+Включается переменной окружения `TIMESHEET_METRICS=1`. Без неё `span()`
+возвращает один и тот же пустой контекст, а `count()` сразу выходит, так что
+накладные расходы — одна проверка флага.
+
+Каждая публичная функция `excel_manager` оборачивается `@timed("имя")`:
+длительность вызова целиком пишется этапом "total", а `span("этап")` внутри
+неё (в том числе во вложенных вспомогательных функциях) относится к текущей
+операции потока. Этапы: open (открытие книги), parse (загрузка индекса дат и
+снимка истории), scan (поиск строк и проходы по листам), write (запись
+ячеек), save (сохранение книги и файлов рядом). Гистограммы длительностей
+хранятся в памяти и выгружаются в `APP_DIR/metrics.json` и
+`APP_DIR/metrics.prom` (текстовый формат Prometheus) не чаще раза в
+`EXPORT_INTERVAL` секунд после операций и при выходе из программы.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple, TypeVar
+
+try:
+    from .config import APP_DIR, atomic_write_text
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import APP_DIR, atomic_write_text  # type: ignore
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+ENV_VAR = "TIMESHEET_METRICS"
+METRICS_JSON_FILE = APP_DIR / "metrics.json"
+METRICS_PROM_FILE = APP_DIR / "metrics.prom"
+
+# Границы корзин гистограмм, секунды
+BUCKETS: Tuple[float, ...] = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+EXPORT_INTERVAL = 5.0
+
+# Полная длительность операции записывается как этап "total"
+TOTAL_PHASE = "total"
+
+_NULL_SPAN = nullcontext()
+
+
+def _env_enabled() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() not in ("", "0", "false", "no", "off")
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными корзинами."""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "buckets": {str(bound): n for bound, n in zip(BUCKETS + (float("inf"),), self.counts)},
+        }
+
+
+class Registry:
+    """Гистограммы этапов и счётчики (потокобезопасно)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.counters: Dict[Tuple[str, str], float] = {}
+        self._last_export = 0.0
+
+    def observe(self, op: str, phase: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get((op, phase))
+            if histogram is None:
+                histogram = self.histograms[(op, phase)] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, op: str, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[(op, name)] = self.counters.get((op, name), 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    # ------------------------------ Выгрузка ------------------------------
+    def to_json(self) -> str:
+        with self._lock:
+            payload = {
+                "histograms": [
+                    {"op": op, "phase": phase, **histogram.to_dict()}
+                    for (op, phase), histogram in sorted(self.histograms.items())
+                ],
+                "counters": [
+                    {"op": op, "name": name, "value": value} for (op, name), value in sorted(self.counters.items())
+                ],
+            }
+        return json.dumps(payload, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP timesheet_phase_seconds Duration of excel_manager operation phases.",
+            "# TYPE timesheet_phase_seconds histogram",
+        ]
+        with self._lock:
+            for (op, phase), histogram in sorted(self.histograms.items()):
+                labels = f'op="{_escape(op)}",phase="{_escape(phase)}"'
+                cumulative = 0
+                for bound, n in zip(BUCKETS, histogram.counts):
+                    cumulative += n
+                    lines.append(f'timesheet_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'timesheet_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"timesheet_phase_seconds_sum{{{labels}}} {histogram.total:.6f}")
+                lines.append(f"timesheet_phase_seconds_count{{{labels}}} {histogram.count}")
+            lines.append("# HELP timesheet_events_total Counters of excel_manager operations.")
+            lines.append("# TYPE timesheet_events_total counter")
+            for (op, name), value in sorted(self.counters.items()):
+                lines.append(f'timesheet_events_total{{op="{_escape(op)}",name="{_escape(name)}"}} {value:g}')
+        return "\n".join(lines) + "\n"
+
+    def export(self) -> None:
+        """Записать метрики в `metrics.json` и `metrics.prom`."""
+
+        self._last_export = time.monotonic()
+        try:
+            atomic_write_text(METRICS_JSON_FILE, self.to_json())
+            atomic_write_text(METRICS_PROM_FILE, self.to_prometheus())
+        except OSError:
+            pass
+
+    def maybe_export(self) -> None:
+        if time.monotonic() - self._last_export >= EXPORT_INTERVAL:
+            self.export()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
+_enabled = False
+# Момент последней операции с книгой (time.monotonic); ведётся и без метрик
+_last_activity = time.monotonic()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def last_activity() -> float:
+    """Когда (по `time.monotonic`) последний раз вызывалась операция с книгой."""
+
+    return _last_activity
+
+
+def enable(on: bool = True) -> None:
+    """Включить или выключить сбор метрик (по умолчанию — по `TIMESHEET_METRICS`)."""
+
+    global _enabled
+    if on and not _enabled:
+        atexit.register(registry.export)
+    _enabled = on
+
+
+_local = threading.local()
+
+
+def _current_op() -> str:
+    stack = getattr(_local, "ops", None)
+    return stack[-1] if stack else "other"
+
+
+def _push(op: str) -> None:
+    stack = getattr(_local, "ops", None)
+    if stack is None:
+        stack = _local.ops = []
+    stack.append(op)
+
+
+def _pop() -> None:
+    _local.ops.pop()
+
+
+class _Span:
+    __slots__ = ("op", "phase", "started")
+
+    def __init__(self, op: str, phase: str) -> None:
+        self.op = op
+        self.phase = phase
+        self.started = 0.0
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        registry.observe(self.op, self.phase, time.perf_counter() - self.started)
+
+
+def span(phase: str) -> ContextManager[Any]:
+    """Замер этапа `phase` текущей операции; при выключенных метриках — пустой контекст."""
+
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(_current_op(), phase)
+
+
+def count(name: str, value: float = 1) -> None:
+    """Увеличить счётчик `name` текущей операции."""
+
+    if _enabled:
+        registry.count(_current_op(), name, value)
+
+
+def _finish(op: str, seconds: float, failed: bool) -> None:
+    registry.observe(op, TOTAL_PHASE, seconds)
+    registry.count(op, "calls")
+    if failed:
+        registry.count(op, "errors")
+    registry.maybe_export()
+
+
+def timed(op: str) -> Callable[[F], F]:
+    """Декоратор публичной функции: длительность, число вызовов и ошибок.
+
+    У генераторов учитывается только время внутри самого генератора (между
+    запросом следующего элемента и его выдачей), а не время потребителя.
+    """
+
+    def decorator(func: F) -> F:
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+                global _last_activity
+                _last_activity = time.monotonic()
+                if not _enabled:
+                    return (yield from func(*args, **kwargs))
+                spent = 0.0
+                failed = False
+                iterator = func(*args, **kwargs)
+                try:
+                    while True:
+                        started = time.perf_counter()
+                        _push(op)
+                        try:
+                            item = next(iterator)
+                        except StopIteration as stop:
+                            return stop.value
+                        except BaseException:
+                            failed = True
+                            raise
+                        finally:
+                            _pop()
+                            spent += time.perf_counter() - started
+                        yield item
+                finally:
+                    iterator.close()
+                    _finish(op, spent, failed)
+
+            return gen_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            global _last_activity
+            _last_activity = time.monotonic()
+            if not _enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            failed = False
+            _push(op)
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                failed = True
+                raise
+            finally:
+                _pop()
+                _finish(op, time.perf_counter() - started, failed)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def summary() -> Optional[str]:
+    """Сводка для окна диагностики: число замеров и среднее по этапам."""
+
+    if not _enabled:
+        return None
+    lines = []
+    with registry._lock:  # pylint: disable=protected-access
+        items = sorted(registry.histograms.items())
+    for (op, phase), histogram in items:
+        mean_ms = histogram.total / histogram.count * 1000 if histogram.count else 0.0
+        lines.append(f"  {op}.{phase}: {histogram.count} / среднее {mean_ms:.1f} мс")
+    return "\n".join(lines)
+
+
+enable(_env_enabled())
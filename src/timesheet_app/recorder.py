@@ -0,0 +1,167 @@
+"""Запись последовательности операций окна для воспроизведения (`replay`).
+
+Включается переменной окружения `TIMESHEET_RECORD=1` или ключом
+`"record_trace": true` в `config.json`. Каждый запуск пишет свою трассу
+`APP_DIR/traces/trace-ГГГГММДД-ЧЧММСС-<pid>.jsonl`: первая строка — заголовок
+(формат и момент начала), далее по строке JSON на операцию:
+
+    {"t": 12.345, "op": "stop", "ms": 84.1, "ok": true, "pairs": [[0, 1]], "seconds": [1800], "sharded": false}
+
+- `t` — секунды от начала трассы до начала операции, `ms` — сколько заняла
+  работа с книгой в окне (для сравнения с воспроизведением);
+- проекты и виды работ заменены номерами в порядке первого появления в
+  трассе, книги — тоже номерами: имён, путей и дат в трассе нет.
+
+Строка дописывается и сбрасывается на диск сразу после операции, поэтому
+трасса переживает аварийное завершение приложения.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .config import APP_DIR
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import APP_DIR  # type: ignore
+
+
+ENV_VAR = "TIMESHEET_RECORD"
+TRACE_DIR = APP_DIR / "traces"
+TRACE_FORMAT = "timesheet-trace/1"
+
+# Операции трассы: таймеры (без работы с книгой) и операции с книгой
+TIMER_OPS = ("start", "pause")
+WORKBOOK_OPS = ("stop", "open", "reload", "workday_start", "workday_end", "undo", "compact", "rebuild_summary")
+
+
+def env_enabled() -> bool:
+    return os.environ.get(ENV_VAR, "").strip().lower() not in {"", "0", "false", "no", "off"}
+
+
+def new_trace_path() -> Path:
+    return TRACE_DIR / f"trace-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}.jsonl"
+
+
+class Recorder:
+    """Запись операций в трассу; без пути (`path=None`) ничего не делает."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._fh: Optional[IO[str]] = None
+        self._t0 = time.monotonic()
+        # имя -> номер, отдельно для проектов, видов работ и книг
+        self._ids: Dict[str, Dict[str, int]] = {"project": {}, "work_type": {}, "workbook": {}}
+        self.operations = 0
+        if self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = self.path.open("a", encoding="utf-8")
+            except OSError:
+                self.path = None  # трасса — лишь инструмент, окно работает и без неё
+                return
+            self._write({"format": TRACE_FORMAT, "started": datetime.now().isoformat(timespec="seconds")})
+
+    @property
+    def enabled(self) -> bool:
+        return self._fh is not None
+
+    def _id(self, kind: str, name: str) -> int:
+        ids = self._ids[kind]
+        return ids.setdefault(name, len(ids))
+
+    def _pairs(self, pairs: Iterable[Tuple[str, str]]) -> List[List[int]]:
+        return [[self._id("project", project), self._id("work_type", work_type)] for project, work_type in pairs]
+
+    def _write(self, item: Dict[str, Any]) -> None:
+        if self._fh is None:
+            return
+        try:
+            self._fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+            self._fh.flush()
+        except OSError:
+            self.close()
+
+    def _item(self, op: str, started: float, pairs: Iterable[Tuple[str, str]], fields: Dict[str, Any]) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"t": round(started - self._t0, 3), "op": op}
+        if pairs:
+            item["pairs"] = self._pairs(pairs)
+        workbook = fields.pop("workbook", None)
+        if workbook is not None:
+            item["workbook"] = self._id("workbook", str(workbook))
+        item.update(fields)
+        return item
+
+    def mark(self, op: str, *, pairs: Iterable[Tuple[str, str]] = (), **fields: Any) -> None:
+        """Записать мгновенную операцию (старт, пауза таймера)."""
+
+        if self._fh is None:
+            return
+        self.operations += 1
+        self._write(self._item(op, time.monotonic(), list(pairs), fields))
+
+    @contextmanager
+    def step(self, op: str, *, pairs: Iterable[Tuple[str, str]] = (), **fields: Any) -> Iterator[None]:
+        """Записать операцию с книгой вместе с её длительностью и исходом.
+
+        Исключение внутри блока отмечается `"ok": false` и пробрасывается дальше.
+        """
+
+        if self._fh is None:
+            yield
+            return
+        started = time.monotonic()
+        pairs = list(pairs)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            item = self._item(op, started, pairs, fields)
+            item["ms"] = round((time.monotonic() - started) * 1000.0, 2)
+            item["ok"] = ok
+            self.operations += 1
+            self._write(item)
+
+    def close(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except OSError:
+                pass
+            self._fh = None
+
+    def summary(self) -> Optional[str]:
+        """Строка для окна «Диагностика» (None — запись выключена)."""
+
+        if self._fh is None or self.path is None:
+            return None
+        return f"Запись трассы: {self.path} (операций: {self.operations})"
+
+
+def read_trace(path: Path | str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Прочитать трассу: заголовок и операции по порядку."""
+
+    header: Dict[str, Any] = {}
+    operations: List[Dict[str, Any]] = []
+    with Path(path).open("r", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # строка, оборванная при сбое
+            if not isinstance(item, dict):
+                continue
+            if "format" in item:
+                if item["format"] != TRACE_FORMAT:
+                    raise ValueError(f"Unsupported trace format: {item['format']!r}")
+                header = item
+            elif "op" in item and "t" in item:
+                operations.append(item)
+    return header, operations
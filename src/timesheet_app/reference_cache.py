@@ -0,0 +1,139 @@
+"""Кэш разобранных справочников для недавних книг.
+
+Для каждой книги из списка недавних храним небольшой снимок листа
+«Справочник» (строки-пары проект/вид работ, см. `reference_index`) вместе с
+размером и временем изменения файла. Переключение на книгу берёт данные из снимка мгновенно, а свежесть
+проверяется в фоне по `stat()` — полный разбор нужен только если файл менялся.
+Собственные записи приложения справочник не меняют, поэтому после них снимок
+лишь получает новую отметку файла (`restamp`).
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+try:
+    from .config import REFERENCE_CACHE_FILE, atomic_write_text, file_stamp
+    from .reference_index import ReferenceIndex
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import REFERENCE_CACHE_FILE, atomic_write_text, file_stamp  # type: ignore
+    from reference_index import ReferenceIndex  # type: ignore
+
+
+@dataclass
+class ReferenceSnapshot:
+    """Снимок справочника одной книги."""
+
+    path: str
+    mtime_ns: int
+    size: int
+    # строки справочника [проект, вид работ]; "" — пустая ячейка
+    rows: List[List[str]] = field(default_factory=list)
+
+    @property
+    def index(self) -> ReferenceIndex:
+        return ReferenceIndex(self.rows)
+
+
+class ReferenceCache:
+    """Снимки справочников, сохраняемые в `reference_cache.json`."""
+
+    def __init__(self, cache_file: Path = REFERENCE_CACHE_FILE) -> None:
+        self._cache_file = cache_file
+        self._snapshots: Dict[str, ReferenceSnapshot] = {}
+        # часть снимков выгружена из памяти (`release`) и лежит только в файле
+        self._released = False
+
+    @classmethod
+    def load(cls, cache_file: Path = REFERENCE_CACHE_FILE) -> "ReferenceCache":
+        """Прочитать кэш с диска; повреждённый файл просто игнорируется."""
+
+        cache = cls(cache_file)
+        try:
+            data = json.loads(cache_file.read_text(encoding="utf-8"))
+            for item in data:
+                if "rows" not in item:
+                    continue  # снимок прежней версии без пар — книга перечитается
+                snapshot = ReferenceSnapshot(**item)
+                cache._snapshots[snapshot.path] = snapshot
+        except (OSError, json.JSONDecodeError, TypeError, ValueError):
+            pass
+        return cache
+
+    def get(self, path: str) -> Optional[ReferenceSnapshot]:
+        """Вернуть снимок книги (возможно, устаревший) или None."""
+
+        if path not in self._snapshots:
+            self._reload()
+        return self._snapshots.get(path)
+
+    @staticmethod
+    def is_fresh(snapshot: ReferenceSnapshot) -> bool:
+        """Проверить, что файл не менялся с момента снимка."""
+
+        return file_stamp(snapshot.path) == (snapshot.mtime_ns, snapshot.size)
+
+    def put(self, path: str, index: ReferenceIndex, *, stamp: Optional[tuple[int, int]] = None) -> None:
+        """Запомнить свежеразобранный справочник книги.
+
+        `stamp` стоит снять до разбора файла: если книгу изменили во время
+        чтения, снимок окажется устаревшим и будет перечитан, а не наоборот.
+        """
+
+        stamp = stamp or file_stamp(path)
+        if stamp is None:
+            return
+        self._snapshots[path] = ReferenceSnapshot(path, stamp[0], stamp[1], [list(row) for row in index.rows])
+
+    def restamp(self, path: str, before: Optional[tuple[int, int]]) -> bool:
+        """Перенести снимок на текущую отметку файла после записи книги приложением.
+
+        `before` — отметка, снятая перед записью: снимок, который уже тогда
+        был устаревшим, не трогается. Возвращает True, если снимок обновлён.
+        """
+
+        snapshot = self.get(path)
+        if snapshot is None or before is None or (snapshot.mtime_ns, snapshot.size) != before:
+            return False
+        stamp = file_stamp(path)
+        if stamp is None or stamp == before:
+            return False
+        snapshot.mtime_ns, snapshot.size = stamp
+        return True
+
+    def retain(self, paths: Iterable[str]) -> None:
+        """Оставить снимки только для перечисленных книг (список недавних)."""
+
+        self._reload()
+        keep = set(paths)
+        for path in list(self._snapshots):
+            if path not in keep:
+                del self._snapshots[path]
+
+    def release(self, keep: Iterable[str] = ()) -> None:
+        """Выгрузить из памяти снимки всех книг, кроме `keep` (очистка в простое).
+
+        Снимки остаются в файле кэша и читаются снова при первом обращении.
+        """
+
+        keep = set(keep)
+        if any(path not in keep for path in self._snapshots):
+            self._snapshots = {path: snapshot for path, snapshot in self._snapshots.items() if path in keep}
+            self._released = True
+
+    def _reload(self) -> None:
+        if not self._released:
+            return
+        self._released = False
+        for path, snapshot in self.load(self._cache_file)._snapshots.items():
+            self._snapshots.setdefault(path, snapshot)
+
+    def save(self) -> None:
+        """Сохранить кэш на диск (атомарно)."""
+
+        self._reload()
+        payload = [asdict(snapshot) for snapshot in self._snapshots.values()]
+        atomic_write_text(self._cache_file, json.dumps(payload, ensure_ascii=False))
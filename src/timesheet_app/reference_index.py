@@ -0,0 +1,79 @@
+"""Индекс «проект → допустимые виды работ» по листу «Справочник».
+
+Каждая строка справочника — пара (проект, вид работ):
+
+- заполнены обе ячейки — вид работ относится к этому проекту;
+- пустой проект — вид работ общий, он доступен во всех проектах;
+- пустой вид работ — строка лишь объявляет проект.
+
+Проекту без собственных пар доступны все виды работ. Списки для всех
+проектов считаются один раз при построении индекса, поэтому смена проекта в
+окне — один поиск в словаре, без повторного прохода по справочнику.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Pair = Tuple[str, str]
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+class ReferenceIndex:
+    """Проекты, виды работ и допустимые сочетания из справочника."""
+
+    def __init__(self, rows: Iterable[Tuple[Any, Any]] = ()) -> None:
+        # строки справочника после очистки: ("", вид) — общий вид работ
+        self.rows: List[Pair] = []
+        self.projects: List[str] = []
+        self.work_types: List[str] = []
+        self.shared: List[str] = []
+        # проект -> собственные виды работ в порядке листа
+        self.pairs: Dict[str, List[str]] = {}
+
+        seen_projects: set = set()
+        seen_work_types: set = set()
+        seen_pairs: set = set()
+        for project_value, work_value in rows:
+            project, work_type = _text(project_value), _text(work_value)
+            if not project and not work_type:
+                continue
+            if (project, work_type) in seen_pairs:
+                continue
+            seen_pairs.add((project, work_type))
+            self.rows.append((project, work_type))
+            if project and project not in seen_projects:
+                seen_projects.add(project)
+                self.projects.append(project)
+            if work_type and work_type not in seen_work_types:
+                seen_work_types.add(work_type)
+                self.work_types.append(work_type)
+            if work_type:
+                if project:
+                    self.pairs.setdefault(project, []).append(work_type)
+                elif work_type not in self.shared:
+                    self.shared.append(work_type)
+
+        # Готовые списки: собственные и общие виды работ в порядке листа
+        shared = set(self.shared)
+        self._allowed: Dict[str, List[str]] = {}
+        for project, own in self.pairs.items():
+            allowed = shared.union(own)
+            self._allowed[project] = [item for item in self.work_types if item in allowed]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ReferenceIndex) and self.rows == other.rows
+
+    @property
+    def has_pairs(self) -> bool:
+        """В справочнике есть виды работ, привязанные к проектам."""
+
+        return bool(self.pairs)
+
+    def work_types_for(self, project: Optional[str]) -> List[str]:
+        """Виды работ, допустимые для проекта (все — если у проекта нет своих)."""
+
+        return self._allowed.get(project or "", self.work_types)
@@ -0,0 +1,212 @@
+"""Воспроизведение записанной трассы (`recorder`) на копии книги.
+
+Команда копирует книгу во временный каталог и без окна выполняет на копии
+те же операции с книгой, что и пользователь, — в том же порядке и с теми же
+паузами, ускоренными в `--speed` раз (`--speed 0` — без пауз). Проекты и
+виды работ берутся из справочника копии по номерам из трассы (если номеров
+больше, чем строк справочника, — «Проект N»/«Вид работ N»). Записи «Стоп»
+получают время окончания по трассе, поэтому ложатся на те же дни и месяцы.
+
+В конце печатается распределение задержек по операциям (p50/p90/p99/макс) и,
+для сравнения, задержки тех же операций в исходном сеансе. Разные способы
+хранения сравниваются запуском одной трассы с разными ключами:
+`--engine`, `--compress-level`, `--hot-sheet-level`, `--sharded`.
+
+Запуск:
+    python -m timesheet_app.replay <трасса.jsonl> <книга.xlsx> [--speed 100] [--json отчёт.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .excel_manager import (
+    READ_ENGINES,
+    TimeEntry,
+    append_time_entries,
+    compact_timesheet,
+    configure,
+    load_reference_index,
+    rebuild_summary,
+    undo_last_entry,
+    workday_end,
+    workday_start,
+)
+from .recorder import WORKBOOK_OPS, read_trace
+from .reference_index import ReferenceIndex
+from .watchdog import percentile
+
+
+@dataclass
+class OpStats:
+    """Задержки одной операции: при воспроизведении и в исходном сеансе, мс."""
+
+    replayed: List[float] = field(default_factory=list)
+    recorded: List[float] = field(default_factory=list)
+    errors: int = 0
+
+
+@dataclass
+class ReplayReport:
+    operations: Dict[str, OpStats]
+    elapsed: float
+    skipped: int
+
+    def as_dict(self) -> Dict[str, Any]:
+        def dist(values: List[float]) -> Dict[str, float]:
+            return {
+                "count": len(values),
+                "p50": round(percentile(values, 0.50), 2),
+                "p90": round(percentile(values, 0.90), 2),
+                "p99": round(percentile(values, 0.99), 2),
+                "max": round(max(values, default=0.0), 2),
+            }
+
+        return {
+            "elapsed_s": round(self.elapsed, 3),
+            "skipped": self.skipped,
+            "operations": {
+                op: {"replayed_ms": dist(stats.replayed), "recorded_ms": dist(stats.recorded), "errors": stats.errors}
+                for op, stats in self.operations.items()
+            },
+        }
+
+
+class _Names:
+    """Номера из трассы -> имена из справочника копии книги."""
+
+    def __init__(self, index: ReferenceIndex) -> None:
+        self.index = index
+
+    def pair(self, project_id: int, work_type_id: int) -> tuple[str, str]:
+        projects, work_types = self.index.projects, self.index.work_types
+        project = projects[project_id] if project_id < len(projects) else f"Проект {project_id + 1}"
+        work_type = work_types[work_type_id] if work_type_id < len(work_types) else f"Вид работ {work_type_id + 1}"
+        return project, work_type
+
+
+def _operation(item: Dict[str, Any], path: Path, names: _Names, started: datetime) -> Callable[[], Any]:
+    op = item["op"]
+    if op == "stop":
+        finished_at = started + timedelta(seconds=float(item["t"]))
+        entries = [
+            TimeEntry(*names.pair(project_id, work_type_id), float(seconds), finished_at)
+            for (project_id, work_type_id), seconds in zip(item.get("pairs", []), item.get("seconds", []))
+        ]
+        return lambda: append_time_entries(path, entries, sharded=bool(item.get("sharded")))
+    if op in ("open", "reload"):
+        return lambda: load_reference_index(path)
+    if op == "workday_start":
+        return lambda: workday_start(path)
+    if op == "workday_end":
+        return lambda: workday_end(path, compact=bool(item.get("compact")))
+    if op == "undo":
+        return lambda: undo_last_entry(path)
+    if op == "compact":
+        return lambda: compact_timesheet(path)
+    if op == "rebuild_summary":
+        return lambda: rebuild_summary(path)
+    raise ValueError(f"Unknown operation: {op!r}")
+
+
+def replay(
+    trace: Path | str,
+    workbook: Path | str,
+    *,
+    speed: float = 0.0,
+    sharded: Optional[bool] = None,
+) -> ReplayReport:
+    """Выполнить операции трассы на копии `workbook`; исходная книга не меняется.
+
+    `speed` — во сколько раз быстрее исходного сеанса (0 — без пауз),
+    `sharded` — переопределить запись на помесячные листы из трассы.
+    """
+
+    header, items = read_trace(trace)
+    started = datetime.fromisoformat(header["started"]) if header.get("started") else datetime.now()
+    operations: Dict[str, OpStats] = {}
+    skipped = 0
+
+    with tempfile.TemporaryDirectory(prefix="timesheet-replay-") as tmp:
+        path = Path(tmp) / Path(workbook).name
+        shutil.copy2(workbook, path)
+        names = _Names(load_reference_index(path))
+
+        origin = time.perf_counter()
+        previous_t = 0.0
+        for item in items:
+            op = item["op"]
+            if op not in WORKBOOK_OPS:
+                continue  # таймеры не трогают книгу
+            if speed > 0:
+                delay = (float(item["t"]) - previous_t) / speed
+                if delay > 0:
+                    time.sleep(delay)
+            previous_t = float(item["t"])
+            if item.get("cached"):
+                continue  # справочник взят из снимка, книга не читалась
+            if item.get("ok") is False:
+                skipped += 1  # в исходном сеансе операция не удалась — её результат неизвестен
+                continue
+            if sharded is not None and op == "stop":
+                item = dict(item, sharded=sharded)
+            run = _operation(item, path, names, started)
+            stats = operations.setdefault(op, OpStats())
+            if "ms" in item:
+                stats.recorded.append(float(item["ms"]))
+            begin = time.perf_counter()
+            try:
+                run()
+            except Exception:  # pylint: disable=broad-except
+                stats.errors += 1
+                continue
+            stats.replayed.append((time.perf_counter() - begin) * 1000.0)
+        elapsed = time.perf_counter() - origin
+
+    return ReplayReport(operations=operations, elapsed=elapsed, skipped=skipped)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Точка входа командной строки."""
+
+    parser = argparse.ArgumentParser(description="Воспроизведение трассы операций на копии книги")
+    parser.add_argument("trace", help="трасса .jsonl (~/.timesheet_app/traces)")
+    parser.add_argument("workbook", help="книга .xlsx; изменяется только её временная копия")
+    parser.add_argument("--speed", type=float, default=0.0, help="ускорение пауз между операциями (0 — без пауз)")
+    parser.add_argument("--engine", choices=READ_ENGINES, default=None, help="движок чтения книг (по умолчанию xml)")
+    parser.add_argument("--compress-level", type=int, default=None, help="сжатие книги при сохранении, 0..9")
+    parser.add_argument("--hot-sheet-level", type=int, default=None, help="сжатие листов учёта времени, 0..9")
+    parser.add_argument(
+        "--sharded", action=argparse.BooleanOptionalAction, default=None, help="помесячные листы (по умолчанию — как в трассе)"
+    )
+    parser.add_argument("--json", dest="json_path", default=None, help="сохранить отчёт в JSON")
+    args = parser.parse_args(argv)
+
+    configure(read_engine=args.engine, compress_level=args.compress_level)
+    if args.hot_sheet_level is not None:
+        configure(hot_sheet_level=args.hot_sheet_level)
+
+    report = replay(args.trace, args.workbook, speed=args.speed, sharded=args.sharded)
+    data = report.as_dict()
+    print(f"{'Операция':<16}{'N':>6}{'p50':>10}{'p90':>10}{'p99':>10}{'макс':>10}{'в сеансе p50':>14}{'ошибок':>8}")
+    for op, stats in data["operations"].items():
+        replayed, recorded = stats["replayed_ms"], stats["recorded_ms"]
+        print(
+            f"{op:<16}{replayed['count']:>6}{replayed['p50']:>10.1f}{replayed['p90']:>10.1f}"
+            f"{replayed['p99']:>10.1f}{replayed['max']:>10.1f}{recorded['p50']:>14.1f}{stats['errors']:>8}"
+        )
+    print(f"Итого: {data['elapsed_s']:.3f} с (мс на операцию; пропущено неудачных в сеансе: {report.skipped})")
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
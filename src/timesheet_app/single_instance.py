@@ -0,0 +1,237 @@
+"""Один экземпляр приложения на пользователя.
+
+Блокировка — файл `APP_DIR/instance.lock`, на который первый запуск ставит
+исключительную блокировку ОС (`flock`, на Windows — `msvcrt.locking`); она
+снимается сама, когда процесс завершается (в том числе аварийно). Каталог
+`APP_DIR` свой у каждого пользователя, поэтому два пользователя одной машины
+друг другу не мешают.
+
+Первый запуск слушает локальный TCP-порт (127.0.0.1, любой свободный) и
+записывает его вместе со случайным ключом в `APP_DIR/instance.json` с правами
+0600. Повторный запуск, не получив блокировку, читает этот файл, подключается
+и отправляет одну строку JSON с ключом: поднять окно и, если передан путь,
+открыть эту книгу. Просьбы без верного ключа (от чужих процессов и других
+пользователей) отбрасываются без ответа. Получив ответ, повторный запуск сразу
+завершается — ещё до импорта Tk и openpyxl, поэтому это занимает миллисекунды.
+
+Если блокировку не проверить (каталог недоступен) или работающий экземпляр
+не отвечает, приложение запускается как обычно, без защиты от второго
+экземпляра.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+try:
+    from .config import APP_DIR, atomic_write_text
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import APP_DIR, atomic_write_text  # type: ignore
+
+LOCK_FILE = APP_DIR / "instance.lock"
+# Порт и ключ работающего экземпляра (права 0600)
+INSTANCE_FILE = APP_DIR / "instance.json"
+# Сколько ждать ответа запущенного экземпляра, с
+CONNECT_TIMEOUT = 0.5
+# Метка протокола: отличает наш экземпляр от чужой программы на том же порту
+PROTOCOL = "timesheet-app/2"
+MAX_MESSAGE = 64 * 1024
+# Период, с которым окно забирает принятые просьбы в главный поток, мс
+REQUEST_POLL_MS = 250
+
+
+@dataclass
+class InstanceRequest:
+    """Просьба повторного запуска к работающему экземпляру."""
+
+    # путь к книге, которую нужно открыть; None — только показать окно
+    path: Optional[str] = None
+
+
+class InstanceLock:
+    """Блокировка первого экземпляра и приём просьб от повторных запусков."""
+
+    def __init__(self, sock: Optional[socket.socket], lock_fd: Optional[int] = None, token: str = "") -> None:
+        self._sock = sock
+        self._lock_fd = lock_fd
+        self._token = token
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def held(self) -> bool:
+        """Блокировка наша (False — работаем без защиты)."""
+
+        return self._sock is not None
+
+    def serve(self, handler: Callable[[InstanceRequest], None]) -> None:
+        """Принимать просьбы в фоновом потоке; `handler` вызывается из этого потока."""
+
+        if self._sock is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._accept_loop, args=(self._sock, self._token, handler), name="timesheet-instance", daemon=True
+        )
+        self._thread.start()
+
+    @staticmethod
+    def _accept_loop(sock: socket.socket, token: str, handler: Callable[[InstanceRequest], None]) -> None:
+        while True:
+            try:
+                conn, _addr = sock.accept()
+            except OSError:
+                return  # сокет закрыт
+            with conn:
+                try:
+                    conn.settimeout(CONNECT_TIMEOUT)
+                    request = _read_request(conn, token)
+                    if request is None:
+                        continue
+                    handler(request)
+                    conn.sendall(b'{"ok": true}\n')
+                except (OSError, ValueError):
+                    continue
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+        if self._lock_fd is not None:
+            # Файл с ключом убирает владелец, пока блокировка ещё его
+            try:
+                INSTANCE_FILE.unlink(missing_ok=True)
+            except OSError:
+                pass
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+def _read_line(conn: socket.socket) -> bytes:
+    data = b""
+    while b"\n" not in data and len(data) < MAX_MESSAGE:
+        chunk = conn.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.split(b"\n", 1)[0]
+
+
+def _read_request(conn: socket.socket, token: str) -> Optional[InstanceRequest]:
+    message = json.loads(_read_line(conn).decode("utf-8"))
+    if not isinstance(message, dict) or message.get("protocol") != PROTOCOL:
+        return None
+    presented = message.get("token")
+    if not token or not isinstance(presented, str) or not secrets.compare_digest(presented, token):
+        return None
+    path = message.get("path")
+    return InstanceRequest(path=str(path) if path else None)
+
+
+def _lock() -> Optional[int]:
+    """Занять `LOCK_FILE`; None — его держит другой процесс.
+
+    OSError — файл не открыть (каталог недоступен), блокировку не проверить.
+    """
+
+    LOCK_FILE.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _listen() -> Optional[socket.socket]:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(4)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _read_instance() -> Optional[Tuple[int, str]]:
+    """Порт и ключ работающего экземпляра из `INSTANCE_FILE`."""
+
+    # Экземпляр мог занять блокировку, но ещё не записать файл
+    deadline = time.monotonic() + CONNECT_TIMEOUT
+    while True:
+        try:
+            data = json.loads(INSTANCE_FILE.read_text(encoding="utf-8"))
+            return int(data["port"]), str(data["token"])
+        except (OSError, ValueError, KeyError, TypeError):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.05)
+
+
+def forward(request: InstanceRequest, instance: Optional[Tuple[int, str]] = None) -> bool:
+    """Передать просьбу работающему экземпляру; True — он её принял.
+
+    `instance` — порт и ключ; по умолчанию читаются из `INSTANCE_FILE`.
+    """
+
+    instance = instance or _read_instance()
+    if instance is None:
+        return False
+    port, token = instance
+    payload = json.dumps({"protocol": PROTOCOL, "token": token, "path": request.path}, ensure_ascii=False) + "\n"
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=CONNECT_TIMEOUT) as conn:
+            conn.sendall(payload.encode("utf-8"))
+            reply = json.loads(_read_line(conn).decode("utf-8") or "{}")
+    except (OSError, ValueError):
+        return False
+    return isinstance(reply, dict) and reply.get("ok") is True
+
+
+def claim(path: Optional[str] = None) -> Optional[InstanceLock]:
+    """Занять блокировку или передать `path` уже запущенному экземпляру.
+
+    Возвращает блокировку, с которой нужно запускать окно, или None, если
+    просьба передана работающему экземпляру и этот процесс должен завершиться.
+    """
+
+    if path:
+        path = str(Path(path).resolve())
+    try:
+        lock_fd = _lock()
+    except OSError:
+        return InstanceLock(None)
+    if lock_fd is None:
+        if forward(InstanceRequest(path=path)):
+            return None
+        # Экземпляр завис или не отвечает — запускаемся без защиты
+        return InstanceLock(None)
+    sock = _listen()
+    if sock is not None:
+        token = secrets.token_hex(16)
+        try:
+            atomic_write_text(INSTANCE_FILE, json.dumps({"port": sock.getsockname()[1], "token": token}), mode=0o600)
+        except OSError:
+            sock.close()
+        else:
+            return InstanceLock(sock, lock_fd, token)
+    os.close(lock_fd)
+    return InstanceLock(None)
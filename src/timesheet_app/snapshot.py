@@ -0,0 +1,252 @@
+"""Двоичный снимок истории учёта времени для быстрых отчётов.
+
+История листов учёта почти всегда только дописывается, поэтому вместо
+повторного разбора XML книги храним рядом с настройками приложения (см.
+`config.sidecar_path`) два файла:
+
+- `.snapshot.bin` — записи фиксированной ширины `RECORD` (порядковый номер
+  даты, номер проекта, номер вида работ, секунды), только дописываются;
+- `.snapshot.json` — таблица строк (проекты и виды работ), число записей и
+  отметка файла книги, к которой снимок привязан.
+
+Читатели отображают `.bin` в память (`mmap`) и читают его без копирования и
+без openpyxl: построчно через `struct.iter_unpack` или по столбцам — запись
+занимает ровно три 32-битных слова, поэтому `memoryview.cast("I")` со срезом
+с шагом 3 даёт столбец без распаковки кортежей. Учитываются только
+первые `count` записей: хвост, дописанный перед сбоем, просто отбрасывается.
+Снимок строит и поддерживает `excel_manager`: новые записи дописываются при
+каждом «Стоп», а правка и отмена записей снимок сбрасывают.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .config import atomic_write_text, file_stamp, sidecar_path
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import atomic_write_text, file_stamp, sidecar_path  # type: ignore
+
+
+RECORDS_SUFFIX = ".snapshot.bin"
+META_SUFFIX = ".snapshot.json"
+FORMAT_VERSION = 1
+
+# Дата (date.toordinal), проект, вид работ, секунды
+RECORD = struct.Struct("<iHHI")
+
+# Номера строк хранятся в 2 байтах
+MAX_STRINGS = 0xFFFF
+
+Record = Tuple[int, int, int, int]
+
+
+def record_seconds(seconds: Optional[float]) -> int:
+    """Длительность так, как её хранит снимок: целые секунды, не меньше нуля.
+
+    Отчёты, которые суммируют записи без снимка, округляют каждую запись так
+    же, чтобы итоги не зависели от того, был ли снимок.
+    """
+
+    return max(int(round(seconds or 0.0)), 0)
+
+
+class SnapshotOverflow(ValueError):
+    """В таблице строк закончились номера; снимок нужно отключить."""
+
+
+class HistorySnapshot:
+    """Снимок записей учёта времени одной книги."""
+
+    def __init__(self, workbook_path: Path | str) -> None:
+        self.workbook_path = Path(workbook_path)
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.count = 0
+        self.stamp: Optional[Tuple[int, int]] = None
+        # записи, ещё не сброшенные на диск (`save`)
+        self._pending = bytearray()
+
+    @property
+    def records_path(self) -> Path:
+        return sidecar_path(self.workbook_path, RECORDS_SUFFIX)
+
+    @property
+    def meta_path(self) -> Path:
+        return sidecar_path(self.workbook_path, META_SUFFIX)
+
+    @classmethod
+    def load(cls, workbook_path: Path | str) -> Optional["HistorySnapshot"]:
+        """Прочитать снимок; None — снимка нет или он повреждён."""
+
+        snapshot = cls(workbook_path)
+        try:
+            data = json.loads(snapshot.meta_path.read_text(encoding="utf-8"))
+            if data["version"] != FORMAT_VERSION:
+                return None
+            snapshot.strings = [str(item) for item in data["strings"]]
+            snapshot.count = int(data["count"])
+            stamp = data.get("stamp")
+            snapshot.stamp = tuple(stamp) if stamp else None  # type: ignore[assignment]
+            if snapshot.records_path.stat().st_size < snapshot.count * RECORD.size:
+                return None
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
+        snapshot._ids = {value: idx for idx, value in enumerate(snapshot.strings)}
+        return snapshot
+
+    @classmethod
+    def build(
+        cls,
+        workbook_path: Path | str,
+        entries: Iterable[Tuple[date, Optional[str], Optional[str], float]],
+    ) -> "HistorySnapshot":
+        """Построить снимок заново по записям (дата, проект, вид работ, секунды)."""
+
+        snapshot = cls(workbook_path)
+        for day, project, work_type, seconds in entries:
+            snapshot.add(day, project, work_type, seconds)
+        return snapshot
+
+    @staticmethod
+    def discard(workbook_path: Path | str) -> None:
+        """Удалить снимок (историю правили — при следующем чтении он перестроится)."""
+
+        for suffix in (META_SUFFIX, RECORDS_SUFFIX):
+            try:
+                sidecar_path(workbook_path, suffix).unlink()
+            except OSError:
+                pass
+
+    def is_current(self) -> bool:
+        """Снимок соответствует книге на диске."""
+
+        return self.stamp is not None and file_stamp(self.workbook_path) == self.stamp
+
+    def _string_id(self, value: Optional[str]) -> int:
+        value = value or ""
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            if idx >= MAX_STRINGS:
+                raise SnapshotOverflow("too many distinct projects/work types for a snapshot")
+            self.strings.append(value)
+            self._ids[value] = idx
+        return idx
+
+    def add(self, day: date, project: Optional[str], work_type: Optional[str], seconds: float) -> None:
+        """Добавить запись (на диск попадёт при `save`)."""
+
+        self._pending += RECORD.pack(
+            day.toordinal(),
+            self._string_id(project),
+            self._string_id(work_type),
+            record_seconds(seconds),
+        )
+
+    def save(self) -> None:
+        """Дописать новые записи и привязать снимок к текущему состоянию книги.
+
+        Сначала дописываются записи (после обрезки возможного «хвоста»), затем
+        атомарно заменяется `.json` с новым числом записей: при сбое между
+        шагами читатели видят прежний снимок.
+        """
+
+        path = self.records_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "r+b" if path.exists() else "w+b") as fh:
+            fh.truncate(self.count * RECORD.size)
+            fh.seek(0, 2)
+            fh.write(self._pending)
+        self.count += len(self._pending) // RECORD.size
+        self._pending = bytearray()
+        self.stamp = file_stamp(self.workbook_path)
+        payload = {
+            "version": FORMAT_VERSION,
+            "stamp": list(self.stamp) if self.stamp else None,
+            "count": self.count,
+            "strings": self.strings,
+        }
+        atomic_write_text(self.meta_path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+
+    # ------------------------------ Чтение ------------------------------
+    def iter_records(self) -> Iterator[Record]:
+        """Записи как кортежи (ordinal даты, id проекта, id вида работ, секунды)."""
+
+        if not self.count:
+            return
+        with open(self.records_path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)[: self.count * RECORD.size]
+                try:
+                    yield from RECORD.iter_unpack(view)
+                finally:
+                    view.release()
+
+    @contextmanager
+    def _columns(self) -> Iterator[Tuple[Sequence[int], Sequence[int], Sequence[int]]]:
+        """Столбцы (даты, пары проект|вид работ << 16, секунды) поверх mmap."""
+
+        if not self.count:
+            yield (), (), ()
+            return
+        if sys.byteorder != "little":
+            records = list(self.iter_records())
+            yield (
+                [r[0] for r in records],
+                [r[1] | (r[2] << 16) for r in records],
+                [r[3] for r in records],
+            )
+            return
+        with open(self.records_path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                words = memoryview(mm)[: self.count * RECORD.size].cast("I")
+                columns = (words[0::3], words[1::3], words[2::3])
+                try:
+                    yield columns
+                finally:
+                    for view in columns:
+                        view.release()
+                    words.release()
+
+    @staticmethod
+    def _group(keys: Sequence[int], seconds: Sequence[int]) -> Dict[int, Tuple[int, int]]:
+        counts = Counter(keys)
+        totals = dict.fromkeys(counts, 0)
+        for key, value in zip(keys, seconds):
+            totals[key] += value
+        return {key: (counts[key], totals[key]) for key in counts}
+
+    def aggregate(self, key: Callable[[Record], Hashable]) -> Dict[Hashable, Tuple[int, int]]:
+        """Сгруппировать записи по `key(record)`: {ключ: (число записей, секунды)}."""
+
+        counts: Dict[Hashable, int] = {}
+        totals: Dict[Hashable, int] = {}
+        for record in self.iter_records():
+            group = key(record)
+            counts[group] = counts.get(group, 0) + 1
+            totals[group] = totals.get(group, 0) + record[3]
+        return {group: (counts[group], totals[group]) for group in counts}
+
+    def totals_by_pair(self) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Итоги по парам (проект, вид работ): (число записей, секунды)."""
+
+        with self._columns() as (_days, pairs, seconds):
+            raw = self._group(pairs, seconds)
+        strings = self.strings
+        return {(strings[key & 0xFFFF], strings[key >> 16]): value for key, value in raw.items()}
+
+    def totals_by_day(self) -> Dict[date, int]:
+        """Секунды по датам."""
+
+        with self._columns() as (days, _pairs, seconds):
+            raw = self._group(days, seconds)
+        return {date.fromordinal(day): total for day, (_, total) in raw.items()}
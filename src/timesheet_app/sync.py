@@ -0,0 +1,335 @@
+"""Отправка записей учёта времени на центральный HTTP-сервер.
+
+Работает по принципу «сначала локально»: запись сначала попадает в книгу
+Excel, затем — в очередь отправки `APP_DIR/sync_outbox.jsonl`. Это журнал:
+строка JSON на запись, а после отправки пакета — строка `{"ack": [id, ...]}`;
+файл только дописывается, а когда очередь опустела (или подтверждений
+накопилось `COMPACT_AFTER`), переписывается заново. Фоновый поток забирает записи пакетами
+до `BATCH_SIZE` и отправляет их одним `POST` (JSON `{"entries": [...]}`)
+через одно и то же соединение HTTP/1.1 keep-alive.
+
+- У каждой записи есть `id`, а у пакета — заголовок `Idempotency-Key`
+  (хеш id записей): повтор после обрыва не создаёт дублей на сервере.
+  Пакет формируется один раз и повторяется без изменений (те же записи и
+  тот же ключ), пока сервер его не примет или не отклонит; записи,
+  добавленные в очередь за это время, уходят следующим пакетом.
+- Ошибки сети и все ответы, кроме успешных и `_REJECT_STATUSES`, повторяются
+  с экспоненциальной паузой (`BACKOFF_BASE` … `BACKOFF_MAX`, со случайным
+  разбросом); очередь на диске переживает перезапуск приложения. В том числе
+  401/403: истёкший или неверный `sync_token` исправляют в настройках, а
+  записи тем временем ждут в очереди.
+- Ответы 400/413/422 — ошибка в самом пакете, сервер его не примет никогда:
+  пакет переносится в `APP_DIR/sync_rejected.jsonl`, чтобы не блокировать
+  очередь. Если перенести не удалось (диск полон, каталог только для
+  чтения), это считается неудачей: пакет остаётся в пути, повтор — после паузы.
+
+Окно только дописывает строку в файл очереди; сеть — только в фоновом потоке.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+try:
+    from .config import APP_DIR, atomic_write_text
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import APP_DIR, atomic_write_text  # type: ignore
+
+
+OUTBOX_FILE = APP_DIR / "sync_outbox.jsonl"
+REJECTED_FILE = APP_DIR / "sync_rejected.jsonl"
+
+BATCH_SIZE = 100
+# Пауза перед повтором: BACKOFF_BASE * 2**(неудач - 1), не больше BACKOFF_MAX, с
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+REQUEST_TIMEOUT = 10.0
+# После скольких подтверждённых записей журнал очереди переписывается без них
+COMPACT_AFTER = 1000
+
+# Ответы об ошибке в содержимом пакета: повтор его не исправит
+_REJECT_STATUSES = {400, 413, 422}
+
+Record = Dict[str, Any]
+
+
+class SyncError(RuntimeError):
+    """Сервер не принял пакет."""
+
+    def __init__(self, message: str, *, retry: bool) -> None:
+        super().__init__(message)
+        self.retry = retry
+
+
+def make_record(
+    project: str,
+    work_type: str,
+    seconds: float,
+    finished_at: datetime,
+    *,
+    entry_id: Optional[str] = None,
+) -> Record:
+    """Запись очереди для одной строки учёта времени."""
+
+    return {
+        "id": entry_id or uuid.uuid4().hex,
+        "date": finished_at.date().isoformat(),
+        "finished_at": finished_at.isoformat(timespec="seconds"),
+        "project": project,
+        "work_type": work_type,
+        "duration_seconds": int(round(seconds)),
+    }
+
+
+def batch_key(batch: List[Record]) -> str:
+    """Ключ идемпотентности пакета: одинаков при каждом повторе."""
+
+    digest = hashlib.sha256("\n".join(record["id"] for record in batch).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Outbox:
+    """Очередь отправки в журнале JSONL (потокобезопасно)."""
+
+    def __init__(self, path: Path = OUTBOX_FILE) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        # подтверждённых записей в журнале (кандидаты на сжатие)
+        self._acked = 0
+        self._records: List[Record] = self._read()
+
+    def _read(self) -> List[Record]:
+        records: Dict[str, Record] = {}
+        try:
+            with self.path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # строка, оборванная при сбое
+                    if not isinstance(item, dict):
+                        continue
+                    if "ack" in item:
+                        for entry_id in item["ack"]:
+                            if records.pop(entry_id, None) is not None:
+                                self._acked += 1
+                    elif "id" in item:
+                        records[item["id"]] = item
+        except OSError:
+            pass
+        return list(records.values())
+
+    def _append(self, items: Iterable[Dict[str, Any]]) -> None:
+        data = "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(data)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def add(self, records: Iterable[Record]) -> int:
+        """Дописать записи в конец очереди (одна запись на строку файла)."""
+
+        batch = list(records)
+        if not batch:
+            return 0
+        with self._lock:
+            self._append(batch)
+            self._records.extend(batch)
+        return len(batch)
+
+    def peek(self, limit: int) -> List[Record]:
+        with self._lock:
+            return self._records[:limit]
+
+    def remove(self, records: List[Record]) -> None:
+        """Отметить записи отправленными (строка подтверждения в журнале)."""
+
+        done = {record["id"] for record in records}
+        with self._lock:
+            self._records = [record for record in self._records if record["id"] not in done]
+            self._acked += len(done)
+            if not self._records or self._acked >= COMPACT_AFTER:
+                # Переписываем журнал только с неотправленными записями
+                text = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self._records)
+                atomic_write_text(self.path, text)
+                self._acked = 0
+            else:
+                self._append([{"ack": sorted(done)}])
+
+
+class SyncClient:
+    """Фоновая отправка очереди на `url`."""
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        outbox: Optional[Outbox] = None,
+        batch_size: int = BATCH_SIZE,
+        timeout: float = REQUEST_TIMEOUT,
+        token: Optional[str] = None,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported sync URL: {url!r}")
+        self.url = url
+        self._scheme = parts.scheme
+        self._host = parts.hostname
+        self._port = parts.port
+        self._target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.outbox = outbox if outbox is not None else Outbox()
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.token = token
+
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0
+        # Пакет в пути и его ключ: не меняются до подтверждения или отказа сервера
+        self._in_flight: Optional[List[Record]] = None
+        self._in_flight_key: Optional[str] = None
+        # Состояние для окна «Диагностика»
+        self.sent = 0
+        self.requests = 0
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+
+    # ------------------------------ Управление ------------------------------
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="timesheet-sync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Остановить поток; неотправленное остаётся в очереди на диске."""
+
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._close()
+
+    def enqueue(self, records: Iterable[Record]) -> None:
+        """Поставить записи в очередь и разбудить поток отправки."""
+
+        if self.outbox.add(records):
+            self._wake.set()
+
+    def flush(self) -> None:
+        """Отправить очередь немедленно, не дожидаясь конца паузы после ошибки."""
+
+        self._wake.set()
+
+    def summary(self) -> str:
+        """Текстовая сводка для окна «Диагностика»."""
+
+        lines = [f"Синхронизация: {self.url}", f"  в очереди: {len(self.outbox)}, отправлено: {self.sent}"]
+        if self.last_success is not None:
+            lines.append(f"  последняя отправка: {time.strftime('%H:%M:%S', time.localtime(self.last_success))}")
+        if self.last_error:
+            lines.append(f"  последняя ошибка: {self.last_error}")
+        return "\n".join(lines)
+
+    # ------------------------------ Поток ------------------------------
+    def _backoff(self) -> float:
+        delay = min(BACKOFF_BASE * 2 ** (self._failures - 1), BACKOFF_MAX)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self) -> None:
+        while not self._stopping:
+            if self._in_flight is None:
+                batch = self.outbox.peek(self.batch_size)
+                if not batch:
+                    self._wake.wait()
+                    self._wake.clear()
+                    continue
+                self._in_flight, self._in_flight_key = batch, batch_key(batch)
+            batch = self._in_flight
+            try:
+                self._post(batch, self._in_flight_key)
+            except SyncError as exc:
+                self.last_error = str(exc)
+                if not exc.retry:
+                    try:
+                        self._reject(batch)
+                    except OSError as reject_exc:
+                        self.last_error = f"{exc}; rejected: {reject_exc}"
+                    else:
+                        self._in_flight = self._in_flight_key = None
+                        continue
+                self._failures += 1
+                self._wake.wait(self._backoff())
+                self._wake.clear()
+                continue
+            self._in_flight = self._in_flight_key = None
+            self._failures = 0
+            self.last_error = None
+            self.last_success = time.time()
+            self.sent += len(batch)
+            try:
+                self.outbox.remove(batch)
+            except OSError as exc:
+                self.last_error = f"outbox: {exc}"
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._connection is None:
+            cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._connection = cls(self._host, self._port, timeout=self.timeout)
+        return self._connection
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _post(self, batch: List[Record], key: Optional[str] = None) -> None:
+        body = json.dumps({"entries": batch}, ensure_ascii=False).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json; charset=utf-8",
+            "Idempotency-Key": key or batch_key(batch),
+        }
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        try:
+            connection = self._connect()
+            self.requests += 1
+            connection.request("POST", self._target, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException) as exc:
+            # Соединение в неизвестном состоянии — следующая попытка откроет новое
+            self._close()
+            raise SyncError(f"{type(exc).__name__}: {exc}", retry=True) from exc
+        if response.will_close:
+            self._close()
+        status = response.status
+        if 200 <= status < 300 or status == 409:
+            # 409 — пакет с этим ключом уже принят
+            return
+        raise SyncError(f"HTTP {status} {response.reason}", retry=status not in _REJECT_STATUSES)
+
+    def _reject(self, batch: List[Record]) -> None:
+        """Перенести пакет в `REJECTED_FILE`; OSError — пакет остаётся в очереди."""
+
+        REJECTED_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with REJECTED_FILE.open("a", encoding="utf-8") as fh:
+            for record in batch:
+                fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.outbox.remove(batch)
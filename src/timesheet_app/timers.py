@@ -0,0 +1,119 @@
+"""Набор именованных таймеров: несколько отсчётов одновременно.
+
+Каждый таймер привязан к паре (проект, вид работ) и независимо ставится на
+паузу и останавливается. Сам набор не планирует обновлений: окно держит один
+общий тик `after()` на все таймеры (`TICK_MS`) и опрашивает набор, пока хоть
+один таймер идёт. Время считается по `time.perf_counter`, поэтому пропущенные
+или запоздавшие тики точность не снижают.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Период общего тика обновления отображения, мс
+TICK_MS = 200
+
+TimerKey = Tuple[str, str]
+
+
+@dataclass
+class NamedTimer:
+    """Таймер одной пары (проект, вид работ)."""
+
+    project: str
+    work_type: str
+    # накоплено до последнего запуска, с
+    elapsed: float = 0.0
+    # момент запуска по perf_counter; None — таймер на паузе
+    started_at: Optional[float] = None
+
+    @property
+    def key(self) -> TimerKey:
+        return self.project, self.work_type
+
+    @property
+    def running(self) -> bool:
+        return self.started_at is not None
+
+    def seconds(self, now: float) -> float:
+        """Сколько всего насчитано к моменту `now`."""
+
+        if self.started_at is None:
+            return self.elapsed
+        return self.elapsed + (now - self.started_at)
+
+
+class TimerSet:
+    """Таймеры по ключу (проект, вид работ) в порядке создания."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._timers: Dict[TimerKey, NamedTimer] = {}
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __iter__(self):
+        return iter(list(self._timers.values()))
+
+    def now(self) -> float:
+        return self._clock()
+
+    def get(self, key: TimerKey) -> Optional[NamedTimer]:
+        return self._timers.get(key)
+
+    def any_running(self) -> bool:
+        return any(timer.running for timer in self._timers.values())
+
+    def start(self, project: str, work_type: str) -> NamedTimer:
+        """Запустить (или продолжить после паузы) таймер пары, создав его при необходимости."""
+
+        key = (project, work_type)
+        timer = self._timers.get(key)
+        if timer is None:
+            timer = self._timers[key] = NamedTimer(project, work_type)
+        if timer.started_at is None:
+            timer.started_at = self._clock()
+        return timer
+
+    def pause(self, key: TimerKey) -> bool:
+        """Поставить таймер на паузу; False — он не шёл."""
+
+        timer = self._timers.get(key)
+        if timer is None or timer.started_at is None:
+            return False
+        timer.elapsed = timer.seconds(self._clock())
+        timer.started_at = None
+        return True
+
+    def stop(self, keys: Iterable[TimerKey]) -> List[Tuple[NamedTimer, float]]:
+        """Остановить и убрать таймеры; вернуть пары (таймер, секунды) для записи.
+
+        Все таймеры останавливаются одним и тем же моментом времени, чтобы
+        пакет записей был согласован.
+        """
+
+        now = self._clock()
+        stopped: List[Tuple[NamedTimer, float]] = []
+        for key in keys:
+            timer = self._timers.pop(key, None)
+            if timer is None:
+                continue
+            seconds = timer.seconds(now)
+            timer.elapsed, timer.started_at = seconds, None
+            stopped.append((timer, seconds))
+        return stopped
+
+    def restore(self, timers: Iterable[NamedTimer]) -> None:
+        """Вернуть остановленные таймеры (на паузе), если записать их не удалось."""
+
+        for timer in timers:
+            existing = self._timers.get(timer.key)
+            if existing is None:
+                self._timers[timer.key] = timer
+            else:
+                existing.elapsed += timer.elapsed
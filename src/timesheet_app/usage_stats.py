@@ -0,0 +1,141 @@
+"""Статистика выбора проектов и видов работ для сортировки выпадающих списков.
+
+Для каждой книги храним небольшой файл (см. `config.sidecar_path`) с
+«частотой-давностью» (frecency) проектов, видов работ и пар проект → вид
+работ. Оценка затухает экспоненциально с периодом полураспада
+`HALF_LIFE_DAYS`: каждое добавление записи — это O(1) обновление
+(оценка = затухшая оценка + 1), поэтому при запуске историю перечитывать не
+нужно. Полный проход по листу учёта нужен один раз — когда файла ещё нет.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .config import atomic_write_text, sidecar_path
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import atomic_write_text, sidecar_path  # type: ignore
+
+
+STATS_SUFFIX = ".usage.json"
+HALF_LIFE_DAYS = 14.0
+
+_DECAY_PER_SECOND = math.log(2) / (HALF_LIFE_DAYS * 86400)
+
+# значение -> [оценка на момент last, last (unix time)]
+_Scores = Dict[str, List[float]]
+
+
+def _bump(scores: _Scores, key: str, when: float) -> None:
+    item = scores.get(key)
+    if item is None:
+        scores[key] = [1.0, when]
+        return
+    score, last = item
+    if when >= last:
+        item[0] = score * math.exp(-_DECAY_PER_SECOND * (when - last)) + 1.0
+        item[1] = when
+    else:
+        # Запись из прошлого (например, при разборе истории не по порядку)
+        item[0] = score + math.exp(-_DECAY_PER_SECOND * (last - when))
+
+
+def _score(scores: _Scores, key: str, now: float) -> float:
+    item = scores.get(key)
+    if item is None:
+        return 0.0
+    return item[0] * math.exp(-_DECAY_PER_SECOND * max(now - item[1], 0.0))
+
+
+class UsageStats:
+    """Оценки использования значений справочника для одной книги."""
+
+    def __init__(self, workbook_path: Path | str) -> None:
+        self.workbook_path = Path(workbook_path)
+        self.projects: _Scores = {}
+        self.work_types: _Scores = {}
+        self.pairs: Dict[str, _Scores] = {}
+
+    @property
+    def sidecar(self) -> Path:
+        return sidecar_path(self.workbook_path, STATS_SUFFIX)
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.projects
+
+    @classmethod
+    def load(cls, workbook_path: Path | str) -> Optional["UsageStats"]:
+        """Прочитать статистику; None — файла нет и историю нужно разобрать один раз."""
+
+        stats = cls(workbook_path)
+        try:
+            data = json.loads(stats.sidecar.read_text(encoding="utf-8"))
+            stats.projects = dict(data["projects"])
+            stats.work_types = dict(data["work_types"])
+            stats.pairs = {project: dict(works) for project, works in data["pairs"].items()}
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+            # Повреждённый файл: начинаем заново, он перезапишется при следующей записи
+            return None
+        return stats
+
+    @classmethod
+    def from_history(
+        cls, workbook_path: Path | str, entries: Iterable[Tuple[Optional[date], Optional[str], Optional[str]]]
+    ) -> "UsageStats":
+        """Построить статистику по истории записей (дата, проект, вид работ)."""
+
+        stats = cls(workbook_path)
+        for day, project, work_type in entries:
+            if day is None or not project or not work_type:
+                continue
+            stats.record(project, work_type, datetime(day.year, day.month, day.day))
+        return stats
+
+    def record(self, project: str, work_type: str, when: Optional[datetime] = None) -> None:
+        """Учесть очередную запись."""
+
+        stamp = (when or datetime.now()).timestamp()
+        _bump(self.projects, project, stamp)
+        _bump(self.work_types, work_type, stamp)
+        _bump(self.pairs.setdefault(project, {}), work_type, stamp)
+
+    def rank_projects(self, options: List[str]) -> List[str]:
+        """Проекты по убыванию оценки; при равенстве — в порядке справочника."""
+
+        now = time.time()
+        return sorted(options, key=lambda item: -_score(self.projects, item, now))
+
+    def rank_work_types(self, options: List[str], project: Optional[str] = None) -> List[str]:
+        """Виды работ: сначала обычные для проекта, затем по общей оценке."""
+
+        now = time.time()
+        pair_scores = self.pairs.get(project or "", {})
+        return sorted(
+            options,
+            key=lambda item: (-_score(pair_scores, item, now), -_score(self.work_types, item, now)),
+        )
+
+    def suggest_work_type(self, project: str, options: Iterable[str]) -> Optional[str]:
+        """Обычный вид работ для проекта (среди доступных) или None."""
+
+        pair_scores = self.pairs.get(project)
+        if not pair_scores:
+            return None
+        now = time.time()
+        available = [item for item in options if item in pair_scores]
+        if not available:
+            return None
+        return max(available, key=lambda item: _score(pair_scores, item, now))
+
+    def save(self) -> None:
+        payload = {"projects": self.projects, "work_types": self.work_types, "pairs": self.pairs}
+        atomic_write_text(self.sidecar, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
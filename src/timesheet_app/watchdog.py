@@ -0,0 +1,198 @@
+"""Сторож главного потока Tk: задержки цикла событий и «зависания».
+
+Сторож раз в `interval_ms` планирует `after()` и измеряет, насколько позже
+срока вызов состоялся; опоздание дольше порога — зависание. Обработчики
+интерфейса оборачиваются декоратором `watched("имя")`, поэтому каждое
+зависание записывается вместе с виновником (`stop_timer`,
+`_reload_reference`, ...): выполняющимся в этот момент обработчиком или, если
+он уже завершился, последним завершившимся.
+
+Время обработчика считается до первого тика внутри него: модальные окна
+(messagebox) крутят вложенный цикл событий, и ожидание пользователя не
+должно выглядеть как зависание.
+
+Зависания пишутся в журнал с ротацией `APP_DIR/stalls.log`, а сводка
+(перцентили опозданий и худшие обработчики) показывается в окне
+«Диагностика».
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import logging.handlers
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+try:
+    from .config import APP_DIR
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from config import APP_DIR  # type: ignore
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+STALL_LOG_FILE = APP_DIR / "stalls.log"
+
+# Порог зависания и период тика, мс
+STALL_THRESHOLD_MS = 200.0
+TICK_INTERVAL_MS = 100
+
+# Сколько последних измерений держать в памяти для перцентилей
+SAMPLE_LIMIT = 2000
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Перцентиль по отсортированной копии (ближайший ранг)."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[rank]
+
+
+class MainLoopWatchdog:
+    """Измерение опозданий `after()` и запись зависаний главного потока."""
+
+    def __init__(
+        self,
+        root,
+        *,
+        interval_ms: int = TICK_INTERVAL_MS,
+        threshold_ms: float = STALL_THRESHOLD_MS,
+    ) -> None:
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.lateness: Deque[float] = deque(maxlen=SAMPLE_LIMIT)
+        # обработчик -> длительности вызовов, мс
+        self.handlers: Dict[str, Deque[float]] = {}
+        self.stalls: Deque[Tuple[float, str, float]] = deque(maxlen=SAMPLE_LIMIT)
+        self._expected: Optional[float] = None
+        self._job: Optional[str] = None
+        self._last_handler = "?"
+        # выполняющиеся обработчики: [имя, начало, время первого тика внутри или None]
+        self._running: List[List[Any]] = []
+        self._logger = self._make_logger()
+
+    @staticmethod
+    def _make_logger() -> logging.Logger:
+        logger = logging.getLogger("timesheet_app.stalls")
+        logger.propagate = False
+        if not logger.handlers:
+            try:
+                APP_DIR.mkdir(parents=True, exist_ok=True)
+                handler: logging.Handler = logging.handlers.RotatingFileHandler(
+                    STALL_LOG_FILE, maxBytes=256 * 1024, backupCount=2, encoding="utf-8"
+                )
+            except OSError:
+                handler = logging.NullHandler()
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+        return logger
+
+    # ------------------------------ Тики ------------------------------
+    def start(self) -> None:
+        if self._job is None:
+            self._schedule()
+
+    def stop(self) -> None:
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _schedule(self) -> None:
+        self._expected = time.perf_counter() + self.interval_ms / 1000
+        self._job = self.root.after(self.interval_ms, self._tick)
+
+    def _tick(self) -> None:
+        now = time.perf_counter()
+        for frame in self._running:
+            if frame[2] is None:
+                frame[2] = now
+        if self._expected is not None:
+            late_ms = max((now - self._expected) * 1000, 0.0)
+            self.lateness.append(late_ms)
+            if late_ms >= self.threshold_ms:
+                culprit = self._running[-1][0] if self._running else self._last_handler
+                self._record_stall(culprit, late_ms)
+        self._schedule()
+
+    # --------------------------- Обработчики ---------------------------
+    def enter(self, name: str) -> List[Any]:
+        """Отметить начало обработчика `name`; вернуть его кадр для `leave`."""
+
+        frame = [name, time.perf_counter(), None]
+        self._running.append(frame)
+        return frame
+
+    def leave(self, frame: List[Any]) -> None:
+        """Отметить конец обработчика и учесть, сколько он держал главный поток."""
+
+        end = time.perf_counter()
+        if frame in self._running:
+            self._running.remove(frame)
+        name, started, first_tick = frame
+        blocked_ms = ((first_tick or end) - started) * 1000
+        self._last_handler = name
+        self.handlers.setdefault(name, deque(maxlen=SAMPLE_LIMIT)).append(blocked_ms)
+
+    def _record_stall(self, name: str, duration_ms: float) -> None:
+        self.stalls.append((time.time(), name, duration_ms))
+        self._logger.info("stall handler=%s duration_ms=%.1f", name, duration_ms)
+
+    # ------------------------------ Сводка ------------------------------
+    def summary(self) -> str:
+        """Текстовая сводка для окна «Диагностика»."""
+
+        lateness = list(self.lateness)
+        lines = [
+            f"Опоздание тиков цикла событий (мс), измерений: {len(lateness)}",
+            "  p50 {:.1f}   p90 {:.1f}   p99 {:.1f}   макс {:.1f}".format(
+                percentile(lateness, 0.5),
+                percentile(lateness, 0.9),
+                percentile(lateness, 0.99),
+                max(lateness, default=0.0),
+            ),
+            f"Зависаний дольше {self.threshold_ms:.0f} мс: {len(self.stalls)}",
+            "",
+            "Обработчики, блокировка главного потока (мс): вызовов / p50 / p99 / макс",
+        ]
+        ranked = sorted(self.handlers.items(), key=lambda item: -max(item[1], default=0.0))
+        for name, durations in ranked:
+            values = list(durations)
+            lines.append(
+                f"  {name}: {len(values)} / {percentile(values, 0.5):.1f} / "
+                f"{percentile(values, 0.99):.1f} / {max(values, default=0.0):.1f}"
+            )
+        if not ranked:
+            lines.append("  (нет данных)")
+        lines.append("")
+        lines.append(f"Журнал: {STALL_LOG_FILE}")
+        return "\n".join(lines)
+
+
+def watched(name: str) -> Callable[[F], F]:
+    """Декоратор метода окна: замер времени обработчика для сторожа `self.watchdog`."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            watchdog: Optional[MainLoopWatchdog] = getattr(self, "watchdog", None)
+            if watchdog is None:
+                return func(self, *args, **kwargs)
+            frame = watchdog.enter(name)
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                watchdog.leave(frame)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,396 @@
+"""Быстрое чтение листов .xlsx напрямую из XML, без ячеек openpyxl.
+
+Даже в режиме read-only openpyxl создаёт объект на каждую ячейку и ищет её
+стиль, чтобы превратить числа в даты. Нам это не нужно: значения всё равно
+проходят через `codec`, который понимает серийные числа Excel. Этот модуль
+открывает архив книги, один раз читает таблицу общих строк и потоково
+разбирает (`iterparse`) только XML нужного листа, удаляя разобранные строки
+из дерева: память не растёт с числом строк листа и общих строк.
+
+Интерфейс повторяет используемое подмножество openpyxl в режиме read-only:
+`sheetnames`, `wb[имя].iter_rows(min_row=, max_row=, max_col=, values_only=True)`
+и `close()`, поэтому читатели `excel_manager` работают с обоими движками.
+Отличие одно: даты, время и длительности приходят числами (серийная дата,
+доля суток), а не `datetime`/`timedelta`. Эпоху серийных дат книга сообщает,
+как и в openpyxl, атрибутом `epoch` (01.01.1904 при `date1904`).
+
+Если заранее известно, какие листы будут прочитаны (сводный отчёт читает
+все листы учёта и «Учет рабочего времени»), `prefetch` запускает их
+распаковку сразу, по фоновому потоку на часть архива (вместе с общими
+строками). zlib отпускает GIL, поэтому распаковка идёт параллельно с
+разбором XML в вызывающем потоке; каждый поток держит впереди не больше
+`PREFETCH_BYTES` распакованных данных, так что память не растёт с размером листа.
+"""
+
+from __future__ import annotations
+
+import posixpath
+import queue
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.etree.ElementTree import ParseError, iterparse
+
+try:
+    from .codec import EXCEL_EPOCH, EXCEL_EPOCH_1904
+except ImportError:  # pragma: no cover - запуск app.py как скрипта
+    from codec import EXCEL_EPOCH, EXCEL_EPOCH_1904  # type: ignore
+
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+_DOC_REL_ATTR = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_STRICT_DOC_REL_ATTR = "{http://purl.oclc.org/ooxml/officeDocument/relationships}id"
+
+# Кусок фоновой распаковки и сколько распакованных данных поток держит впереди разбора
+PREFETCH_CHUNK = 256 * 1024
+PREFETCH_BYTES = 8 * 1024 * 1024
+
+
+class XlsxFormatError(ValueError):
+    """Файл не удалось разобрать как книгу .xlsx."""
+
+
+def _column_index(ref: str) -> int:
+    """Номер столбца (с 1) по адресу ячейки вида "AB12"."""
+
+    index = 0
+    for char in ref:
+        if "A" <= char <= "Z":
+            index = index * 26 + (ord(char) - 64)
+        else:
+            break
+    return index
+
+
+def _number(text: str) -> Any:
+    # Как openpyxl: целые остаются int, остальное — float
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+class _InflatingStream:
+    """Часть архива, которую фоновый поток распаковывает кусками заранее.
+
+    Читается как файл (`read`) — так её принимает `iterparse`. Ошибка
+    распаковки передаётся читателю и выбрасывается из `read`.
+    """
+
+    def __init__(self, zip_file: zipfile.ZipFile, member: str) -> None:
+        self._chunks: queue.Queue = queue.Queue(maxsize=max(1, PREFETCH_BYTES // PREFETCH_CHUNK))
+        self._buffer = b""
+        self._offset = 0
+        self._eof = False
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._inflate, args=(zip_file, member), name=f"xlsx-inflate:{member}", daemon=True
+        )
+        self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._closed.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _inflate(self, zip_file: zipfile.ZipFile, member: str) -> None:
+        try:
+            with zip_file.open(member) as fh:
+                while True:
+                    chunk = fh.read(PREFETCH_CHUNK)
+                    if not self._put(chunk) or not chunk:
+                        return
+        except Exception as exc:  # pylint: disable=broad-except
+            self._put(exc)
+
+    def _next_chunk(self) -> bytes:
+        item = self._chunks.get()
+        if isinstance(item, Exception):
+            self._eof = True
+            raise item
+        if not item:
+            self._eof = True
+        return item
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            parts = [self._buffer[self._offset :]]
+            while not self._eof:
+                parts.append(self._next_chunk())
+            self._buffer, self._offset = b"", 0
+            return b"".join(parts)
+        while len(self._buffer) - self._offset < size and not self._eof:
+            chunk = self._next_chunk()
+            self._buffer = self._buffer[self._offset :] + chunk
+            self._offset = 0
+        data = self._buffer[self._offset : self._offset + size]
+        self._offset += len(data)
+        return data
+
+    def close(self) -> None:
+        """Остановить распаковку (если лист дочитан не до конца) и дождаться потока."""
+
+        self._closed.set()
+        self._thread.join()
+
+    def __enter__(self) -> "_InflatingStream":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+class XlsxReader:
+    """Книга .xlsx, открытая для потокового чтения значений."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        try:
+            self._zip = zipfile.ZipFile(self.path)
+        except (OSError, zipfile.BadZipFile) as exc:
+            raise XlsxFormatError(f"Not an .xlsx file: {self.path}: {exc}") from exc
+        try:
+            self._sheets, self._strings_part, self._ns, self.epoch = self._read_workbook()
+        except (KeyError, ParseError, ValueError) as exc:
+            self._zip.close()
+            raise XlsxFormatError(f"Broken workbook structure: {self.path}: {exc}") from exc
+        self._shared_strings: Optional[List[str]] = None
+        # часть архива -> её распаковка, запущенная `prefetch`
+        self._prefetched: Dict[str, _InflatingStream] = {}
+
+    # ------------------------------ Структура ------------------------------
+    def _rels(self, member: str) -> Dict[str, Tuple[str, str]]:
+        """Связи части `member`: Id -> (тип, путь в архиве)."""
+
+        folder, name = posixpath.split(member)
+        rels_member = posixpath.join(folder, "_rels", f"{name}.rels")
+        result: Dict[str, Tuple[str, str]] = {}
+        if rels_member not in self._zip.NameToInfo:
+            return result
+        with self._zip.open(rels_member) as fh:
+            for _event, elem in iterparse(fh):
+                if elem.tag == f"{{{_REL_NS}}}Relationship":
+                    target = elem.get("Target", "")
+                    if target.startswith("/"):
+                        path = target.lstrip("/")
+                    else:
+                        path = posixpath.normpath(posixpath.join(folder, target))
+                    result[elem.get("Id", "")] = (elem.get("Type", ""), path)
+        return result
+
+    def _read_workbook(self) -> Tuple[Dict[str, str], Optional[str], str, datetime]:
+        workbook_part = "xl/workbook.xml"
+        for rel_type, path in self._rels("").values():
+            if rel_type.endswith("/officeDocument"):
+                workbook_part = path
+        rels = self._rels(workbook_part)
+
+        sheets: Dict[str, str] = {}
+        ns = _MAIN_NS
+        epoch = EXCEL_EPOCH
+        with self._zip.open(workbook_part) as fh:
+            for _event, elem in iterparse(fh):
+                tag = elem.tag
+                if tag.endswith("}workbookPr"):
+                    if elem.get("date1904", "").strip().lower() in ("1", "true"):
+                        epoch = EXCEL_EPOCH_1904
+                elif tag.endswith("}sheet"):
+                    ns = tag[1 : tag.index("}")]
+                    rel_id = elem.get(_DOC_REL_ATTR) or elem.get(_STRICT_DOC_REL_ATTR) or ""
+                    sheets[elem.get("name", "")] = rels[rel_id][1]
+        strings_part = next((path for rel_type, path in rels.values() if rel_type.endswith("/sharedStrings")), None)
+        return sheets, strings_part, ns, epoch
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._sheets
+
+    def __getitem__(self, name: str) -> "XlsxSheet":
+        if name not in self._sheets:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return XlsxSheet(self, self._sheets[name])
+
+    def prefetch(self, names: Iterable[str]) -> None:
+        """Начать распаковку листов `names` (и общих строк) в фоновых потоках.
+
+        Каждый заранее распакованный лист читается один раз; повторное чтение
+        идёт обычным путём. Неизвестные имена пропускаются.
+        """
+
+        members = [self._sheets[name] for name in names if name in self._sheets]
+        if members and self._shared_strings is None and self._strings_part in self._zip.NameToInfo:
+            members.insert(0, self._strings_part)
+        for member in members:
+            if member not in self._prefetched:
+                self._prefetched[member] = _InflatingStream(self._zip, member)
+
+    def _open_part(self, member: str) -> IO[bytes]:
+        stream = self._prefetched.pop(member, None)
+        if stream is not None:
+            return stream  # type: ignore[return-value]
+        return self._zip.open(member)
+
+    @property
+    def shared_strings(self) -> List[str]:
+        """Таблица общих строк (читается один раз при первом обращении)."""
+
+        if self._shared_strings is None:
+            self._shared_strings = self._read_shared_strings()
+        return self._shared_strings
+
+    def _read_shared_strings(self) -> List[str]:
+        strings: List[str] = []
+        if self._strings_part is None or self._strings_part not in self._zip.NameToInfo:
+            return strings
+        si_tag = f"{{{self._ns}}}si"
+        t_tag = f"{{{self._ns}}}t"
+        run_tag = f"{{{self._ns}}}r"
+        root = None
+        with self._open_part(self._strings_part) as fh:
+            for event, elem in iterparse(fh, events=("start", "end")):
+                if event == "start":
+                    if root is None:
+                        root = elem  # <sst>: разобранные <si> убираем из него
+                    continue
+                if elem.tag != si_tag:
+                    continue
+                # Простая строка <si><t>..</t></si> или форматированная из <r><t>..</t></r>;
+                # фонетические подсказки (<rPh>) в текст не входят
+                parts: List[str] = []
+                for child in elem:
+                    if child.tag == run_tag:
+                        child = child.find(t_tag)
+                    elif child.tag != t_tag:
+                        continue
+                    if child is not None and child.text:
+                        parts.append(child.text)
+                strings.append("".join(parts))
+                root.clear()
+        return strings
+
+    def iter_part_rows(
+        self,
+        member: str,
+        *,
+        min_row: int = 1,
+        max_row: Optional[int] = None,
+        max_col: Optional[int] = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Строки листа как кортежи значений; пропущенные строки отдаются пустыми.
+
+        Разобранная строка удаляется из `<sheetData>`, иначе пустые элементы
+        `<row>` копились бы в дереве до конца листа.
+        """
+
+        ns = self._ns
+        sheet_data_tag = f"{{{ns}}}sheetData"
+        row_tag = f"{{{ns}}}row"
+        cell_tag = f"{{{ns}}}c"
+        value_tag = f"{{{ns}}}v"
+        inline_tag = f"{{{ns}}}is"
+        strings = self.shared_strings
+        blank: Tuple[Any, ...] = (None,) * max_col if max_col else ()
+
+        expected = 1
+        rows = None
+        with self._open_part(member) as fh:
+            for event, elem in iterparse(fh, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == sheet_data_tag:
+                        rows = elem
+                    continue
+                if elem.tag != row_tag:
+                    continue
+                row_ref = elem.get("r")
+                row_idx = int(row_ref) if row_ref else expected
+                if max_row is not None and row_idx > max_row:
+                    break
+                if row_idx < min_row:
+                    (rows if rows is not None else elem).clear()
+                    expected = row_idx + 1
+                    continue
+
+                values: List[Any] = []
+                position = 0
+                for cell in elem:
+                    if cell.tag != cell_tag:
+                        continue
+                    ref = cell.get("r")
+                    column = _column_index(ref) if ref else position + 1
+                    position = column
+                    if max_col is not None and column > max_col:
+                        break
+                    kind = cell.get("t", "n")
+                    if kind == "inlineStr":
+                        node = cell.find(inline_tag)
+                        value: Any = "".join(node.itertext()) if node is not None else None
+                    else:
+                        node = cell.find(value_tag)
+                        text = node.text if node is not None else None
+                        if text is None:
+                            value = None
+                        elif kind == "n":
+                            value = _number(text)
+                        elif kind == "s":
+                            value = strings[int(text)]
+                        elif kind == "b":
+                            value = text == "1"
+                        else:
+                            # "str" (результат формулы), "e" (ошибка), "d" (дата ISO) — текстом
+                            value = text
+                    if len(values) < column - 1:
+                        values.extend([None] * (column - 1 - len(values)))
+                    values.append(value)
+                (rows if rows is not None else elem).clear()
+
+                while expected < row_idx:
+                    if expected >= min_row:
+                        yield blank
+                    expected += 1
+                if max_col is not None and len(values) < max_col:
+                    values.extend([None] * (max_col - len(values)))
+                yield tuple(values)
+                expected = row_idx + 1
+
+    def close(self) -> None:
+        for stream in self._prefetched.values():
+            stream.close()
+        self._prefetched.clear()
+        self._zip.close()
+
+    def __enter__(self) -> "XlsxReader":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+
+class XlsxSheet:
+    """Лист книги: подмножество `iter_rows` из openpyxl (только значения)."""
+
+    def __init__(self, reader: XlsxReader, member: str) -> None:
+        self._reader = reader
+        self._member = member
+
+    def iter_rows(
+        self,
+        min_row: Optional[int] = None,
+        max_row: Optional[int] = None,
+        min_col: Optional[int] = None,
+        max_col: Optional[int] = None,
+        values_only: bool = True,
+    ) -> Iterator[Tuple[Any, ...]]:
+        if not values_only:
+            raise TypeError("XlsxSheet.iter_rows supports only values_only=True (the xml engine has no cell objects)")
+        rows = self._reader.iter_part_rows(self._member, min_row=min_row or 1, max_row=max_row, max_col=max_col)
+        if min_col and min_col > 1:
+            return (row[min_col - 1 :] for row in rows)
+        return rows
@@ -0,0 +1,21 @@
+"""Общие настройки тестов: пакет берётся из `src` без установки."""
+
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Служебные файлы книг (индекс, снимки) — во временном каталоге теста."""
+
+    from timesheet_app import config
+
+    path = tmp_path / "cache"
+    monkeypatch.setattr(config, "CACHE_DIR", path)
+    return path
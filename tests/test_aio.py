@@ -0,0 +1,72 @@
+"""Асинхронный фасад: склейка записей в пакет и отмена ожидающих."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import threading
+
+from timesheet_app import aio, excel_manager
+
+
+def test_cancelled_waiter_does_not_leak_the_write_error(monkeypatch, tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing_append(path, entries, sharded=False):
+        started.set()
+        release.wait(5)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(excel_manager, "append_time_entries", failing_append)
+    errors = []
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _loop, context: errors.append(context))
+        path = tmp_path / "book.xlsx"
+        first = asyncio.ensure_future(aio.append_time_entry(path, project="P", work_type="W", elapsed_seconds=60))
+        second = asyncio.ensure_future(aio.append_time_entry(path, project="P", work_type="W", elapsed_seconds=30))
+        await loop.run_in_executor(None, started.wait, 5)
+        first.cancel()
+        release.set()
+        results = await asyncio.gather(first, second, return_exceptions=True)
+        await aio._queue_for(path).flusher
+        # Трассировка ошибки держит кадр `_flush` с пакетом: отпускаем её до сборки мусора
+        return [type(result) for result in results]
+
+    try:
+        assert asyncio.run(scenario()) == [asyncio.CancelledError, OSError]
+    finally:
+        aio.shutdown()
+    gc.collect()
+    assert errors == []
+
+
+def test_concurrent_appends_are_written_in_batches(monkeypatch, tmp_path):
+    path = tmp_path / "book.xlsx"
+    excel_manager.create_template(path)
+    calls = []
+    append = excel_manager.append_time_entries
+
+    def counting_append(path, entries, sharded=False):
+        calls.append(len(entries))
+        return append(path, entries, sharded=sharded)
+
+    monkeypatch.setattr(excel_manager, "append_time_entries", counting_append)
+
+    async def scenario():
+        await asyncio.gather(
+            *(
+                aio.append_time_entry(path, project="Альфа", work_type="Код", elapsed_seconds=60 * (i + 1))
+                for i in range(10)
+            )
+        )
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        aio.shutdown()
+    # Все вызовы встали в очередь до первой записи — одна загрузка и одно сохранение книги
+    assert calls == [10]
+    assert sorted(entry.seconds for entry in excel_manager.iter_time_entries(path)) == [60.0 * (i + 1) for i in range(10)]
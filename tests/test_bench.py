@@ -0,0 +1,33 @@
+"""Команды замеров запускаются и выдают результаты (на крошечных данных)."""
+
+from __future__ import annotations
+
+import json
+
+from timesheet_app import bench
+
+
+def _run(tmp_path, *args):
+    report = tmp_path / "bench.json"
+    bench.main(["--repeat", "1", "--json", str(report), *args])
+    return json.loads(report.read_text(encoding="utf-8"))["timings"]
+
+
+def test_codec(tmp_path):
+    timings = _run(tmp_path, "codec", "--rows", "100")
+    assert [item["name"] for item in timings] == ["codec/serial", "codec/datetime"]
+    assert all(item["items"] == 400 and item["per_second"] for item in timings)
+
+
+def test_engines(tmp_path):
+    timings = _run(tmp_path, "engines", "--rows", "50")
+    assert {item["name"] for item in timings} == {
+        f"{op}/{engine}" for op in ("reference", "iter_time_entries", "export_rows") for engine in bench.READ_ENGINES
+    }
+    assert all(item["items"] == 50 for item in timings if not item["name"].startswith("reference/"))
+
+
+def test_inflate(tmp_path):
+    timings = _run(tmp_path, "inflate", "--rows", "50")
+    assert [item["name"] for item in timings] == ["history/sequential", "history/prefetch"]
+    assert all(item["items"] == 50 + 25 for item in timings)
@@ -0,0 +1,30 @@
+"""Кодек ячеек: испорченные значения дают None, а не исключение."""
+
+from __future__ import annotations
+
+from datetime import date, time
+
+import pytest
+
+from timesheet_app.codec import TIMESHEET_CODEC, WORKDAY_CODEC, decode_date, decode_duration, decode_time
+
+BROKEN = [float("nan"), float("inf"), float("-inf"), 1e300, -1e300, 10**20, "nan", "inf", "1e300", "99999999999999999999:00"]
+
+
+@pytest.mark.parametrize("value", BROKEN)
+def test_broken_values_decode_to_none(value):
+    assert decode_date(value) is None
+    assert decode_duration(value) is None
+    assert decode_time(value) in (None, time(0, 0))
+
+
+def test_date_range_follows_excel():
+    assert decode_date(-1.0) is None
+    assert decode_date(2958465.5) == date(9999, 12, 31)
+    assert decode_date(2958466) is None
+    assert decode_date(45000) == date(2023, 3, 15)
+
+
+def test_broken_cell_does_not_break_the_row():
+    assert TIMESHEET_CODEC.decode((float("nan"), "Альфа", "Код", float("inf"))) == (None, "Альфа", "Код", None)
+    assert WORKDAY_CODEC.decode((45000.0, float("nan"), 0.375, "1e400")) == (date(2023, 3, 15), None, time(9, 0), None)
@@ -0,0 +1,50 @@
+"""Сжатие записей учёта: слияние дробных записей дня без изменения итогов."""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime
+
+from timesheet_app.excel_manager import TimeEntry, append_time_entries, compact_timesheet, create_template, iter_time_entries
+
+
+def _workbook(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 120, datetime(2024, 3, 4, 10, 30)),
+            TimeEntry("Альфа", "Код", 300, datetime(2024, 3, 4, 11)),
+            TimeEntry("Альфа", "Код", 60, datetime(2024, 3, 5, 9)),
+            TimeEntry("Альфа", "Код", 60, datetime(2024, 3, 5, 10)),
+        ],
+    )
+    return path
+
+
+def _entries(path):
+    return [(entry.day, entry.project, entry.work_type, entry.seconds) for entry in iter_time_entries(path)]
+
+
+def test_only_the_given_day_is_compacted(tmp_path):
+    path = _workbook(tmp_path)
+    assert compact_timesheet(path, day=date(2024, 3, 4)) == (3, 2)
+    assert _entries(path) == [
+        (date(2024, 3, 4), "Альфа", "Код", 900.0),
+        (date(2024, 3, 4), "Бета", "Тесты", 120.0),
+        (date(2024, 3, 5), "Альфа", "Код", 60.0),
+        (date(2024, 3, 5), "Альфа", "Код", 60.0),
+    ]
+
+
+def test_whole_history_then_nothing_left_to_merge(tmp_path):
+    path = _workbook(tmp_path)
+    assert compact_timesheet(path) == (5, 3)
+    assert sum(seconds for *_key, seconds in _entries(path)) == 1140.0
+
+    stamp = os.stat(path).st_mtime_ns
+    assert compact_timesheet(path) == (3, 3)
+    # Сливать нечего — книга не переписывается
+    assert os.stat(path).st_mtime_ns == stamp
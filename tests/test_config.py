@@ -0,0 +1,45 @@
+"""Атомарная запись файлов: права нового и существующего файла."""
+
+from __future__ import annotations
+
+import os
+import stat
+
+import pytest
+
+from timesheet_app import config
+from timesheet_app.config import atomic_write_text
+
+pytestmark = pytest.mark.skipif(os.name != "posix", reason="права файлов POSIX")
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_gets_umask_mode(tmp_path):
+    old = os.umask(0o027)
+    try:
+        atomic_write_text(tmp_path / "new.json", "{}")
+    finally:
+        os.umask(old)
+    assert _mode(tmp_path / "new.json") == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["new.json"]
+
+
+def test_existing_file_keeps_its_mode(tmp_path):
+    path = tmp_path / "existing.json"
+    path.write_text("old", encoding="utf-8")
+    os.chmod(path, 0o600)
+    atomic_write_text(path, "new")
+    assert _mode(path) == 0o600
+    assert path.read_text(encoding="utf-8") == "new"
+
+
+def test_config_with_token_is_owner_only(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CONFIG_FILE", tmp_path / "config.json")
+    (tmp_path / "config.json").write_text("{}", encoding="utf-8")
+    os.chmod(tmp_path / "config.json", 0o644)
+    config.AppConfig(sync_token="secret").save()
+    assert _mode(tmp_path / "config.json") == 0o600
+    assert config.AppConfig.load().sync_token == "secret"
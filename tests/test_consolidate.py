@@ -0,0 +1,62 @@
+"""Разбор книги для сводки: одинаковые строки и итоги со снимком истории и без него."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.consolidate import parse_workbook
+from timesheet_app.excel_manager import (
+    TIMESHEET_SHEET,
+    TimeEntry,
+    append_time_entries,
+    create_template,
+    load_snapshot,
+)
+from timesheet_app.snapshot import HistorySnapshot
+
+
+def test_row_count_does_not_depend_on_snapshot(tmp_path):
+    path = tmp_path / "Иванов.xlsx"
+    create_template(path)
+    wb = load_workbook(path)
+    wb[TIMESHEET_SHEET].append([None, "Заметка без даты", None, None])
+    wb.save(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 900, datetime(2024, 3, 5, 9)),
+        ],
+    )
+
+    HistorySnapshot.discard(path)
+    without = parse_workbook(str(path))
+    load_snapshot(path)
+    with_snapshot = parse_workbook(str(path))
+
+    assert without.error is None and with_snapshot.error is None
+    assert without.rows == with_snapshot.rows == 2
+    assert without.entries == with_snapshot.entries
+
+
+def test_fractional_seconds_sum_the_same_with_and_without_snapshot(tmp_path):
+    path = tmp_path / "Петров.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600.4, datetime(2024, 3, 4, 10)),
+            TimeEntry("Альфа", "Код", 300.4, datetime(2024, 3, 4, 11)),
+            TimeEntry("Бета", "Тесты", 59.6, datetime(2024, 3, 5, 9)),
+        ],
+    )
+
+    HistorySnapshot.discard(path)
+    without = parse_workbook(str(path))
+    load_snapshot(path)
+    with_snapshot = parse_workbook(str(path))
+
+    assert without.error is None and with_snapshot.error is None
+    assert without.entries == with_snapshot.entries == {("Альфа", "Код"): [2, 900.0], ("Бета", "Тесты"): [1, 60.0]}
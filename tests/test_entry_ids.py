@@ -0,0 +1,45 @@
+"""ID записей: повтор после ошибки не дублирует строку, в том числе после сжатия."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.entry_index import EntryIndex
+from timesheet_app.excel_manager import (
+    ENTRY_ID_COLUMN,
+    TIMESHEET_SHEET,
+    TimeEntry,
+    append_time_entries,
+    compact_timesheet,
+    create_template,
+)
+
+
+def _entries():
+    return [
+        TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10), "id-1"),
+        TimeEntry("Альфа", "Код", 300, datetime(2024, 3, 4, 11), "id-2"),
+        TimeEntry("Бета", "Тесты", 900, datetime(2024, 3, 4, 12), "id-3"),
+    ]
+
+
+def test_repeated_ids_are_skipped(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    entries = _entries()
+    assert append_time_entries(path, entries + [entries[0]]) == 3
+    assert append_time_entries(path, entries) == 0
+
+
+def test_merged_row_keeps_every_id(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(path, _entries())
+    assert compact_timesheet(path) == (3, 2)
+
+    ws = load_workbook(path)[TIMESHEET_SHEET]
+    assert ws.cell(row=2, column=ENTRY_ID_COLUMN).value == "id-1 id-2"
+    assert EntryIndex.load(path).ids == {"id-1", "id-2", "id-3"}
+    assert append_time_entries(path, _entries()) == 0
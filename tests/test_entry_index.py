@@ -0,0 +1,67 @@
+"""Индекс дат: записи дня, правка, отмена и перестройка после внешней правки."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.excel_manager import (
+    TIMESHEET_SHEET,
+    TimeEntry,
+    append_time_entries,
+    create_template,
+    load_day_entries,
+    undo_last_entry,
+    update_day_entries,
+)
+
+DAY = date(2024, 3, 4)
+
+
+def _workbook(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 900, datetime(2024, 3, 5, 9)),
+            TimeEntry("Альфа", "Ревью", 300, datetime(2024, 3, 4, 17)),
+        ],
+    )
+    return path
+
+
+def _day(path, day=DAY):
+    return [(entry.project, entry.work_type, entry.seconds) for entry in load_day_entries(path, day)]
+
+
+def test_day_entries_edit_and_undo(tmp_path):
+    path = _workbook(tmp_path)
+    assert _day(path) == [("Альфа", "Код", 600.0), ("Альфа", "Ревью", 300.0)]
+
+    first, second = load_day_entries(path, DAY)
+    changed = update_day_entries(
+        path, DAY, {(first.sheet, first.row): TimeEntry("Гамма", "Код", 1200), (second.sheet, second.row): None}
+    )
+    assert changed == 2
+    assert _day(path) == [("Гамма", "Код", 1200.0)]
+
+    append_time_entries(path, [TimeEntry("Дельта", "Код", 60, datetime(2024, 3, 4, 18))])
+    undone = undo_last_entry(path)
+    assert (undone.project, undone.day) == ("Дельта", DAY)
+    assert _day(path) == [("Гамма", "Код", 1200.0)]
+
+
+def test_external_edit_rebuilds_the_index(tmp_path):
+    path = _workbook(tmp_path)
+    assert len(load_day_entries(path, DAY)) == 2
+
+    wb = load_workbook(path)
+    wb[TIMESHEET_SHEET].append([DAY, "Вручную", "Код", None])
+    wb.save(path)
+
+    assert [project for project, _work_type, _seconds in _day(path)] == ["Альфа", "Альфа", "Вручную"]
+    # История добавлений после внешней правки неизвестна — отменять нечего
+    assert undo_last_entry(path) is None
@@ -0,0 +1,104 @@
+"""Инкрементальная выгрузка: водяной знак по номерам изменений из индекса."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+
+import pytest
+
+from timesheet_app.excel_manager import (
+    TIMESHEET_SHEET,
+    TimeEntry,
+    append_time_entries,
+    compact_timesheet,
+    create_template,
+    export_rows,
+    load_day_entries,
+    undo_last_entry,
+    update_day_entries,
+    workday_end,
+    workday_start,
+)
+
+DAY1 = date(2024, 3, 4)
+DAY2 = date(2024, 3, 5)
+
+
+@pytest.fixture()
+def workbook(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Альфа", "Код", 300, datetime(2024, 3, 4, 11)),
+            TimeEntry("Бета", "Тесты", 900, datetime(2024, 3, 5, 9)),
+        ],
+    )
+    return path
+
+
+def _export(path, tmp_path, since=None):
+    output = tmp_path / "export.jsonl"
+    count, watermark = export_rows(path, output, since=since)
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert count == len(records)
+    return records, watermark
+
+
+def test_nothing_is_reexported_without_changes(workbook, tmp_path):
+    records, watermark = _export(workbook, tmp_path)
+    assert [(r["date"], r["project"]) for r in records] == [
+        ("2024-03-04", "Альфа"),
+        ("2024-03-04", "Альфа"),
+        ("2024-03-05", "Бета"),
+    ]
+    again, same = _export(workbook, tmp_path, since=watermark)
+    assert again == [] and same == watermark
+
+
+def test_edit_of_an_earlier_day_reexports_that_day(workbook, tmp_path):
+    _records, watermark = _export(workbook, tmp_path)
+    first = load_day_entries(workbook, DAY1)[0]
+    update_day_entries(workbook, DAY1, {(first.sheet, first.row): TimeEntry("Гамма", "Код", 1200)})
+
+    records, watermark = _export(workbook, tmp_path, since=watermark)
+    assert {r["date"] for r in records} == {"2024-03-04"}
+    assert sorted(r["project"] for r in records) == ["Альфа", "Гамма"]
+    assert _export(workbook, tmp_path, since=watermark)[0] == []
+
+
+def test_removed_day_is_exported_as_deleted(workbook, tmp_path):
+    _records, watermark = _export(workbook, tmp_path)
+    undo_last_entry(workbook)
+
+    records, _watermark = _export(workbook, tmp_path, since=watermark)
+    assert records == [{"sheet": TIMESHEET_SHEET, "date": "2024-03-05", "change_seq": records[0]["change_seq"], "deleted": True}]
+
+
+def test_compaction_reexports_only_merged_days(workbook, tmp_path):
+    _records, watermark = _export(workbook, tmp_path)
+    assert compact_timesheet(workbook) == (3, 2)
+
+    records, _watermark = _export(workbook, tmp_path, since=watermark)
+    assert [(r["date"], r["duration_seconds"]) for r in records] == [("2024-03-04", 900)]
+
+
+def test_workday_end_reexports_the_open_day(workbook, tmp_path):
+    workday_start(workbook)
+    _records, watermark = _export(workbook, tmp_path)
+    workday_end(workbook)
+
+    records, _watermark = _export(workbook, tmp_path, since=watermark)
+    assert len(records) == 1 and records[0]["end"] is not None
+
+
+def test_lost_index_gives_full_export(workbook, tmp_path, cache_dir):
+    _records, watermark = _export(workbook, tmp_path)
+    for sidecar in cache_dir.glob("*.index.json"):
+        sidecar.unlink()
+
+    records, new_watermark = _export(workbook, tmp_path, since=watermark)
+    assert len(records) == 3 and new_watermark != watermark
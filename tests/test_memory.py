@@ -0,0 +1,64 @@
+"""Размер процесса без окна в простое после работы с книгой и очистки памяти."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from timesheet_app.memory import TARGET_IDLE_RSS_MB, TK_RSS_MB, rss_bytes
+
+ROWS = 5000
+
+# Отдельный процесс: RSS не должен зависеть от того, что успели сделать другие тесты
+PROBE = textwrap.dedent(
+    """
+    import json, sys
+    from datetime import datetime, timedelta
+    from pathlib import Path
+
+    from timesheet_app import config
+    from timesheet_app.excel_manager import (
+        TimeEntry, append_time_entries, create_template, iter_time_entries, load_day_entries, load_reference_index,
+    )
+    from timesheet_app.memory import IdleTrimmer
+
+    tmp, rows = Path(sys.argv[1]), int(sys.argv[2])
+    config.CACHE_DIR = tmp / "cache"
+    path = tmp / "timesheet.xlsx"
+    create_template(path)
+    start = datetime(2023, 1, 2, 9)
+    entries = [
+        TimeEntry(f"Проект {i % 40}", f"Вид работ {i % 12}", 600 + i % 900, start + timedelta(hours=3 * i))
+        for i in range(rows)
+    ]
+    append_time_entries(path, entries)
+    append_time_entries(path, entries[-3:])
+    load_reference_index(path)
+    load_day_entries(path, entries[-1].finished_at.date())
+    assert sum(1 for _ in iter_time_entries(path)) == rows + 3
+    before, after = IdleTrimmer(None).trim()
+    print(json.dumps({"before": before, "after": after}))
+    """
+)
+
+
+@pytest.mark.skipif(rss_bytes() is None, reason="RSS недоступен на этой платформе")
+def test_idle_rss_after_trim_is_within_target(tmp_path):
+    src = Path(__file__).resolve().parent.parent / "src"
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, str(tmp_path), str(ROWS)],
+        cwd=src,
+        capture_output=True,
+        text=True,
+        timeout=300,
+        check=True,
+    )
+    rss = json.loads(result.stdout.strip().splitlines()[-1])
+    assert rss["after"] <= rss["before"]
+    # Tk здесь нет: без окна процесс должен оставить ему место в общей цели
+    assert rss["after"] <= (TARGET_IDLE_RSS_MB - TK_RSS_MB) * 1024 * 1024, f"{rss['after'] / 2**20:.1f} МБ"
@@ -0,0 +1,52 @@
+"""Метрики операций с Excel: этапы, счётчики, ошибки и выгрузка."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+import pytest
+
+from timesheet_app import metrics
+from timesheet_app.excel_manager import TimeEntry, append_time_entries, create_template, iter_time_entries
+
+
+@pytest.fixture()
+def registry(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "_enabled", True)
+    monkeypatch.setattr(metrics, "METRICS_JSON_FILE", tmp_path / "metrics.json")
+    monkeypatch.setattr(metrics, "METRICS_PROM_FILE", tmp_path / "metrics.prom")
+    metrics.registry.reset()
+    yield metrics.registry
+    metrics.registry.reset()
+
+
+def test_operations_record_phases_calls_and_errors(registry, tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(path, [TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10))])
+    assert sum(1 for _entry in iter_time_entries(path)) == 1
+    with pytest.raises(FileNotFoundError):
+        append_time_entries(tmp_path / "missing.xlsx", [])
+
+    phases = {phase for op, phase in registry.histograms if op == "append_time_entries"}
+    assert {"total", "open", "save"} <= phases
+    assert registry.counters[("append_time_entries", "calls")] == 2
+    assert registry.counters[("append_time_entries", "errors")] == 1
+    # Генератор — одна операция, сколько бы элементов он ни выдал
+    assert registry.counters[("iter_time_entries", "calls")] == 1
+
+    registry.export()
+    exported = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert {"op": "append_time_entries", "name": "errors", "value": 1} in exported["counters"]
+    prom = (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+    assert 'timesheet_phase_seconds_count{op="append_time_entries",phase="total"} 2' in prom
+
+
+def test_disabled_metrics_record_nothing(monkeypatch, tmp_path):
+    monkeypatch.setattr(metrics, "_enabled", False)
+    metrics.registry.reset()
+    create_template(tmp_path / "timesheet.xlsx")
+    assert metrics.span("scan") is metrics.span("save")
+    assert not metrics.registry.histograms and not metrics.registry.counters
+    assert metrics.summary() is None
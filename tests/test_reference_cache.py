@@ -0,0 +1,57 @@
+"""Снимок справочника остаётся свежим после собственных записей приложения."""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+
+from timesheet_app.config import file_stamp
+from timesheet_app.excel_manager import TimeEntry, append_time_entries, create_template, load_reference_index
+from timesheet_app.reference_cache import ReferenceCache
+
+
+def _workbook(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    return str(path)
+
+
+def test_own_write_restamps_fresh_snapshot(tmp_path):
+    path = _workbook(tmp_path)
+    cache = ReferenceCache(tmp_path / "reference_cache.json")
+    cache.put(path, load_reference_index(path))
+
+    before = file_stamp(path)
+    append_time_entries(path, [TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10))])
+    assert not cache.is_fresh(cache.get(path))
+    assert cache.restamp(path, before)
+    assert cache.is_fresh(cache.get(path))
+
+    cache.save()
+    assert ReferenceCache.load(tmp_path / "reference_cache.json").is_fresh(cache.get(path))
+
+
+def test_stale_snapshot_is_not_restamped(tmp_path):
+    path = _workbook(tmp_path)
+    cache = ReferenceCache(tmp_path / "reference_cache.json")
+    cache.put(path, load_reference_index(path))
+    stamp = file_stamp(path)
+    os.utime(path, ns=(stamp[0] + 10**9, stamp[0] + 10**9))  # книгу меняли вне приложения
+
+    before = file_stamp(path)
+    append_time_entries(path, [TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10))])
+    assert not cache.restamp(path, before)
+    assert not cache.is_fresh(cache.get(path))
+
+
+def test_released_snapshots_are_read_back_from_file(tmp_path):
+    first, second = _workbook(tmp_path), str(tmp_path / "other.xlsx")
+    create_template(second)
+    cache = ReferenceCache(tmp_path / "reference_cache.json")
+    for path in (first, second):
+        cache.put(path, load_reference_index(path))
+    cache.save()
+
+    cache.release([first])
+    assert list(cache._snapshots) == [first]
+    assert cache.get(second) is not None and cache.is_fresh(cache.get(second))
@@ -0,0 +1,43 @@
+"""Виды работ по проекту: собственные пары, общие виды и проекты без пар."""
+
+from __future__ import annotations
+
+from openpyxl import load_workbook
+
+from timesheet_app.excel_manager import REFERENCE_SHEET, create_template, load_reference_index
+from timesheet_app.reference_index import ReferenceIndex
+
+
+def test_work_types_follow_the_reference_pairs():
+    index = ReferenceIndex(
+        [
+            ("Альфа", "Код"),
+            (" Альфа ", "Ревью"),
+            (None, "Совещание"),
+            ("Бета", "Тесты"),
+            ("Гамма", None),
+            ("Альфа", "Код"),
+            (None, None),
+        ]
+    )
+    assert index.projects == ["Альфа", "Бета", "Гамма"]
+    assert index.work_types == ["Код", "Ревью", "Совещание", "Тесты"]
+    assert index.work_types_for("Альфа") == ["Код", "Ревью", "Совещание"]
+    assert index.work_types_for("Бета") == ["Совещание", "Тесты"]
+    # У проекта без собственных пар и без выбранного проекта — все виды работ
+    assert index.work_types_for("Гамма") == index.work_types
+    assert index.work_types_for(None) == index.work_types
+    assert index.has_pairs
+
+
+def test_index_is_read_from_the_reference_sheet(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    wb = load_workbook(path)
+    for row in (["Альфа", "Код"], ["Бета", "Тесты"], [None, "Совещание"]):
+        wb[REFERENCE_SHEET].append(row)
+    wb.save(path)
+
+    index = load_reference_index(path)
+    assert index == ReferenceIndex([("Альфа", "Код"), ("Бета", "Тесты"), ("", "Совещание")])
+    assert index.work_types_for("Бета") == ["Тесты", "Совещание"]
@@ -0,0 +1,64 @@
+"""Трасса операций окна: обезличенная запись и воспроизведение на копии книги."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+from openpyxl import load_workbook
+
+from timesheet_app.excel_manager import REFERENCE_SHEET, create_template, iter_time_entries
+from timesheet_app.recorder import Recorder, read_trace
+from timesheet_app.replay import replay
+
+
+def _record(trace, workbook):
+    recorder = Recorder(trace)
+    recorder.mark("start", pairs=[("Альфа", "Код")])
+    pairs = [("Альфа", "Код"), ("Бета", "Тесты")]
+    with recorder.step("stop", pairs=pairs, seconds=[600, 300], sharded=False, workbook=workbook):
+        pass
+    with pytest.raises(OSError):
+        with recorder.step("undo", workbook=workbook):
+            raise OSError("книга открыта в Excel")
+    with recorder.step("stop", pairs=[("Бета", "Тесты")], seconds=[120], sharded=False, workbook=workbook):
+        pass
+    recorder.close()
+
+
+def test_trace_has_no_names_and_marks_failures(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    _record(trace, tmp_path / "Иванов.xlsx")
+
+    text = trace.read_text(encoding="utf-8")
+    assert "Альфа" not in text and "Иванов" not in text
+    header, operations = read_trace(trace)
+    assert header["format"] == "timesheet-trace/1"
+    assert [(item["op"], item.get("ok")) for item in operations] == [
+        ("start", None),
+        ("stop", True),
+        ("undo", False),
+        ("stop", True),
+    ]
+    assert operations[1]["pairs"] == [[0, 0], [1, 1]] and operations[3]["pairs"] == [[1, 1]]
+
+
+def test_replay_runs_on_a_copy(tmp_path):
+    workbook = tmp_path / "timesheet.xlsx"
+    create_template(workbook)
+    wb = load_workbook(workbook)
+    for row in (["Проект А", "Разработка"], ["Проект Б", "Тестирование"]):
+        wb[REFERENCE_SHEET].append(row)
+    wb.save(workbook)
+    stamp = os.stat(workbook).st_mtime_ns
+    trace = tmp_path / "trace.jsonl"
+    _record(trace, workbook)
+
+    report = replay(trace, workbook)
+
+    assert os.stat(workbook).st_mtime_ns == stamp
+    assert list(iter_time_entries(workbook)) == []
+    assert report.skipped == 1
+    stats = report.operations["stop"]
+    assert len(stats.replayed) == 2 and len(stats.recorded) == 2 and stats.errors == 0
+    assert "undo" not in report.operations
@@ -0,0 +1,38 @@
+"""Помесячные листы учёта: запись по месяцам и чтение всей истории подряд."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.excel_manager import (
+    TIMESHEET_SHEET,
+    TimeEntry,
+    append_time_entries,
+    create_template,
+    iter_time_entries,
+    timesheet_sheet_names,
+)
+
+
+def test_sharded_entries_go_to_month_sheets(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(path, [TimeEntry("Альфа", "Код", 600, datetime(2024, 1, 15, 10))])
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 300, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 900, datetime(2024, 2, 5, 9)),
+        ],
+        sharded=True,
+    )
+
+    names = timesheet_sheet_names(load_workbook(path, read_only=True).sheetnames)
+    assert names == [TIMESHEET_SHEET, f"{TIMESHEET_SHEET} 2024-02", f"{TIMESHEET_SHEET} 2024-03"]
+    assert [(entry.sheet, entry.day, entry.seconds) for entry in iter_time_entries(path)] == [
+        (TIMESHEET_SHEET, date(2024, 1, 15), 600.0),
+        (f"{TIMESHEET_SHEET} 2024-02", date(2024, 2, 5), 900.0),
+        (f"{TIMESHEET_SHEET} 2024-03", date(2024, 3, 4), 300.0),
+    ]
@@ -0,0 +1,67 @@
+"""Один экземпляр: повторный запуск передаёт просьбу только с ключом владельца."""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import stat
+
+import pytest
+
+from timesheet_app import single_instance
+from timesheet_app.single_instance import PROTOCOL, InstanceRequest, claim, forward
+
+
+@pytest.fixture()
+def instance_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(single_instance, "LOCK_FILE", tmp_path / "instance.lock")
+    monkeypatch.setattr(single_instance, "INSTANCE_FILE", tmp_path / "instance.json")
+    monkeypatch.setattr(single_instance, "CONNECT_TIMEOUT", 2.0)
+    return tmp_path
+
+
+@pytest.fixture()
+def running(instance_dir):
+    requests = []
+    lock = claim()
+    assert lock is not None and lock.held
+    lock.serve(requests.append)
+    yield lock, requests
+    lock.close()
+
+
+def test_second_launch_is_forwarded(running, tmp_path):
+    _lock, requests = running
+    book = tmp_path / "book.xlsx"
+    assert claim(str(book)) is None
+    assert requests == [InstanceRequest(path=str(book.resolve()))]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="права файлов POSIX")
+def test_instance_file_is_owner_only(running, instance_dir):
+    assert stat.S_IMODE(os.stat(instance_dir / "instance.json").st_mode) == 0o600
+
+
+def test_request_without_the_token_is_dropped(running, instance_dir):
+    _lock, requests = running
+    port = json.loads((instance_dir / "instance.json").read_text(encoding="utf-8"))["port"]
+    assert not forward(InstanceRequest(path="/tmp/other.xlsx"), (port, "0" * 32))
+
+    with socket.create_connection(("127.0.0.1", port), timeout=2.0) as conn:
+        conn.sendall(json.dumps({"protocol": PROTOCOL, "path": "/tmp/other.xlsx"}).encode("utf-8") + b"\n")
+        assert conn.recv(100) == b""
+    assert requests == []
+
+
+def test_lock_is_released_on_close(instance_dir):
+    first = claim()
+    assert first is not None and first.held
+    first.close()
+    assert not (instance_dir / "instance.json").exists()
+
+    second = claim()
+    try:
+        assert second is not None and second.held
+    finally:
+        second.close()
@@ -0,0 +1,59 @@
+"""Снимок истории: чтение после сохранения, поддержка при записи и устаревание."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.excel_manager import TIMESHEET_SHEET, TimeEntry, append_time_entries, create_template, load_snapshot
+from timesheet_app.snapshot import HistorySnapshot
+
+
+def _workbook(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 900, datetime(2024, 3, 5, 9)),
+        ],
+    )
+    return path
+
+
+def test_snapshot_round_trip_and_torn_tail(tmp_path):
+    path = _workbook(tmp_path)
+    load_snapshot(path)
+
+    snapshot = HistorySnapshot.load(path)
+    assert snapshot is not None and snapshot.is_current()
+    assert snapshot.totals_by_pair() == {("Альфа", "Код"): (1, 600), ("Бета", "Тесты"): (1, 900)}
+    assert snapshot.totals_by_day() == {date(2024, 3, 4): 600, date(2024, 3, 5): 900}
+    assert snapshot.aggregate(lambda record: record[0]) == {
+        date(2024, 3, 4).toordinal(): (1, 600),
+        date(2024, 3, 5).toordinal(): (1, 900),
+    }
+
+    # Хвост, дописанный перед сбоем без обновления .json, не читается
+    with open(snapshot.records_path, "ab") as fh:
+        fh.write(b"\xff" * 7)
+    assert len(list(HistorySnapshot.load(path).iter_records())) == 2
+
+
+def test_snapshot_follows_app_writes_and_goes_stale_on_external_edit(tmp_path):
+    path = _workbook(tmp_path)
+    load_snapshot(path)
+
+    append_time_entries(path, [TimeEntry("Альфа", "Код", 300, datetime(2024, 3, 6, 9))])
+    snapshot = HistorySnapshot.load(path)
+    assert snapshot.is_current()
+    assert snapshot.totals_by_pair()[("Альфа", "Код")] == (2, 900)
+
+    wb = load_workbook(path)
+    wb[TIMESHEET_SHEET].append([date(2024, 3, 7), "Вручную", "Код", None])
+    wb.save(path)
+    assert not HistorySnapshot.load(path).is_current()
+    # Устаревший снимок перестраивается по книге
+    assert ("Вручную", "Код") in load_snapshot(path).totals_by_pair()
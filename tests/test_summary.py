@@ -0,0 +1,50 @@
+"""Лист «Итоги»: инкрементальные суммы совпадают с пересчётом по истории."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from openpyxl import load_workbook
+
+from timesheet_app.codec import decode_date, decode_duration
+from timesheet_app.excel_manager import (
+    SUMMARY_DAY,
+    SUMMARY_PROJECT_MONTH,
+    SUMMARY_SHEET,
+    TimeEntry,
+    append_time_entries,
+    create_template,
+    rebuild_summary,
+)
+
+
+def _summary(path):
+    result = {}
+    for section, period, project, seconds in load_workbook(path)[SUMMARY_SHEET].iter_rows(min_row=2, values_only=True):
+        if section is None:
+            continue
+        assert not (isinstance(seconds, str) and seconds.startswith("=")), "итоги без формул"
+        key = period if section == SUMMARY_PROJECT_MONTH else decode_date(period)
+        result[(section, key, project)] = decode_duration(seconds)
+    return result
+
+
+def test_incremental_totals_match_rebuild(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    create_template(path)
+    append_time_entries(
+        path,
+        [
+            TimeEntry("Альфа", "Код", 600, datetime(2024, 3, 4, 10)),
+            TimeEntry("Бета", "Тесты", 300, datetime(2024, 3, 4, 11)),
+        ],
+    )
+    append_time_entries(path, [TimeEntry("Альфа", "Ревью", 900, datetime(2024, 4, 1, 9))])
+
+    incremental = _summary(path)
+    assert incremental[(SUMMARY_DAY, date(2024, 3, 4), None)] == 900
+    assert incremental[(SUMMARY_PROJECT_MONTH, "2024-03", "Альфа")] == 600
+    assert incremental[(SUMMARY_PROJECT_MONTH, "2024-04", "Альфа")] == 900
+
+    rebuild_summary(path)
+    assert _summary(path) == incremental
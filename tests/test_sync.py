@@ -0,0 +1,221 @@
+"""Отправка очереди на локальный HTTP-сервер-заглушку: пропускная способность,
+недоступный сервер, неизменность пакета при повторах и отклонённые пакеты."""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+import pytest
+
+from timesheet_app import sync
+from timesheet_app.sync import Outbox, SyncClient, make_record
+
+
+class StandIn(ThreadingHTTPServer):
+    """Сервер-заглушка: запоминает запросы, коды ответа берёт из `statuses`."""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, statuses: Optional[List[int]] = None) -> None:
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.requests: List[dict] = []
+        self.statuses = list(statuses or [])
+        self.connections = 0
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/entries"
+
+    def accepted_ids(self) -> List[str]:
+        with self.lock:
+            return [entry["id"] for request in self.requests if request["status"] < 300 for entry in request["entries"]]
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:  # type: ignore[attr-defined]
+            self.server.connections += 1  # type: ignore[attr-defined]
+
+    def do_POST(self) -> None:  # noqa: N802 - имя из http.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server: StandIn = self.server  # type: ignore[assignment]
+        with server.lock:
+            status = server.statuses.pop(0) if server.statuses else 200
+            server.requests.append(
+                {"key": self.headers["Idempotency-Key"], "entries": json.loads(body)["entries"], "status": status}
+            )
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *_args) -> None:
+        pass
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _records(count: int, start: int = 0) -> List[dict]:
+    return [make_record(f"Проект {i % 7}", "Разработка", 600, datetime(2026, 10, 18, 12)) for i in range(start, start + count)]
+
+
+def _wait(condition: Callable[[], bool], timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timeout"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch, tmp_path):
+    monkeypatch.setattr(sync, "BACKOFF_BASE", 0.02)
+    monkeypatch.setattr(sync, "BACKOFF_MAX", 0.1)
+    monkeypatch.setattr(sync, "REJECTED_FILE", tmp_path / "rejected.jsonl")
+
+
+def test_throughput_over_one_connection(tmp_path):
+    server = StandIn()
+    client = SyncClient(server.url, outbox=Outbox(tmp_path / "outbox.jsonl"))
+    records = _records(2000)
+    try:
+        started = time.perf_counter()
+        client.start()
+        client.enqueue(records)
+        _wait(lambda: len(client.outbox) == 0)
+        elapsed = time.perf_counter() - started
+    finally:
+        client.stop()
+        server.stop()
+
+    assert sorted(server.accepted_ids()) == sorted(record["id"] for record in records)
+    assert len(server.requests) == 2000 // sync.BATCH_SIZE
+    assert server.connections == 1
+    # Запас на медленные машины: пакетная отправка — тысячи записей в секунду
+    assert len(records) / elapsed > 200
+
+
+def test_server_down_keeps_queue_and_delivers_later(tmp_path):
+    port = _free_port()
+    outbox_path = tmp_path / "outbox.jsonl"
+    client = SyncClient(f"http://127.0.0.1:{port}/entries", outbox=Outbox(outbox_path), timeout=1.0)
+    records = _records(250)
+    client.start()
+    server = None
+    try:
+        client.enqueue(records)
+        _wait(lambda: client._failures >= 3)
+        # Пока сервера нет, записи лежат в очереди на диске
+        assert len(client.outbox) == 250
+        assert len(Outbox(outbox_path)) == 250
+        assert client.last_error
+
+        server = StandIn(port)
+        client.flush()
+        _wait(lambda: len(client.outbox) == 0)
+    finally:
+        client.stop()
+        if server is not None:
+            server.stop()
+
+    assert sorted(server.accepted_ids()) == sorted(record["id"] for record in records)
+    assert len(Outbox(outbox_path)) == 0
+
+
+def test_retry_resends_the_same_batch_and_key(tmp_path):
+    server = StandIn(statuses=[503, 503, 503])
+    client = SyncClient(server.url, outbox=Outbox(tmp_path / "outbox.jsonl"))
+    first, second = _records(5), _records(5, start=5)
+    client.start()
+    try:
+        client.enqueue(first)
+        _wait(lambda: len(server.requests) >= 1)
+        # Записи, добавленные во время пауз между повторами, не меняют пакет в пути
+        client.enqueue(second)
+        _wait(lambda: len(client.outbox) == 0)
+    finally:
+        client.stop()
+        server.stop()
+
+    retried = server.requests[:4]
+    assert [request["status"] for request in retried] == [503, 503, 503, 200]
+    assert len({request["key"] for request in retried}) == 1
+    assert all([entry["id"] for entry in request["entries"]] == [r["id"] for r in first] for request in retried)
+    assert [entry["id"] for entry in server.requests[4]["entries"]] == [r["id"] for r in second]
+    assert sorted(server.accepted_ids()) == sorted(r["id"] for r in first + second)
+
+
+def test_rejected_batch_is_moved_aside(tmp_path):
+    server = StandIn(statuses=[400])
+    client = SyncClient(server.url, outbox=Outbox(tmp_path / "outbox.jsonl"))
+    records = _records(3)
+    client.start()
+    try:
+        client.enqueue(records)
+        _wait(lambda: len(client.outbox) == 0)
+    finally:
+        client.stop()
+        server.stop()
+
+    rejected = [json.loads(line) for line in (tmp_path / "rejected.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert [record["id"] for record in rejected] == [record["id"] for record in records]
+
+
+def test_auth_failure_keeps_the_batch(tmp_path):
+    server = StandIn(statuses=[401, 403])
+    client = SyncClient(server.url, outbox=Outbox(tmp_path / "outbox.jsonl"))
+    records = _records(3)
+    client.start()
+    try:
+        client.enqueue(records)
+        _wait(lambda: len(client.outbox) == 0)
+    finally:
+        client.stop()
+        server.stop()
+
+    assert [request["status"] for request in server.requests] == [401, 403, 200]
+    assert server.accepted_ids() == [record["id"] for record in records]
+    assert not (tmp_path / "rejected.jsonl").exists()
+
+
+def test_failed_reject_backs_off(tmp_path, monkeypatch):
+    # Родитель файла отклонённых — обычный файл: перенос падает с OSError
+    (tmp_path / "blocked").write_text("", encoding="utf-8")
+    monkeypatch.setattr(sync, "REJECTED_FILE", tmp_path / "blocked" / "rejected.jsonl")
+    monkeypatch.setattr(sync, "BACKOFF_BASE", 0.2)
+    monkeypatch.setattr(sync, "BACKOFF_MAX", 0.2)
+    server = StandIn(statuses=[400] * 100)
+    client = SyncClient(server.url, outbox=Outbox(tmp_path / "outbox.jsonl"))
+    records = _records(3)
+    client.start()
+    try:
+        client.enqueue(records)
+        _wait(lambda: client._failures >= 2)
+        time.sleep(0.3)
+    finally:
+        client.stop()
+        server.stop()
+
+    # Повторы идут с паузой, а не подряд; пакет остаётся в пути и в очереди
+    assert 2 <= len(server.requests) <= 10
+    assert len({request["key"] for request in server.requests}) == 1
+    assert len(client.outbox) == 3
+    assert "rejected" in client.last_error
@@ -0,0 +1,55 @@
+"""Именованные таймеры: независимые паузы, общий момент остановки и возврат."""
+
+from __future__ import annotations
+
+from timesheet_app.timers import TimerSet
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_timers_run_and_pause_independently():
+    clock = Clock()
+    timers = TimerSet(clock)
+    timers.start("Альфа", "Код")
+    clock.now += 10
+    timers.start("Бета", "Тесты")
+    clock.now += 5
+    assert timers.pause(("Альфа", "Код"))
+    assert not timers.pause(("Альфа", "Код"))
+    clock.now += 20
+
+    assert [(timer.key, timer.seconds(clock.now)) for timer in timers] == [
+        (("Альфа", "Код"), 15.0),
+        (("Бета", "Тесты"), 25.0),
+    ]
+    assert timers.any_running()
+
+    # Продолжение после паузы накапливает время, а не начинает заново
+    timers.start("Альфа", "Код")
+    clock.now += 1
+    assert timers.get(("Альфа", "Код")).seconds(clock.now) == 16.0
+
+
+def test_stop_uses_one_moment_and_restore_keeps_time():
+    clock = Clock()
+    timers = TimerSet(clock)
+    timers.start("Альфа", "Код")
+    timers.start("Бета", "Тесты")
+    clock.now += 30
+
+    stopped = timers.stop([("Альфа", "Код"), ("Бета", "Тесты"), ("Нет", "Такого")])
+    assert [(timer.key, seconds) for timer, seconds in stopped] == [(("Альфа", "Код"), 30.0), (("Бета", "Тесты"), 30.0)]
+    assert len(timers) == 0 and not timers.any_running()
+
+    # Запись не удалась: таймеры возвращаются на паузе, а новый отсчёт той же пары складывается с ними
+    timers.start("Альфа", "Код")
+    clock.now += 5
+    timers.restore(timer for timer, _seconds in stopped)
+    assert not timers.get(("Бета", "Тесты")).running
+    assert timers.get(("Альфа", "Код")).seconds(clock.now) == 35.0
@@ -0,0 +1,35 @@
+"""Частота-давность: свежие и частые значения выше, оценки переживают сохранение."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from timesheet_app.usage_stats import HALF_LIFE_DAYS, UsageStats
+
+
+def test_recent_use_outranks_old_frequent_use(tmp_path):
+    stats = UsageStats(tmp_path / "timesheet.xlsx")
+    now = datetime.now()
+    old = now - timedelta(days=HALF_LIFE_DAYS * 4)
+    for _ in range(3):
+        stats.record("Старый", "Код", old)
+    stats.record("Новый", "Тесты", now)
+    stats.record("Новый", "Ревью", now - timedelta(days=1))
+
+    # Три записи, затухшие в 16 раз, весят меньше одной сегодняшней
+    assert stats.rank_projects(["Без записей", "Старый", "Новый"]) == ["Новый", "Старый", "Без записей"]
+    assert stats.rank_work_types(["Код", "Ревью", "Тесты"], "Новый") == ["Тесты", "Ревью", "Код"]
+    assert stats.suggest_work_type("Новый", ["Код", "Ревью"]) == "Ревью"
+    assert stats.suggest_work_type("Неизвестный", ["Код"]) is None
+
+
+def test_scores_survive_save_and_load(tmp_path):
+    path = tmp_path / "timesheet.xlsx"
+    assert UsageStats.load(path) is None
+
+    history = [(date(2024, 3, 4), "Альфа", "Код"), (None, "Бета", "Код"), (date(2024, 3, 5), "Гамма", "Код")]
+    stats = UsageStats.from_history(path, history)
+    stats.save()
+    loaded = UsageStats.load(path)
+    assert loaded is not None
+    assert loaded.rank_projects(["Альфа", "Бета", "Гамма"]) == ["Гамма", "Альфа", "Бета"]
@@ -0,0 +1,106 @@
+"""Сторож главного потока: опоздания тиков, виновник зависания и модальные окна."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from timesheet_app import watchdog
+from timesheet_app.watchdog import MainLoopWatchdog, watched
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return 1_700_000_000.0 + self.now
+
+
+class FakeRoot:
+    """Вместо Tk: запомненный `after` вызывает сам тест."""
+
+    def __init__(self) -> None:
+        self.pending = None
+
+    def after(self, _ms, func):
+        self.pending = func
+        return "job"
+
+    def after_cancel(self, _job) -> None:
+        self.pending = None
+
+    def fire(self) -> None:
+        func, self.pending = self.pending, None
+        func()
+
+
+class Window:
+    def __init__(self, dog: MainLoopWatchdog, clock: FakeClock, root: FakeRoot) -> None:
+        self.watchdog = dog
+        self.clock = clock
+        self.root = root
+
+    @watched("slow_handler")
+    def slow(self) -> None:
+        self.clock.now += 0.5
+
+    @watched("ask_user")
+    def modal(self) -> None:
+        # messagebox крутит вложенный цикл событий: тик приходит вовремя,
+        # а потом пользователь думает пять секунд
+        self.clock.now += 0.1
+        self.root.fire()
+        self.clock.now += 5.0
+
+
+@pytest.fixture()
+def clock(monkeypatch, tmp_path):
+    fake = FakeClock()
+    monkeypatch.setattr(watchdog, "time", fake)
+    monkeypatch.setattr(watchdog, "APP_DIR", tmp_path)
+    monkeypatch.setattr(watchdog, "STALL_LOG_FILE", tmp_path / "stalls.log")
+    logger = logging.getLogger("timesheet_app.stalls")
+    saved = logger.handlers[:]
+    logger.handlers.clear()
+    yield fake
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers[:] = saved
+
+
+def test_stall_is_blamed_on_the_slow_handler(clock, tmp_path):
+    root = FakeRoot()
+    dog = MainLoopWatchdog(root, interval_ms=100, threshold_ms=200)
+    window = Window(dog, clock, root)
+    dog.start()
+
+    window.slow()
+    root.fire()  # тик на 400 мс позже срока
+    clock.now += 0.1
+    root.fire()  # вовремя
+
+    assert list(dog.lateness) == pytest.approx([400.0, 0.0])
+    assert [(name, round(ms)) for _when, name, ms in dog.stalls] == [("slow_handler", 400)]
+    assert list(dog.handlers["slow_handler"]) == pytest.approx([500.0])
+    assert "handler=slow_handler" in (tmp_path / "stalls.log").read_text(encoding="utf-8")
+    assert "slow_handler: 1 /" in dog.summary()
+
+
+def test_waiting_in_a_modal_dialog_is_not_a_stall(clock):
+    root = FakeRoot()
+    dog = MainLoopWatchdog(root, interval_ms=100, threshold_ms=200)
+    window = Window(dog, clock, root)
+    dog.start()
+
+    window.modal()
+
+    assert not dog.stalls
+    # Учитывается время до первого тика внутри обработчика, а не ожидание пользователя
+    assert list(dog.handlers["ask_user"]) == pytest.approx([100.0])
+    dog.stop()
+    assert root.pending is None
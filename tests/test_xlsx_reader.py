@@ -0,0 +1,107 @@
+"""Чтение листов напрямую из XML: те же значения, что у openpyxl (и в книгах date1904), и постоянная память."""
+
+from __future__ import annotations
+
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from timesheet_app.codec import EXCEL_EPOCH_1904, TIMESHEET_CODEC, WORKDAY_CODEC
+from timesheet_app.excel_manager import (
+    READ_ENGINE_OPENPYXL,
+    READ_ENGINE_XML,
+    TIMESHEET_HEADERS,
+    TIMESHEET_SHEET,
+    WORKDAY_HEADERS,
+    WORKDAY_SHEET,
+    configure,
+    iter_time_entries,
+    open_read_only,
+)
+from timesheet_app.xlsx_reader import XlsxReader
+
+ROWS = 25_000
+
+
+@pytest.fixture(scope="module")
+def workbook(tmp_path_factory):
+    path = tmp_path_factory.mktemp("xlsx") / "rows.xlsx"
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Лист")
+    ws.append(["Дата", "Проект", "Вид работ", "Длительность"])
+    for i in range(ROWS):
+        ws.append([45000 + i // 20, f"Проект {i % 40}", f"Вид работ {i % 12}", (i % 900) / 86400])
+    wb.save(path)
+    return path
+
+
+def test_rows_match_openpyxl(workbook):
+    expected = list(load_workbook(workbook, read_only=True)["Лист"].iter_rows(max_row=500, values_only=True))
+    with XlsxReader(workbook) as reader:
+        assert list(reader["Лист"].iter_rows(max_row=500, max_col=4, values_only=True)) == expected
+
+
+def test_values_only_false_is_rejected(workbook):
+    with XlsxReader(workbook) as reader:
+        with pytest.raises(TypeError, match="values_only"):
+            reader["Лист"].iter_rows(values_only=False)
+
+
+def test_memory_does_not_grow_with_rows(workbook):
+    with XlsxReader(workbook) as reader:
+        sheet = reader["Лист"]
+        reader.shared_strings  # таблица общих строк нужна целиком — её не считаем
+        tracemalloc.start()
+        try:
+            assert sum(1 for _row in sheet.iter_rows(max_col=4, values_only=True)) == ROWS + 1
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    assert peak < 1024 * 1024, f"{peak / 1024:.0f} KiB"
+
+
+def test_date1904_matches_openpyxl(tmp_path):
+    path = tmp_path / "mac.xlsx"
+    wb = Workbook()
+    wb.epoch = CALENDAR_MAC_1904
+    ws = wb.active
+    ws.title = TIMESHEET_SHEET
+    ws.append(TIMESHEET_HEADERS)
+    for i in range(30):
+        ws.append([date(2024, 3, 1) + timedelta(days=i), "Альфа", "Код", timedelta(minutes=5 * i + 5)])
+    # Дата без формата даты: обоим движкам достаётся серийное число
+    ws.append([(datetime(2024, 5, 1) - EXCEL_EPOCH_1904).days, "Бета", "Тесты", 0.25])
+    workday = wb.create_sheet(WORKDAY_SHEET)
+    workday.append(WORKDAY_HEADERS)
+    workday.append([date(2024, 3, 1), datetime(2024, 3, 1, 9).time(), datetime(2024, 3, 1, 18).time(), timedelta(hours=9)])
+    wb.save(path)
+
+    with XlsxReader(path) as reader:
+        assert reader.epoch == EXCEL_EPOCH_1904
+
+    rows = {}
+    for engine in (READ_ENGINE_XML, READ_ENGINE_OPENPYXL):
+        wb = open_read_only(path, engine=engine)
+        try:
+            rows[engine] = [
+                [codec.for_workbook(wb).decode(row) for row in wb[sheet].iter_rows(min_row=2, max_col=4, values_only=True)]
+                for sheet, codec in ((TIMESHEET_SHEET, TIMESHEET_CODEC), (WORKDAY_SHEET, WORKDAY_CODEC))
+            ]
+        finally:
+            wb.close()
+    assert rows[READ_ENGINE_XML] == rows[READ_ENGINE_OPENPYXL]
+    assert rows[READ_ENGINE_XML][0][0][0] == date(2024, 3, 1)
+    assert rows[READ_ENGINE_XML][0][-1] == (date(2024, 5, 1), "Бета", "Тесты", 21600.0)
+
+    try:
+        entries = {}
+        for engine in (READ_ENGINE_XML, READ_ENGINE_OPENPYXL):
+            configure(read_engine=engine)
+            entries[engine] = [(entry.day, entry.seconds) for entry in iter_time_entries(path)]
+    finally:
+        configure(read_engine=READ_ENGINE_XML)
+    assert entries[READ_ENGINE_XML] == entries[READ_ENGINE_OPENPYXL]
+    assert entries[READ_ENGINE_XML][0] == (date(2024, 3, 1), 300.0)